@@ -0,0 +1,148 @@
+# src/parsers.py'deki lxml ayrıştırıcılarını, yerini aldıkları BeautifulSoup kodu ile karşılaştırır.
+# Önce iki uygulamanın aynı sonucu verdiği doğrulanır, ardından sayfa başına süreler ölçülür.
+#
+# Kullanım (proje klasöründen):
+#   python -m benchmarks.bench_parsers [-n tekrar] [-size satır]
+
+import argparse
+import re
+import timeit
+
+from bs4 import BeautifulSoup
+
+from benchmarks import pages
+from src import parsers
+from src.utils import sanitize_filename, fingerprint
+
+
+# --- Karşılaştırma için BeautifulSoup ile yazılmış önceki uygulamalar ---
+
+def _bs4_file_listing(raw_html):
+    try:
+        rows = BeautifulSoup(raw_html, "lxml")
+        rows = rows.select_one(".dosyaSistemi table.data").find_all("tr")
+    except:
+        return []
+    rows.pop(0)
+
+    file_infos = []
+    for row in rows:
+        try:
+            file_info = row.find_all("td")
+            file_a_tag = file_info[0].find("a")
+            file_name = sanitize_filename(file_a_tag.text)
+            size_info = file_info[1].text.strip().split(" ")
+            file_size = float(size_info[0])
+            if size_info[1] == "KB":
+                file_size /= 1024
+            isFolder = file_info[0].find("img")["src"].endswith("/folder.png")
+            file_link = file_a_tag["href"]
+        except:
+            continue
+        file_infos.append((file_link, file_size, isFolder, file_name))
+    return file_infos
+
+
+def _bs4_announcement_links(list_html):
+    announcement_items = BeautifulSoup(list_html, "lxml").select("div.duyuruGoruntule")
+    if not announcement_items:
+        return None
+    detail_links = []
+    for item in announcement_items:
+        title_link_element = item.select_one("h2 a")
+        if title_link_element and title_link_element.has_attr("href"):
+            detail_links.append(title_link_element["href"])
+    return detail_links
+
+
+def _bs4_announcement_detail(detail_html):
+    container = BeautifulSoup(detail_html, "lxml").select_one("div.orta > div.ic")
+    if not container:
+        return None
+    title_element = container.select_one("h1")
+    announcement_block = container.select_one("div.duyuruGoruntule")
+    spans = announcement_block.select("div.tarih > span.tarih")
+    content_element = announcement_block.select_one("div.icerik")
+    return (
+        title_element.get_text(strip=True),
+        spans[1].get_text(strip=True),
+        spans[0].get_text(strip=True),
+        content_element.get_text("\n", strip=True),
+    )
+
+
+def _bs4_homework_list(list_html):
+    homeworks = []
+    for item in BeautifulSoup(list_html, "lxml").select("table.data td"):
+        detail_link_element = item.find("a", string=re.compile(r"Ödevi Görüntüle"))
+        if detail_link_element and detail_link_element.has_attr("href"):
+            row = item.find_parent("tr") or item
+            homeworks.append((detail_link_element["href"], fingerprint(row.get_text(" ", strip=True))))
+    return homeworks
+
+
+def _bs4_course_links(kampus_html):
+    page = BeautifulSoup(kampus_html, "lxml")
+    return [
+        (tag.get_text(strip=True), tag["href"])
+        for tag in page.select('.menuErisimAgaci a[href*="/Sinif/"]')
+    ]
+
+
+def _bs4_course_info(info_html):
+    table = BeautifulSoup(info_html, "lxml").find(class_="formAbetGoster")
+    rows = table.select("tr")
+    return rows[0].select("td")[1].text.strip(), rows[1].select("td")[2].text.strip()
+
+
+def _bs4_login_form(login_html):
+    page = BeautifulSoup(login_html, "lxml")
+    return page.form.get("action"), {field.get("name"): field.get("value") for field in page.find_all("input")}
+
+
+# --- Sentetik sayfalar ---
+
+def _build_cases(size: int) -> list[tuple]:
+    files = [
+        (f"Hafta {i} - Ders Notları ğüşiöç.pdf", f"/Sinif/12345.67890/DersDosyalari?g{i}", f"{i % 900 + 1}.5 KB", False)
+        for i in range(size)
+    ] + [(f"Klasör {i}", f"/Sinif/12345.67890/DersDosyalari?g9{i}", "0 KB", True) for i in range(size // 10)]
+    announcements = [(f"Duyuru {i}: Sınav tarihi", f"/Sinif/12345.67890/Duyuru/{1000 + i}") for i in range(size)]
+    content = "\n".join(f"Satır {i}: Ödev teslimleri Ninova üzerinden yapılacaktır." for i in range(size // 4 + 1))
+    homeworks = [(f"Ödev {i}", f"/Sinif/12345.67890/Odev/{500 + i}", "12 Ekim 2024 23:59") for i in range(size // 4 + 1)]
+    courses = [(str(20000 + i), f"BLG{100 + i}", f"/Sinif/{20000 + i}.{i}") for i in range(size // 10 + 1)]
+
+    return [
+        ("Dosya listesi", pages.file_listing_page(files), _bs4_file_listing, parsers.file_listing),
+        ("Duyuru listesi", pages.announcement_list_page(announcements), _bs4_announcement_links, parsers.announcement_links),
+        ("Duyuru detayı", pages.announcement_detail_page("Vize", "12 Ekim 2024 10:00", "Dr. Öğr. Üyesi", content),
+            _bs4_announcement_detail, parsers.announcement_detail),
+        ("Ödev listesi", pages.homework_list_page(homeworks), _bs4_homework_list, parsers.homework_list),
+        ("Erişim ağacı", pages.kampus_page(courses), _bs4_course_links, parsers.course_links),
+        ("Sınıf bilgileri", pages.course_info_page("BLG 101E", "Bilgisayara Giriş"), _bs4_course_info, parsers.course_info),
+        ("Giriş formu", pages.login_page("./Login.aspx").encode("utf-8"), _bs4_login_form, parsers.login_form),
+    ]
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(description="lxml ve BeautifulSoup ayrıştırıcılarını karşılaştırır")
+    argument_parser.add_argument("-n", type=int, default=50, help="her ölçüm için tekrar sayısı")
+    argument_parser.add_argument("-size", type=int, default=200, help="listelerdeki satır sayısı")
+    args = argument_parser.parse_args()
+
+    print(f"{'Sayfa':<18}{'Boyut (KB)':>12}{'bs4 (ms)':>12}{'lxml (ms)':>12}{'Hızlanma':>10}")
+    for name, page, reference, candidate in _build_cases(args.size):
+        expected, actual = reference(page), candidate(page)
+        if expected != actual:
+            raise SystemExit(f"{name}: sonuçlar farklı!\n  bs4:  {expected!r:.300}\n  lxml: {actual!r:.300}")
+
+        reference_ms = timeit.timeit(lambda: reference(page), number=args.n) / args.n * 1000
+        candidate_ms = timeit.timeit(lambda: candidate(page), number=args.n) / args.n * 1000
+        print(
+            f"{name:<18}{len(page) / 1024:>12.1f}{reference_ms:>12.2f}{candidate_ms:>12.2f}"
+            f"{reference_ms / candidate_ms:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# Programın tamamını (main()) yerel sahte Ninova sunucusuna karşı çalıştırıp ölçer.
+# Her çalıştırma ayrı bir süreçte yapılır; süreç içinde toplam süre, en yüksek bellek kullanımı
+# (peak RSS) ve en yüksek iş parçacığı sayısı, sunucu tarafında ise istek ve byte sayıları ölçülür.
+# -runs 2 ve üstünde sonraki çalıştırmalar aynı klasörü kullanır (kayıtlı oturum, veritabanı ve
+# sayfa önbelleği ile tekrar çalıştırma ölçülür).
+#
+# Kullanım (proje klasöründen, '--' sonrası programa iletilir):
+#   python -m benchmarks.bench_run -courses 10 -files 20 -latency 20 -runs 2 -- -workers 16
+#   python -m benchmarks.bench_run -courses 10 -- -engine async
+#   python -m benchmarks.bench_run -large_files 2 -large_file_size 50 -bandwidth 2048 -- -policy largest -report rapor.json
+
+import argparse
+import builtins
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from os.path import abspath, dirname, join
+from urllib.request import urlopen
+
+from benchmarks.mock_ninova import add_site_arguments, create_server
+from src.utils import peak_rss_kb
+
+PROJECT_ROOT = dirname(dirname(abspath(__file__)))
+THREAD_SAMPLE_INTERVAL = 0.01  # saniye
+
+
+def _sample_threads(stop: threading.Event, result: dict) -> None:
+    while not stop.is_set():
+        # Örnekleyici iş parçacığının kendisi sayılmaz
+        result["max_threads"] = max(result["max_threads"], threading.active_count() - 1)
+        stop.wait(THREAD_SAMPLE_INTERVAL)
+
+
+def _peak_rss_mb() -> float:
+    peak = peak_rss_kb()
+    return peak / 1024 if peak is not None else None
+
+
+def run_client(config: dict) -> None:
+    """Alt süreçte çalışır: adresleri sahte sunucuya yönlendirir ve main()'i çalıştırır."""
+    # Diğer modüller URL'yi import sırasında kopyaladığı için önce bu değerler değiştirilmeli
+    from src import login
+    login.URL = config["url"]
+    login.LOGIN_HOST = config["login_host"]
+    login.LOGIN_URL = config["url"]
+
+    builtins.input = lambda prompt="": ""  # ders seçiminde tüm dersler
+    sys.argv = ["main.py", "-d", config["download_dir"], "-u", "bench", "bench", *config["program_args"]]
+
+    from src import globals
+    import main as program
+
+    threads = {"max_threads": threading.active_count()}
+    stop = threading.Event()
+    sampler = threading.Thread(target=_sample_threads, args=(stop, threads), daemon=True)
+    sampler.start()
+
+    start = time.perf_counter()
+    globals.init_globals()
+    program.main()
+    wall_time = time.perf_counter() - start
+
+    stop.set()
+    sampler.join()
+    with open(config["result_path"], "w", encoding="utf-8") as f:
+        json.dump({"wall_time": wall_time, "peak_rss_mb": _peak_rss_mb(), "max_threads": threads["max_threads"]}, f)
+
+
+def _server_stats(url: str) -> dict:
+    with urlopen(url + "/__stats") as response:
+        return json.load(response)
+
+
+def _count_downloaded_files(download_dir: str) -> int:
+    count = 0
+    for root, folders, files in os.walk(download_dir):
+        folders[:] = [folder for folder in folders if not folder.startswith(".")]
+        count += sum(1 for name in files if not name.startswith(".") and not name.startswith("ninova_arsivci.db"))
+    return count
+
+
+def _run_once(url: str, work_dir: str, download_dir: str, program_args: list[str], run_index: int) -> dict:
+    result_path = join(work_dir, f"result_{run_index}.json")
+    log_path = join(work_dir, f"run_{run_index}.log")
+    config = {
+        "url": url,
+        "login_host": url.split("://", 1)[1],
+        "download_dir": download_dir,
+        "program_args": program_args,
+        "result_path": result_path,
+    }
+    env = dict(os.environ, PYTHONPATH=PROJECT_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    with open(log_path, "w", encoding="utf-8") as log:
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_run", "-client", json.dumps(config)],
+            cwd=work_dir, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+    if completed.returncode != 0 or not os.path.exists(result_path):
+        raise SystemExit(f"Çalıştırma {run_index} başarısız oldu. Program çıktısı: {log_path}")
+    with open(result_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(description="Programı sahte Ninova sunucusuna karşı çalıştırıp ölçer")
+    add_site_arguments(argument_parser)
+    argument_parser.add_argument("-runs", type=int, default=1, help="aynı klasörde art arda çalıştırma sayısı")
+    argument_parser.add_argument("-keep", action="store_true", help="çalışma klasörünü silme")
+    argument_parser.add_argument("-client", help=argparse.SUPPRESS)
+    argument_parser.add_argument("program_args", nargs=argparse.REMAINDER, help="'--' sonrası programa iletilir")
+    args = argument_parser.parse_args()
+
+    if args.client:
+        return run_client(json.loads(args.client))
+
+    program_args = args.program_args[1:] if args.program_args[:1] == ["--"] else args.program_args
+
+    server = create_server(args)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    site = server.site
+    print(
+        f"Sahte Ninova: {len(site.courses)} ders, {len(site.files)} dosya "
+        f"({site.total_bytes / 1024 / 1024:.1f} MB), gecikme {args.latency} ms, hata oranı {args.error_rate}"
+    )
+    print(f"Program parametreleri: {' '.join(program_args) or '(yok)'}")
+
+    work_dir = tempfile.mkdtemp(prefix="ninova_bench_")
+    download_dir = join(work_dir, "arsiv")
+    os.makedirs(download_dir)
+
+    print(f"{'Çalıştırma':<12}{'Süre (s)':>10}{'İstek':>8}{'İstek/s':>10}{'MB/s':>8}{'Peak RSS (MB)':>15}{'Thread':>8}{'Dosya':>8}")
+    try:
+        for run_index in range(1, args.runs + 1):
+            before = _server_stats(url)
+            result = _run_once(url, work_dir, download_dir, program_args, run_index)
+            after = _server_stats(url)
+
+            requests = after["requests"] - before["requests"]
+            megabytes = (after["bytes_sent"] - before["bytes_sent"]) / 1024 / 1024
+            wall_time = result["wall_time"]
+            peak_rss = f"{result['peak_rss_mb']:.1f}" if result["peak_rss_mb"] is not None else "-"
+            print(
+                f"{run_index:<12}{wall_time:>10.2f}{requests:>8}{requests / wall_time:>10.1f}"
+                f"{megabytes / wall_time:>8.1f}{peak_rss:>15}{result['max_threads']:>8}"
+                f"{_count_downloaded_files(download_dir):>8}"
+            )
+    finally:
+        server.shutdown()
+        if args.keep:
+            print(f"Çalışma klasörü: {work_dir}")
+        else:
+            import shutil
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+# Ninova'yı taklit eden yerel HTTP sunucusu.
+# Programın kullandığı uç noktaların hepsi sentetik derslerle sunulur: /Kampus1 erişim ağacı,
+# /SinifBilgileri, /SinifDosyalari ve /DersDosyalari klasör ağaçları, /Duyurular, /Odevler,
+# content-disposition ile dosya indirme ve girisv3 giriş formu. Sayfalar ETag ile sunulur,
+# dosyalarda Range desteklenir. Her isteğe gecikme ve rastgele 503 hatası eklenebilir.
+#
+# Kullanım (proje klasöründen):
+#   python -m benchmarks.mock_ninova -port 8080 -courses 5 -files 20 -depth 2
+# Sunucu istatistikleri GET /__stats ile JSON olarak alınır.
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote
+
+from benchmarks import pages
+
+SESSION_COOKIE = "ASP.NET_SessionId"
+SESSION_VALUE = "benchmark"
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_FILE_LINK_PATTERN = re.compile(r"\?g(\d+)")
+_RANGE_PATTERN = re.compile(r"bytes=(\d+)-")
+
+
+class SyntheticNinova:
+    """
+    Parametrelere göre belirlenimci (her seferinde aynı) ders, klasör, dosya, duyuru ve ödev ağacı.
+    Klasör ve dosyalar, programın beklediği gibi '?g<numara>' linkleriyle adreslenir.
+    """
+
+    def __init__(self, courses: int, files: int, folders: int, depth: int, file_size_kb: int,
+                 announcements: int, homeworks: int, large_files: int = 0, large_file_size_mb: int = 0):
+        self.courses = []  # (crn, kod, link)
+        self.course_names = {}
+        self.listings = {}  # liste anahtarı -> [(ad, link, boyut metni, klasör mü)]
+        self.files = {}  # dosya numarası -> (dosya adı, boyut)
+        self.announcements = {}  # link -> (başlık, tarih, yayınlayan, içerik)
+        self.announcement_lists = {}  # ders linki -> [(başlık, link)]
+        self.homeworks = {}  # link -> (başlık, teslim tarihi, açıklama, [(ad, link)])
+        self.homework_lists = {}  # ders linki -> [(başlık, link, teslim tarihi)]
+        self._next_id = 1000
+        self._file_size = file_size_kb * 1024
+        self._large_file_size = large_file_size_mb * 1024 * 1024
+
+        for course_index in range(courses):
+            crn = str(30000 + course_index)
+            code = f"BLG {100 + course_index}E"
+            link = f"/Sinif/{crn}.{course_index}"
+            self.courses.append((crn, code, link))
+            self.course_names[link] = (code, f"Sentetik Ders {course_index}")
+
+            for listing in ("SinifDosyalari", "DersDosyalari"):
+                self._build_folder(f"{link}/{listing}", f"{link}/{listing}", files, folders, depth)
+            # Büyük dosyalar (ör. ders videoları) Sınıf Dosyaları listesinin sonuna eklenir
+            for index in range(large_files):
+                name = f"Ders Kaydı {index}.mp4"
+                file_link = self._new_file(f"{link}/SinifDosyalari", name, self._large_file_size)
+                self.listings[f"{link}/SinifDosyalari"].append((name, file_link, f"{large_file_size_mb}.0 MB", False))
+
+            self.announcement_lists[link] = []
+            for index in range(announcements):
+                announcement_link = f"{link}/Duyuru/{self._new_id()}"
+                title = f"Duyuru {index}: Sınav ve ödev takvimi"
+                content = "\n".join(f"Satır {line}: Ödevler Ninova üzerinden teslim edilecektir." for line in range(10))
+                self.announcements[announcement_link] = (title, f"{index % 28 + 1} Ekim 2024 10:00", "Dr. Öğr. Üyesi Bench", content)
+                self.announcement_lists[link].append((title, announcement_link))
+
+            self.homework_lists[link] = []
+            for index in range(homeworks):
+                homework_link = f"{link}/Odev/{self._new_id()}"
+                resources = [(f"odev{index}_kaynak.pdf", self._new_file(homework_link, f"odev{index}_kaynak.pdf"))]
+                title = f"Ödev {index}"
+                self.homeworks[homework_link] = (title, "12 Ekim 2024 23:59", f"{title} açıklaması", resources)
+                self.homework_lists[link].append((title, homework_link, "12 Ekim 2024 23:59"))
+
+    def _new_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    def _new_file(self, base_link: str, name: str, size: int = None) -> str:
+        file_id = self._new_id()
+        self.files[file_id] = (name, self._file_size if size is None else size)
+        return f"{base_link}?g{file_id}"
+
+    def _build_folder(self, key: str, base_link: str, files: int, folders: int, depth: int) -> None:
+        size_text = f"{self._file_size / 1024:.1f} KB"
+        entries = []
+        for index in range(files):
+            name = f"Hafta {index} Ders Notları.pdf"
+            entries.append((name, self._new_file(base_link, name), size_text, False))
+        if depth > 0:
+            for index in range(folders):
+                folder_link = f"{base_link}?g{self._new_id()}"
+                entries.append((f"Klasör {index}", folder_link, "0 KB", True))
+                self._build_folder(folder_link, base_link, files, folders, depth - 1)
+        self.listings[key] = entries
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(size for _, size in self.files.values())
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "MockNinovaServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.count_request()
+        if self.path == "/__stats":
+            return self._send_json(self.server.stats())
+        if self.path.startswith("/Login.aspx"):
+            return self._send_html(pages.login_page("./Login.aspx"))
+        if not self._is_authenticated():
+            return self._redirect("/Login.aspx")
+        if self._inject_delay_and_error():
+            return
+
+        site = self.server.site
+        path = self.path
+        file_match = _FILE_LINK_PATTERN.search(path)
+        if file_match and int(file_match.group(1)) in site.files:
+            return self._send_file(int(file_match.group(1)))
+        if path in site.listings:
+            return self._send_html(pages.file_listing_page(site.listings[path]))
+        if path == "/Kampus1":
+            return self._send_html(pages.kampus_page(site.courses))
+        if path.endswith("/SinifBilgileri"):
+            course = site.course_names.get(path[: -len("/SinifBilgileri")])
+            if course:
+                return self._send_html(pages.course_info_page(*course))
+        if path.endswith("/Duyurular"):
+            announcements = site.announcement_lists.get(path[: -len("/Duyurular")])
+            if announcements is not None:
+                return self._send_html(pages.announcement_list_page(announcements))
+        if path in site.announcements:
+            return self._send_html(pages.announcement_detail_page(*site.announcements[path]))
+        if path.endswith("/Odevler"):
+            homeworks = site.homework_lists.get(path[: -len("/Odevler")])
+            if homeworks is not None:
+                return self._send_html(pages.homework_list_page(homeworks))
+        if path in site.homeworks:
+            return self._send_html(pages.homework_detail_page(*site.homeworks[path]))
+        self._send_status(404)
+
+    def do_POST(self):
+        self.server.count_request()
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length).decode("utf-8", errors="replace")
+        if not self.path.startswith("/Login.aspx"):
+            return self._send_status(404)
+        if "tbUserName" not in body or "tbPassword" not in body:
+            return self._send_html(pages.login_page("./Login.aspx"))
+        self._redirect("/Kampus1", {"Set-Cookie": f"{SESSION_COOKIE}={SESSION_VALUE}; Path=/; HttpOnly"})
+
+    def _is_authenticated(self) -> bool:
+        return f"{SESSION_COOKIE}={SESSION_VALUE}" in self.headers.get("Cookie", "")
+
+    def _inject_delay_and_error(self) -> bool:
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if self.server.error_rate and random.random() < self.server.error_rate:
+            headers = {"Retry-After": str(self.server.retry_after)} if self.server.retry_after is not None else None
+            self._send_status(503, headers)
+            return True
+        return False
+
+    def _redirect(self, path: str, headers: dict = None):
+        self.send_response(302)
+        self.send_header("Location", f"http://{self.headers.get('Host')}{path}")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+        self.server.count_response(302, 0)
+
+    def _send_status(self, status: int, headers: dict = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+        self.server.count_response(status, 0)
+
+    def _send_json(self, data: dict):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_html(self, html: str):
+        body = html.encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.server.count_response(304, 0)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count_response(200, len(body))
+
+    def _send_file(self, file_id: int):
+        name, size = self.server.site.files[file_id]
+        start = 0
+        range_match = _RANGE_PATTERN.match(self.headers.get("Range", ""))
+        if range_match:
+            start = int(range_match.group(1))
+            if start >= size:
+                return self._send_status(416)
+
+        status = 206 if range_match else 200
+        self.send_response(status)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Disposition", f"attachment; filename*=UTF-8''{quote(name)}")
+        self.send_header("Content-Length", str(size - start))
+        self.send_header("Accept-Ranges", "bytes")
+        if range_match:
+            self.send_header("Content-Range", f"bytes {start}-{size - 1}/{size}")
+        self.end_headers()
+
+        body = self.server.file_body(file_id, size)
+        sent = 0
+        for offset in range(start, size, STREAM_CHUNK_SIZE):
+            chunk = body[offset: offset + STREAM_CHUNK_SIZE]
+            self.wfile.write(chunk)
+            sent += len(chunk)
+            if self.server.bandwidth:
+                time.sleep(len(chunk) / self.server.bandwidth)
+        self.server.count_response(status, sent)
+
+
+class MockNinovaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple, site: SyntheticNinova, latency: float = 0, error_rate: float = 0, retry_after: int = None,
+                 bandwidth: float = 0):
+        super().__init__(address, _Handler)
+        self.site = site
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._bytes_sent = 0
+        self._statuses = Counter()
+        self._payload = bytes(range(256)) * (max(site._file_size, site._large_file_size, 1) // 256 + 1)
+
+    def file_body(self, file_id: int, size: int) -> bytes:
+        # Her dosyanın içeriği numarası ile başlar, böylece dosyaların hash'leri farklı olur
+        prefix = f"{file_id}:".encode("ascii")
+        return (prefix + self._payload)[:size]
+
+    def count_request(self):
+        with self._lock:
+            self._requests += 1
+
+    def count_response(self, status: int, body_bytes: int):
+        with self._lock:
+            self._bytes_sent += body_bytes
+            self._statuses[status] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "bytes_sent": self._bytes_sent,
+                "statuses": {str(status): count for status, count in self._statuses.items()},
+                "files": len(self.site.files),
+                "file_bytes": self.site.total_bytes,
+            }
+
+
+def add_site_arguments(argument_parser: argparse.ArgumentParser) -> None:
+    argument_parser.add_argument("-courses", type=int, default=5, help="ders sayısı")
+    argument_parser.add_argument("-files", type=int, default=10, help="her klasördeki dosya sayısı")
+    argument_parser.add_argument("-folders", type=int, default=2, help="her klasördeki alt klasör sayısı")
+    argument_parser.add_argument("-depth", type=int, default=2, help="klasör ağacının derinliği")
+    argument_parser.add_argument("-file_size", type=int, default=256, help="dosya boyutu (KB)")
+    argument_parser.add_argument("-large_files", type=int, default=0, help="ders başına büyük dosya sayısı")
+    argument_parser.add_argument("-large_file_size", type=int, default=20, help="büyük dosyaların boyutu (MB)")
+    argument_parser.add_argument("-announcements", type=int, default=10, help="ders başına duyuru sayısı")
+    argument_parser.add_argument("-homeworks", type=int, default=3, help="ders başına ödev sayısı")
+    argument_parser.add_argument("-latency", type=float, default=0, help="istek başına gecikme (ms)")
+    argument_parser.add_argument("-error_rate", type=float, default=0, help="rastgele 503 dönme olasılığı (0-1)")
+    argument_parser.add_argument("-retry_after", type=int, default=None, help="503 cevaplarına eklenecek Retry-After (saniye)")
+    argument_parser.add_argument("-bandwidth", type=float, default=0, help="bağlantı başına indirme hızı sınırı (KB/s, 0: sınırsız)")
+
+
+def create_server(args: argparse.Namespace, port: int = 0) -> MockNinovaServer:
+    site = SyntheticNinova(
+        args.courses, args.files, args.folders, args.depth, args.file_size, args.announcements, args.homeworks,
+        args.large_files, args.large_file_size,
+    )
+    return MockNinovaServer(("127.0.0.1", port), site, args.latency / 1000, args.error_rate, args.retry_after, args.bandwidth * 1024)
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(description="Ninova'yı taklit eden yerel HTTP sunucusu")
+    argument_parser.add_argument("-port", type=int, default=8080)
+    add_site_arguments(argument_parser)
+    args = argument_parser.parse_args()
+
+    server = create_server(args, args.port)
+    site = server.site
+    print(
+        f"Sahte Ninova http://127.0.0.1:{server.server_address[1]} adresinde: {len(site.courses)} ders, "
+        f"{len(site.files)} dosya ({site.total_bytes / 1024 / 1024:.1f} MB)",
+        flush=True,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
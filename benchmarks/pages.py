@@ -0,0 +1,121 @@
+# Ninova sayfalarını taklit eden sentetik HTML üreticileri.
+# Sadece programın okuduğu yapılar (sınıf adları, tablo düzeni, link biçimleri) taklit edilir.
+
+from html import escape
+
+_PAGE = """<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN" "http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">
+<html xmlns="http://www.w3.org/1999/xhtml">
+<head><meta http-equiv="Content-Type" content="text/html; charset=utf-8" /><title>Ninova</title>
+<script type="text/javascript">function __doPostBack(t, a) {{ }}</script>
+<style>.menuErisimAgaci {{ display: block; }}</style></head>
+<body>
+<form name="aspnetForm" method="post" action="{action}" id="aspnetForm">
+<input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" value="{viewstate}" />
+<input type="hidden" name="__EVENTVALIDATION" id="__EVENTVALIDATION" value="dDwtMTA4NzY" />
+<div class="ust"><table><tr><td id="ctl00_Header1_tdLogout"><a href="/Logout">Çıkış</a></td></tr></table></div>
+<div class="sol">{menu}</div>
+<div class="orta"><div class="ic">
+{content}
+</div></div>
+<!-- alt bilgi -->
+<div class="alt">İstanbul Teknik Üniversitesi</div>
+</form>
+</body>
+</html>"""
+
+# Gerçek sayfalardaki gibi büyük bir __VIEWSTATE alanı
+_VIEWSTATE = "dDwtMTA4NzY" * 400
+
+
+def page(content: str, action: str = "./", menu: str = "") -> str:
+    return _PAGE.format(action=escape(action), viewstate=_VIEWSTATE, menu=menu, content=content)
+
+
+def kampus_page(courses: list[tuple[str, str, str]]) -> str:
+    """Erişim ağacı: courses (crn, ders kodu, link) listesi"""
+    items = "\n".join(
+        f'<li><a href="{escape(link)}">CRN: {escape(crn)}</a>'
+        f'<ul><li><a href="{escape(link)}/SinifDosyalari">Sınıf Dosyaları</a></li></ul></li>'
+        for crn, code, link in courses
+    )
+    menu = f'<div class="menuErisimAgaci"><ul><li><span>Dersler</span><ul>{items}</ul></li></ul></div>'
+    return page("<h1>Kampüs</h1><p>Hoş geldiniz.</p>", menu=menu)
+
+
+def course_info_page(code: str, name: str) -> str:
+    content = f"""<h1>Sınıf Bilgileri</h1>
+<table class="formAbetGoster">
+<tr><td class="title_field">Ders Kodu</td><td>{escape(code)}</td></tr>
+<tr><td class="title_field">Ders Adı</td><td>:</td><td>{escape(name)}</td></tr>
+<tr><td class="title_field">Kredi</td><td>3</td></tr>
+</table>"""
+    return page(content)
+
+
+def file_listing_page(entries: list[tuple[str, str, str, bool]]) -> str:
+    """Dosya listesi: entries (ad, link, boyut metni, klasör mü) listesi"""
+    rows = "\n".join(
+        f"""<tr><td><img src="/images/ds/{"folder" if is_folder else "file"}.png" /> <a href="{escape(link)}">{escape(name)}</a></td>
+<td>{escape(size)}</td><td>01 Ekim 2024 10:00</td></tr>"""
+        for name, link, size, is_folder in entries
+    )
+    content = f"""<h1>Dosyalar</h1>
+<div class="dosyaSistemi"><table class="data">
+<tr><th>Dosya Adı</th><th>Boyut</th><th>Tarih</th></tr>
+{rows}
+</table></div>"""
+    return page(content)
+
+
+def announcement_list_page(announcements: list[tuple[str, str]]) -> str:
+    """Duyuru listesi: announcements (başlık, link) listesi"""
+    blocks = "\n".join(
+        f"""<div class="duyuruGoruntule"><h2><a href="{escape(link)}">{escape(title)}</a></h2>
+<div class="icerik">{escape(title)} hakkında kısa özet...</div></div>"""
+        for title, link in announcements
+    )
+    return page(f"<h1>Duyurular</h1>{blocks}")
+
+
+def announcement_detail_page(title: str, date_str: str, author: str, content: str) -> str:
+    paragraphs = "".join(f"<p>{escape(line)}</p>" for line in content.split("\n"))
+    body = f"""<h1>{escape(title)}</h1>
+<div class="duyuruGoruntule">
+<div class="tarih"><span class="tarih">{escape(date_str)}</span> <span class="tarih">{escape(author)}</span></div>
+<div class="icerik">{paragraphs}</div>
+</div>"""
+    return page(body)
+
+
+def homework_list_page(homeworks: list[tuple[str, str, str]]) -> str:
+    """Ödev listesi: homeworks (başlık, link, teslim tarihi) listesi"""
+    rows = "\n".join(
+        f"""<tr><td><h2>{escape(title)}</h2><span>Teslim Bitişi: {escape(deadline)}</span></td>
+<td><a href="{escape(link)}">Ödevi Görüntüle</a></td></tr>"""
+        for title, link, deadline in homeworks
+    )
+    return page(f'<h1>Ödevler</h1><table class="data">{rows}</table>')
+
+
+def homework_detail_page(title: str, deadline: str, description: str, resource_links: list[tuple[str, str]]) -> str:
+    resources = "\n".join(
+        f'<tr><td><a href="{escape(link)}">{escape(name)}</a></td></tr>' for name, link in resource_links
+    )
+    body = f"""<h1>{escape(title)}</h1>
+<div class="form2">
+<table><tr><td>Teslim Bitişi</td><td>{escape(deadline)}</td></tr></table>
+<span class="title_field">Ödev Açıklaması</span>
+<span class="data_field">{escape(description)}</span>
+</div>
+<h2>Kaynak Dosyalar</h2>
+<div><table class="data">{resources}</table></div>"""
+    return page(body)
+
+
+def login_page(action: str) -> str:
+    content = """<input name="ctl00$ContentPlaceHolder1$tbUserName" type="text" />
+<input name="ctl00$ContentPlaceHolder1$tbPassword" type="password" />
+<input type="submit" name="ctl00$ContentPlaceHolder1$btnLogin" value="Giriş" />"""
+    return _PAGE.format(action=escape(action), viewstate=_VIEWSTATE, menu="", content=content).replace(
+        'id="ctl00_Header1_tdLogout"', ""
+    )
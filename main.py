@@ -5,9 +5,11 @@
 try:
     from src import logger
     from src.login import login
-    from src.kampus import get_course_list, filter_courses
-    from src.task_handler import start_tasks
-    from src.db_handler import DB
+    from src.kampus import filter_courses
+    from src.task_handler import archive
+    from src.metrics import Metrics
+    from src.sessions import Sessions
+    from src.utils import peak_rss_kb
     from src import globals
 except ModuleNotFoundError:
     print(
@@ -18,16 +20,46 @@ except ModuleNotFoundError:
 # ---MAIN---
 @logger.speed_measure("Program", False)
 def main():
-    DB.init()
-    courses = get_course_list()
-    courses = filter_courses(courses)
-    start_tasks(courses)
+    try:
+        if "watch" in globals.ARGV:
+            from src.watch import run_watch
+            run_watch(filter_courses)
+        else:
+            archive(filter_courses)
+    finally:
+        write_reports()
 
-    DB.write_records()
-    DB.apply_changes_and_close()
+
+def write_reports():
+    """-report ve -prometheus ile istenen ölçüm raporlarını yazar"""
+    Metrics.set_gauge("workers", globals.WORKER_COUNT)
+    connections = Sessions.connection_stats()
+    for name, value in connections.items():
+        Metrics.set_gauge(f"http_{name}", value)
+    if connections["requests_sent"]:
+        logger.verbose(
+            f"HTTP: {connections['requests_sent']} istek, {connections['connections_opened']} bağlantı açıldı "
+            f"({connections['connections_reused']} istek mevcut bağlantıyı kullandı)."
+        )
+    peak_rss = peak_rss_kb()
+    if peak_rss is not None:
+        Metrics.set_gauge("peak_rss_kb", peak_rss)
+
+    for flag, write in (("report", Metrics.write_json), ("prometheus", Metrics.write_prometheus)):
+        if flag in globals.ARGV:
+            try:
+                write(globals.ARGV[flag][0])
+                logger.verbose(f"Ölçüm raporu yazıldı: {globals.ARGV[flag][0]}")
+            except OSError as e:
+                logger.warning(f"Ölçüm raporu yazılamadı: {e}")
 
 
 # ---Program yönlendirme kodu---
 if __name__ == "__main__":
-    globals.init_globals()
-    main()
\ No newline at end of file
+    argv = globals.parse_argv()
+    if "batch" in argv:
+        from src.batch import run_batch
+        run_batch(argv)
+    else:
+        globals.init_globals(argv)
+        main()
\ No newline at end of file
@@ -5,18 +5,29 @@ if TYPE_CHECKING:
     from src.kampus import Course
     import requests
 
+from collections import namedtuple
 from os.path import join, exists
+from threading import Lock
 import os
 import re
-from bs4 import BeautifulSoup
 
-from src import logger, globals
+from src import logger, globals, http_cache, parsers
+from src.db_handler import DB
 from src.login import URL
+from src.scheduler import Scheduler, PRIORITY_LISTING
 from src.utils import sanitize_filename, fix_turkish_characters
 
 DUYURULAR_URL_EXTENSION = "/Duyurular"
 
-def _dump_html_for_debug(course_crn: str, response: requests.Response, is_detail_page=False, detail_id=""):
+Announcement = namedtuple("Announcement", "title author date_str content")
+
+MONTH_MAP = {
+    "Ocak": "01", "Şubat": "02", "Mart": "03", "Nisan": "04", "Mayıs": "05", "Haziran": "06",
+    "Temmuz": "07", "Ağustos": "08", "Eylül": "09", "Ekim": "10", "Kasım": "11", "Aralık": "12"
+}
+
+
+def _dump_html_for_debug(course_crn: str, html: str, encoding: str, is_detail_page=False, detail_id=""):
     """Saves the raw HTML of a page to the central debug_output folder."""
     page_type = "Detail" if is_detail_page else "List"
     detail_suffix = f"_{detail_id}" if is_detail_page else ""
@@ -24,146 +35,240 @@ def _dump_html_for_debug(course_crn: str, response: requests.Response, is_detail
     debug_filepath = join(globals.DEBUG_PATH, debug_filename)
     try:
         # Use response's apparent encoding to save the debug file accurately
-        encoding = response.encoding if response.encoding else 'iso-8859-9'
+        encoding = encoding if encoding else 'iso-8859-9'
         with open(debug_filepath, "w", encoding=encoding) as f:
-            f.write(response.text)
+            f.write(html)
         logger.warning(f"Duyuru {page_type} sayfası yapısı anlaşılamadı. HTML incelenmek üzere kaydedildi: {debug_filepath}")
     except Exception as e:
         logger.error(f"Debug HTML dosyası kaydedilirken hata oluştu: {e}")
 
 
-def archive_announcements_for_course(course: Course, session: requests.Session):
-    """
-    Fetches, parses, and saves all announcements for a given course.
-    """
-    logger.verbose(f"'{course.code} (CRN: {course.crn})' için duyurular arşivleniyor...")
-
+def announcements_folder(course: Course) -> str:
+    """Dersin duyuru klasörünün yolunu döner, klasör yoksa oluşturur."""
     unique_folder_name = f"{course.code} (CRN {course.crn})"
     sanitized_folder_name = sanitize_filename(unique_folder_name)
     course_base_path = join(globals.BASE_PATH, sanitized_folder_name)
     
     announcements_path = join(course_base_path, sanitize_filename("Duyurular"))
     os.makedirs(announcements_path, exist_ok=True)
+    return announcements_path
+
+
+def archive_announcements_for_course(course: Course):
+    """
+    Fetches, parses, and saves all announcements for a given course.
+    """
+    session = globals.worker_session()
+    logger.verbose(f"'{course.code} (CRN: {course.crn})' için duyurular arşivleniyor...")
+
+    announcements_path = announcements_folder(course)
 
     try:
         announcements_list_url = URL + course.link + DUYURULAR_URL_EXTENSION
         logger.verbose(f"Duyuru listesi sayfası alınıyor: {announcements_list_url}")
         response = session.get(announcements_list_url)
         response.raise_for_status()
+
+        if http_cache.is_unchanged(response) and "refresh" not in globals.ARGV:
+            logger.verbose(f"CRN {course.crn} duyuru listesi son çalıştırmadan beri değişmemiş. Atlanıyor.")
+            return
         
-        _parse_and_save_announcements(response, announcements_path, course.crn, session)
+        _parse_and_save_announcements(response, announcements_path, course.crn)
 
     except Exception as e:
         logger.error(f"'{course.code}' dersi için duyurular alınırken hata oluştu: {e}")
 
 
-def _parse_and_save_announcements(list_page_response: requests.Response, destination_folder: str, course_crn: str, session: requests.Session):
+def parse_announcement_list(list_html: str) -> list[str]:
+    """
+    Duyuru listesi sayfasındaki her duyurunun detay sayfası linkini döner.
+    Sayfada 'div.duyuruGoruntule' yapısı yoksa None döner.
+    """
+    return parsers.announcement_links(list_html)
+
+
+def parse_announcement_detail(detail_html: str, announcement_id: str) -> Announcement:
+    """
+    Duyuru detay sayfasını ayrıştırır. Sayfa beklenen yapıda değilse None döner.
+    """
+    fields = parsers.announcement_detail(detail_html)
+    if fields is None:
+        return None
+
+    if not all(field is not None for field in fields):
+        logger.verbose(f"Duyuru {announcement_id} detay sayfası beklenen yapıda değil, atlanıyor.")
+        return None
+
+    # Fix Turkish characters for all text fields
+    title, author, date_str, content = map(fix_turkish_characters, fields)
+    return Announcement(title=title, author=author, date_str=date_str, content=content)
+
+
+def announcement_filename(announcement: Announcement) -> str:
+    """Duyurunun tarihe göre sıralanabilir 'YYYY-MM-DD - başlık.txt' dosya adını döner."""
+    # --- Date parsing for creating a sortable filename (YYYY-MM-DD) ---
+    date_str_fixed = announcement.date_str
+    formatted_date = "Tarih-Bulunamadı"
+    try:
+        parts = date_str_fixed.split()
+        if len(parts) >= 3:
+            day = parts[0].zfill(2)
+            month_name = parts[1]
+            year = parts[2]
+            month_num = MONTH_MAP.get(month_name, "00")
+            formatted_date = f"{year}-{month_num}-{day}"
+    except Exception as e:
+        logger.warning(f"Tarih ayrıştırılamadı: '{date_str_fixed}'. Ham tarih kullanılacak. Hata: {e}")
+        formatted_date = re.sub(r'[\s:.]', '_', date_str_fixed)
+
+    sanitized_title = sanitize_filename(announcement.title)
+    return f"{formatted_date} - {sanitized_title}.txt"
+
+
+def announcement_id_from_link(detail_link: str) -> str:
+    return detail_link.split('/')[-1]
+
+
+def is_detail_fetch_needed(course_crn: str, announcement_id: str) -> bool:
     """
-    Parses the announcement list page, visits each announcement's detail page,
-    and saves the full content.
+    Daha önce arşivlenmiş duyuruların detay sayfası tekrar istenmez.
+    -refresh verilmişse tüm duyurular tekrar alınır.
     """
-    list_soup = BeautifulSoup(list_page_response.text, "lxml")
-    announcements_found = 0
+    if "refresh" in globals.ARGV:
+        return True
+    return not DB.is_announcement_archived(course_crn, announcement_id)
 
-    # Step 1: Get all announcement blocks from the list page
-    announcement_items = list_soup.select("div.duyuruGoruntule")
 
-    if not announcement_items:
+def save_announcement(announcement: Announcement, destination_folder: str, course_crn: str, announcement_id: str) -> bool:
+    """
+    Duyuruyu metin dosyası olarak kaydeder ve veritabanına işler.
+    Dosya zaten varsa yazmaz ve False döner. -refresh verilmişse dosya, aynı isimli başka bir
+    duyuruya ait değilse üzerine yazılır; aynı isimli duyurulardan her iki durumda da ilk
+    kaydedilen korunur.
+    """
+    full_path = join(destination_folder, announcement_filename(announcement))
+    owner = DB.get_announcement_owner(full_path)
+    is_own_file = owner is None or owner == (course_crn, announcement_id)
+
+    if exists(full_path) and ("refresh" not in globals.ARGV or not is_own_file):
+        logger.verbose(f"Duyuru '{full_path}' zaten mevcut. Atlanıyor.")
+        DB.add_announcement(course_crn, announcement_id, full_path if is_own_file else None)
+        return False
+
+    with open(full_path, "w", encoding="utf-8") as f:
+        f.write(f"Başlık: {announcement.title}\n")
+        f.write(f"Yayınlayan: {announcement.author}\n")
+        f.write(f"Tarih: {announcement.date_str}\n")
+        f.write("="*40 + "\n\n")
+        f.write(announcement.content)
+    DB.add_announcement(course_crn, announcement_id, full_path)
+    logger.new_file(full_path)
+    return True
+
+
+def fetch_announcement(course_crn: str, detail_link: str) -> Announcement:
+    """
+    Duyurunun detay sayfasını alıp ayrıştırır. Sayfa alınamadı veya ayrıştırılamadıysa None döner;
+    ayrıştırılamayan sayfanın HTML'i debug klasörüne kaydedilir.
+    """
+    announcement_id = announcement_id_from_link(detail_link)
+    try:
+        # Step 2: Visit the detail page for each announcement
+        detail_page_url = URL + detail_link
+        logger.verbose(f"Duyuru detay sayfası ziyaret ediliyor: {detail_page_url}")
+        
+        detail_response = globals.worker_session().get(detail_page_url)
+        detail_response.raise_for_status()
+
+        announcement = parse_announcement_detail(detail_response.text, announcement_id)
+        if announcement is None:
+            _dump_html_for_debug(course_crn, detail_response.text, detail_response.encoding, is_detail_page=True, detail_id=announcement_id)
+        return announcement
+
+    except Exception as e:
+        logger.warning(f"Bir duyuru ({detail_link}) işlenirken hata oluştu, atlanıyor: {e}")
+        return None
+
+
+def _save_or_warn(announcement: Announcement, destination_folder: str, course_crn: str, detail_link: str) -> bool:
+    try:
+        return save_announcement(announcement, destination_folder, course_crn, announcement_id_from_link(detail_link))
+    except Exception as e:
+        logger.warning(f"Bir duyuru ({detail_link}) kaydedilirken hata oluştu, atlanıyor: {e}")
+        return None
+
+
+class AnnouncementBatch:
+    """
+    Bir dersin duyurularını arşivler. Her detay sayfası zamanlayıcıda ayrı bir iş olarak alınır;
+    böylece aynı anda yapılan istekler zamanlayıcının eş zamanlılık sınırını (sunucu hata verirken
+    düşürülür) aşmaz. Son sayfa alındığında duyurular detail_links sırasıyla kaydedilir, aynı isimli
+    duyurulardan hangisinin yazılacağı sayfaların alınma sırasına bağlı olmaz.
+    Tüm duyurular hatasız arşivlenirse list_page_response (verilmişse) işlendi olarak işaretlenir.
+    """
+
+    def __init__(self, course_crn: str, destination_folder: str, detail_links: list[str], list_page_response: requests.Response = None):
+        self.course_crn = course_crn
+        self.destination_folder = destination_folder
+        self.detail_links = detail_links
+        self.list_page_response = list_page_response
+        self._announcements: list[Announcement] = [None] * len(detail_links)
+        self._remaining = len(detail_links)
+        self._lock = Lock()
+
+    def submit(self, group: str = None) -> None:
+        """Detay sayfalarını zamanlayıcıya ekler. Grup verilmezse çağıran işin grubu kullanılır."""
+        if not self.detail_links:
+            self._save_all()
+            return
+        for index in range(len(self.detail_links)):
+            Scheduler.submit(PRIORITY_LISTING, self._fetch, index, group=group)
+
+    def _fetch(self, index: int) -> None:
+        announcement = fetch_announcement(self.course_crn, self.detail_links[index])
+        with self._lock:
+            self._announcements[index] = announcement
+            self._remaining -= 1
+            if self._remaining:
+                return
+        self._save_all()
+
+    def _save_all(self) -> None:
+        saved_count = 0
+        failures = 0
+        for detail_link, announcement in zip(self.detail_links, self._announcements):
+            saved = None if announcement is None else _save_or_warn(announcement, self.destination_folder, self.course_crn, detail_link)
+            if saved is None:
+                failures += 1
+            elif saved:
+                saved_count += 1
+
+        if saved_count == 0 and self.detail_links:
+            logger.verbose(f"'{self.course_crn}' için işlem tamamlandı ancak hiçbir yeni duyuru dosyası oluşturulmadı (muhtemelen hepsi zaten vardı).")
+        if failures == 0 and self.list_page_response is not None:
+            http_cache.mark_processed(self.list_page_response)
+
+
+def _parse_and_save_announcements(list_page_response: requests.Response, destination_folder: str, course_crn: str) -> None:
+    """
+    Parses the announcement list page and queues the detail pages of the
+    announcements that are not archived yet (see AnnouncementBatch).
+    """
+    detail_links = parse_announcement_list(list_page_response.text)
+
+    if detail_links is None:
         logger.warning(f"CRN {course_crn} için 'div.duyuruGoruntule' yapısında duyuru bulunamadı.")
-        _dump_html_for_debug(course_crn, list_page_response)
+        _dump_html_for_debug(course_crn, list_page_response.text, list_page_response.encoding)
         return
 
-    logger.verbose(f"{len(announcement_items)} adet potansiyel duyuru linki bulundu.")
-
-    month_map = {
-        "Ocak": "01", "Şubat": "02", "Mart": "03", "Nisan": "04", "Mayıs": "05", "Haziran": "06",
-        "Temmuz": "07", "Ağustos": "08", "Eylül": "09", "Ekim": "10", "Kasım": "11", "Aralık": "12"
-    }
-
-    for item in announcement_items:
-        try:
-            title_link_element = item.select_one("h2 a")
-            if not title_link_element or not title_link_element.has_attr('href'):
-                continue
-
-            # Step 2: Visit the detail page for each announcement
-            detail_page_url = URL + title_link_element['href']
-            announcement_id = detail_page_url.split('/')[-1]
-            logger.verbose(f"Duyuru detay sayfası ziyaret ediliyor: {detail_page_url}")
-            
-            detail_response = session.get(detail_page_url)
-            detail_response.raise_for_status()
-            detail_soup = BeautifulSoup(detail_response.text, 'lxml')
-
-            # Step 3: Parse the content from the detail page
-            # The main content area is within div.orta > div.ic
-            container = detail_soup.select_one("div.orta > div.ic")
-            if not container:
-                _dump_html_for_debug(course_crn, detail_response, is_detail_page=True, detail_id=announcement_id)
-                continue
-
-            # The title is in an H1 tag. The rest of the content is in a 'duyuruGoruntule' block.
-            title_element = container.select_one("h1")
-            announcement_block = container.select_one("div.duyuruGoruntule")
-
-            # If the main block is missing, we can't proceed.
-            if not announcement_block:
-                logger.verbose(f"Duyuru {announcement_id} detay sayfasında 'div.duyuruGoruntule' bloğu bulunamadı.")
-                _dump_html_for_debug(course_crn, detail_response, is_detail_page=True, detail_id=announcement_id)
-                continue
-
-            # Now, find the elements relative to the announcement_block
-            date_and_author_spans = announcement_block.select("div.tarih > span.tarih")
-            content_element = announcement_block.select_one("div.icerik")
-
-            if not all([title_element, len(date_and_author_spans) >= 2, content_element]):
-                logger.verbose(f"Duyuru {announcement_id} detay sayfası beklenen yapıda değil, atlanıyor.")
-                _dump_html_for_debug(course_crn, detail_response, is_detail_page=True, detail_id=announcement_id)
-                continue
-
-            # Fix Turkish characters for all text fields
-            title = fix_turkish_characters(title_element.get_text(strip=True))
-            date_str_fixed = fix_turkish_characters(date_and_author_spans[0].get_text(strip=True))
-            author = fix_turkish_characters(date_and_author_spans[1].get_text(strip=True))
-            content = fix_turkish_characters(content_element.get_text("\n", strip=True))
-
-            # --- Date parsing for creating a sortable filename (YYYY-MM-DD) ---
-            formatted_date = "Tarih-Bulunamadı"
-            try:
-                parts = date_str_fixed.split()
-                if len(parts) >= 3:
-                    day = parts[0].zfill(2)
-                    month_name = parts[1]
-                    year = parts[2]
-                    month_num = month_map.get(month_name, "00")
-                    formatted_date = f"{year}-{month_num}-{day}"
-            except Exception as e:
-                logger.warning(f"Tarih ayrıştırılamadı: '{date_str_fixed}'. Ham tarih kullanılacak. Hata: {e}")
-                formatted_date = re.sub(r'[\s:.]', '_', date_str_fixed)
-
-            sanitized_title = sanitize_filename(title)
-            filename = f"{formatted_date} - {sanitized_title}.txt"
-            full_path = join(destination_folder, filename)
-
-            if not exists(full_path):
-                with open(full_path, "w", encoding="utf-8") as f:
-                    f.write(f"Başlık: {title}\n")
-                    f.write(f"Yayınlayan: {author}\n")
-                    f.write(f"Tarih: {date_str_fixed}\n")
-                    f.write("="*40 + "\n\n")
-                    f.write(content)
-                logger.new_file(full_path)
-                announcements_found += 1
-            else:
-                logger.verbose(f"Duyuru '{full_path}' zaten mevcut. Atlanıyor.")
-
-        except Exception as e:
-            # Check if title_link_element exists before trying to access its attributes in the error message
-            error_url_part = "Bilinmeyen URL"
-            if 'title_link_element' in locals() and title_link_element and title_link_element.has_attr('href'):
-                error_url_part = title_link_element['href']
-            logger.warning(f"Bir duyuru ({error_url_part}) işlenirken hata oluştu, atlanıyor: {e}")
+    logger.verbose(f"{len(detail_links)} adet potansiyel duyuru linki bulundu.")
+
+    pending_links = []
+    for detail_link in detail_links:
+        announcement_id = announcement_id_from_link(detail_link)
+        if not is_detail_fetch_needed(course_crn, announcement_id):
+            logger.debug(f"Duyuru {announcement_id} daha önce arşivlenmiş. Atlanıyor.")
             continue
+        pending_links.append(detail_link)
 
-    if announcements_found == 0 and announcement_items:
-        logger.verbose(f"'{course_crn}' için işlem tamamlandı ancak hiçbir yeni duyuru dosyası oluşturulmadı (muhtemelen hepsi zaten vardı).")
\ No newline at end of file
+    AnnouncementBatch(course_crn, destination_folder, pending_links, list_page_response).submit()
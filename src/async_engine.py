@@ -0,0 +1,437 @@
+# asyncio tabanlı indirme motoru (-engine async)
+# İş parçacığı motoruyla aynı klasör yapısını ve aynı veritabanı kayıtlarını üretir;
+# sayfaların ayrıştırılması ve dosyaların diske yerleştirilmesi için aynı fonksiyonları kullanır.
+# Tüm istekler tek bir aiohttp oturumunun bağlantı havuzu üzerinden yapılır.
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.kampus import Course
+    import requests
+
+import asyncio
+import os
+from os.path import join
+from time import perf_counter
+from zlib import crc32
+
+from src import logger
+
+try:
+    import aiohttp
+except ModuleNotFoundError:
+    logger.fail(
+        "'-engine async' için aiohttp kütüphanesi gerekli. Yüklemek için 'pip install -r requirements.txt' komutunu çalıştırın."
+    )
+from bs4 import BeautifulSoup
+
+from src import globals
+from src.login import URL, LOGIN_HOST
+from src.sessions import Sessions
+from src.utils import sanitize_filename, extract_filename, file_crc32, record_download, DOWNLOAD_CHUNK_SIZE
+from src.metrics import Metrics
+from src.resilience import MAX_ATTEMPTS, RETRY_STATUSES, backoff_delay, parse_retry_after
+from src.parsers import file_listing
+from src.downloader import (
+    SINIF_DOSYALARI_URL_EXTENSION,
+    DERS_DOSYALARI_URL_EXTENSION,
+    IncompleteDownloadError,
+    _is_already_archived,
+    _reuse_existing_file,
+    _is_folder_unchanged,
+    _part_paths,
+    _prepare_resume,
+    _start_part,
+    _handle_range_not_satisfiable,
+    _check_part_size,
+    _remove_part_files,
+    _store_downloaded_file,
+)
+from src.announcement_handler import (
+    DUYURULAR_URL_EXTENSION,
+    announcements_folder,
+    parse_announcement_list,
+    parse_announcement_detail,
+    announcement_id_from_link,
+    is_detail_fetch_needed,
+    _save_or_warn as _save_announcement_or_warn,
+    _dump_html_for_debug as _dump_announcement_html,
+)
+from src.homework_handler import (
+    HOMEWORK_URL_EXTENSION,
+    homeworks_folder,
+    parse_homework_list,
+    parse_homework_detail,
+    save_homework_details,
+    postback_request,
+    homework_id_from_link,
+    stored_homework,
+    detail_page_fingerprint,
+    _dump_html_for_debug as _dump_homework_html,
+)
+from src.db_handler import DB
+
+_DOWNLOAD_TIMEOUT = aiohttp.ClientTimeout(sock_connect=10, sock_read=60)
+_NETWORK_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, IncompleteDownloadError)
+
+
+class LoginExpiredError(Exception):
+    """Tekrar giriş yapıldıktan sonra da istek giriş sayfasına yönlendirildiğinde fırlatılır."""
+
+
+def run_async_engine(courses: list[Course]) -> None:
+    print("İndiriliyor... Bu işlem birkaç dakika sürebilir.")
+    asyncio.run(_run(courses))
+
+
+async def _run(courses: list[Course]) -> None:
+    connector = aiohttp.TCPConnector(
+        limit=globals.CONNECTION_LIMIT, limit_per_host=globals.HOST_CONNECTION_LIMIT
+    )
+    # Giriş çerezleri bu iş parçacığının oturumundan alınır; oturum süresi dolarsa aynı oturum
+    # Sessions.refresh_login ile yenilenir ve yeni çerezler aiohttp oturumuna kopyalanır
+    auth_session = Sessions.get()
+    cookies = {cookie.name: cookie.value for cookie in auth_session.cookies}
+    headers = dict(globals.SESSION.headers)
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_end.append(_record_response)
+    async with aiohttp.ClientSession(
+        connector=connector, cookies=cookies, headers=headers, trace_configs=[trace_config]
+    ) as client:
+        engine = _AsyncEngine(client, auth_session)
+        await asyncio.gather(*(engine.archive_course(course) for course in courses))
+
+
+async def _record_response(session, context, params: aiohttp.TraceRequestEndParams) -> None:
+    Metrics.inc("http_responses_total", status=params.response.status, course=Metrics.course_label())
+
+
+def _is_login_redirect(resp: aiohttp.ClientResponse) -> bool:
+    """login.is_login_redirect'in aiohttp karşılığı: yönlendirmelerden biri giriş sayfasına gittiyse True döner."""
+    return any(LOGIN_HOST in redirect.headers.get("Location", "") for redirect in resp.history)
+
+
+class _AsyncEngine:
+    def __init__(self, client: aiohttp.ClientSession, auth_session: requests.Session):
+        self.client = client
+        self.auth_session = auth_session
+        self._auth_lock = asyncio.Lock()
+
+    async def archive_course(self, course: Course) -> None:
+        unique_folder_name = f"{course.code} (CRN {course.crn})"
+        # Her ders ayrı bir görevde çalışır, alt görevler dersin adını bu görevden devralır
+        Metrics.set_course(unique_folder_name)
+        subdir_name = join(globals.BASE_PATH, sanitize_filename(unique_folder_name))
+        os.makedirs(subdir_name, exist_ok=True)
+
+        results = await asyncio.gather(
+            self._archive_listing(URL + course.link + SINIF_DOSYALARI_URL_EXTENSION, join(subdir_name, sanitize_filename("Sınıf Dosyaları"))),
+            self._archive_listing(URL + course.link + DERS_DOSYALARI_URL_EXTENSION, join(subdir_name, sanitize_filename("Ders Dosyaları"))),
+            self._archive_announcements(course),
+            self._archive_homeworks(course),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"'{course.code}' dersi arşivlenirken hata oluştu: {result}")
+        logger.verbose(f"{unique_folder_name} tamamlandı.")
+
+    # --- HTTP ---
+
+    async def _request(self, method: str, url: str, **kwargs) -> aiohttp.ClientResponse:
+        """
+        İsteği gönderir; cevap 'async with' ile kapatılmalıdır. Oturum süresi dolduğu için giriş
+        sayfasına yönlendirilirse çerezler yenilenir (gerekirse tekrar giriş yapılır) ve istek bir kez
+        daha gönderilir. Yine yönlendirilirse LoginExpiredError fırlatılır.
+        """
+        generation = self.auth_session.auth_generation
+        resp = await self.client.request(method, url, **kwargs)
+        if not _is_login_redirect(resp):
+            return resp
+        resp.release()
+
+        await self._refresh_login(generation)
+        resp = await self.client.request(method, url, **kwargs)
+        if _is_login_redirect(resp):
+            resp.release()
+            raise LoginExpiredError(f"Tekrar giriş yapıldıktan sonra da {url} giriş sayfasına yönlendirildi.")
+        return resp
+
+    async def _refresh_login(self, generation: int) -> None:
+        """
+        Çerezler generation kuşağındayken yönlendirilen istekler için çağrılır. Aynı anda yönlendirilen
+        istekler tek bir girişi bekler; giriş ayrı iş parçacığında yapıldığı için olay döngüsü bloklanmaz.
+        """
+        async with self._auth_lock:
+            if self.auth_session.auth_generation != generation:
+                return  # Başka bir istek bu arada çerezleri yeniledi
+            await asyncio.to_thread(Sessions.refresh_login, self.auth_session)
+            self.client.cookie_jar.update_cookies({cookie.name: cookie.value for cookie in self.auth_session.cookies})
+
+    async def _get_html(self, url: str) -> tuple[str, str]:
+        """
+        Sayfayı alır ve requests'in response.text ile aynı şekilde çözülmüş metni ve kodlamayı döner.
+        (charset verilmemiş HTML sayfaları requests'te ISO-8859-1 olarak çözülür.)
+        """
+        body, charset = await self._get(url)
+        encoding = charset or "ISO-8859-1"
+        return body.decode(encoding, errors="replace"), encoding
+
+    async def _get_bytes(self, url: str) -> bytes:
+        body, _ = await self._get(url)
+        return body
+
+    async def _get(self, url: str) -> tuple[bytes, str]:
+        """
+        Sayfanın gövdesini ve charset'ini döner. Bağlantı hataları ve RETRY_STATUSES cevapları
+        resilience modülündeki bekleme süreleriyle (Retry-After dahil) tekrar denenir.
+        """
+        for attempt in range(MAX_ATTEMPTS):
+            is_last = attempt == MAX_ATTEMPTS - 1
+            try:
+                async with await self._request("GET", url) as resp:
+                    if resp.status not in RETRY_STATUSES or is_last:
+                        resp.raise_for_status()
+                        return await resp.read(), resp.charset
+                    reason, retry_after = resp.status, parse_retry_after(resp.headers.get("Retry-After"))
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if is_last:
+                    raise
+                reason, retry_after = type(e).__name__, None
+
+            delay = backoff_delay(attempt, retry_after)
+            Metrics.inc("http_retries_total", reason=reason)
+            logger.verbose(f"{url} isteği başarısız ({reason}), {delay:.1f} saniye sonra tekrar denenecek ({attempt + 1}/{MAX_ATTEMPTS}).")
+            await asyncio.sleep(delay)
+
+    # --- Sınıf / Ders Dosyaları ---
+
+    async def _archive_listing(self, listing_url: str, destination_folder: str) -> None:
+        os.makedirs(destination_folder, exist_ok=True)
+        raw_html = (await self._get_bytes(listing_url)).decode("utf-8")
+
+        rows = await asyncio.to_thread(file_listing, raw_html)
+        skip_files = _is_folder_unchanged(listing_url, rows)
+        tasks = []
+        for file_link, file_size, isFolder, file_name in rows:
+            if isFolder:
+                subdir_name = join(destination_folder, sanitize_filename(file_name))
+                tasks.append(self._archive_listing(URL + file_link, subdir_name))
+            elif not skip_files:
+                tasks.append(self._download_file(URL + file_link, destination_folder))
+
+        for result in await asyncio.gather(*tasks, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.error(f"{destination_folder} klasöründe bir iş hata ile sonlandı: {result}")
+
+    async def _download_file(self, file_url: str, destination_folder: str) -> bool:
+        if _is_already_archived(file_url) or _reuse_existing_file(file_url, destination_folder):
+            return True
+
+        part_path, meta_path = _part_paths(destination_folder, file_url)
+        file_hash = None
+        downloaded_filename = None
+
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                meta, offset, headers = _prepare_resume(part_path, meta_path, file_url)
+
+                async with await self._request("GET", file_url, headers=headers, timeout=_DOWNLOAD_TIMEOUT) as resp:
+                    if resp.status == 416 and offset > 0:
+                        downloaded_filename, file_hash = await asyncio.to_thread(
+                            _handle_range_not_satisfiable, part_path, meta_path, meta, offset
+                        )
+                        break
+
+                    resp.raise_for_status()
+
+                    meta, resumed = _start_part(resp.status, resp.headers, offset, meta, meta_path, file_url)
+                    downloaded_filename = meta["filename"]
+                    if resumed:
+                        logger.verbose(f"Resuming {file_url} from byte {offset}.")
+                        file_hash = await _stream_to_file(resp, part_path, "ab", await asyncio.to_thread(file_crc32, part_path))
+                    else:
+                        file_hash = await _stream_to_file(resp, part_path)
+
+                _check_part_size(part_path, meta, file_url)
+                break
+
+            except _NETWORK_ERRORS as e:
+                file_hash = None
+                # Sadece RETRY_STATUSES cevapları tekrar denenir; 403/404 gibi hatalarda dosya hemen atlanır
+                if isinstance(e, aiohttp.ClientResponseError) and e.status not in RETRY_STATUSES:
+                    logger.error(f"Download failed for {file_url}. Skipping file. Error: {e}")
+                    Metrics.inc("files_failed_total", course=Metrics.course_label())
+                    return False
+                if attempt < MAX_ATTEMPTS - 1:
+                    headers = getattr(e, "headers", None) or {}
+                    delay = backoff_delay(attempt, parse_retry_after(headers.get("Retry-After")))
+                    logger.warning(f"Download failed for {file_url} on attempt {attempt + 1}/{MAX_ATTEMPTS}. Retrying in {delay:.1f}s... Error: {e}")
+                    await asyncio.sleep(delay)
+                else:
+                    logger.error(f"All download attempts failed for {file_url}. Skipping file. The partial download is kept and will be resumed on the next run.")
+                    Metrics.inc("files_failed_total", course=Metrics.course_label())
+                    return False
+            except IOError as e:
+                _remove_part_files(part_path, meta_path)
+                logger.error(f"Failed to write partial file for {file_url}: {e}")
+                return False
+
+        if not downloaded_filename or file_hash is None:
+            logger.warning(f"Filename or binary content could not be determined for {file_url} after retries.")
+            _remove_part_files(part_path, meta_path)
+            return False
+
+        # Var olan dosyanın hash'i diskten okunabileceği için olay döngüsünü bloklamamak adına ayrı iş parçacığında çalışır
+        return await asyncio.to_thread(
+            _store_downloaded_file, part_path, meta_path, file_hash, downloaded_filename, destination_folder, file_url
+        )
+
+    # --- Duyurular ---
+
+    async def _archive_announcements(self, course: Course) -> None:
+        logger.verbose(f"'{course.code} (CRN: {course.crn})' için duyurular arşivleniyor...")
+        destination_folder = announcements_folder(course)
+
+        list_html, encoding = await self._get_html(URL + course.link + DUYURULAR_URL_EXTENSION)
+        detail_links = await asyncio.to_thread(parse_announcement_list, list_html)
+        if detail_links is None:
+            logger.warning(f"CRN {course.crn} için 'div.duyuruGoruntule' yapısında duyuru bulunamadı.")
+            _dump_announcement_html(course.crn, list_html, encoding)
+            return
+
+        detail_links = [
+            detail_link for detail_link in detail_links
+            if is_detail_fetch_needed(course.crn, announcement_id_from_link(detail_link))
+        ]
+        pages = await asyncio.gather(
+            *(self._get_html(URL + detail_link) for detail_link in detail_links), return_exceptions=True
+        )
+        # Aynı isimli duyurularda hangisinin yazılacağı değişmesin diye kayıt liste sırasıyla yapılır
+        for detail_link, page in zip(detail_links, pages):
+            if isinstance(page, Exception):
+                logger.warning(f"Bir duyuru ({detail_link}) işlenirken hata oluştu, atlanıyor: {page}")
+                continue
+            detail_html, detail_encoding = page
+            announcement_id = announcement_id_from_link(detail_link)
+            announcement = await asyncio.to_thread(parse_announcement_detail, detail_html, announcement_id)
+            if announcement is None:
+                _dump_announcement_html(course.crn, detail_html, detail_encoding, is_detail_page=True, detail_id=announcement_id)
+                continue
+            await asyncio.to_thread(_save_announcement_or_warn, announcement, destination_folder, course.crn, detail_link)
+
+    # --- Ödevler ---
+
+    async def _archive_homeworks(self, course: Course) -> None:
+        logger.verbose(f"'{course.code} (CRN: {course.crn})' için ödevler arşivleniyor...")
+        destination_folder = homeworks_folder(course)
+
+        list_html, encoding = await self._get_html(URL + course.link.strip() + HOMEWORK_URL_EXTENSION)
+        if "debug" in globals.ARGV:
+            _dump_homework_html(course.crn, list_html, encoding, "Homework_List")
+
+        homeworks = await asyncio.to_thread(parse_homework_list, list_html)
+        if not homeworks:
+            logger.verbose(f"CRN {course.crn} için 'table.data td' yapısında ödev bulunamadı.")
+            return
+
+        results = await asyncio.gather(
+            *(self._archive_homework(course, detail_link, list_fingerprint, destination_folder) for detail_link, list_fingerprint in homeworks),
+            return_exceptions=True,
+        )
+        for (detail_link, _), result in zip(homeworks, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Bir ödev ({URL + detail_link}) işlenirken hata oluştu, atlanıyor: {result}")
+
+    async def _archive_homework(self, course: Course, detail_link: str, list_fingerprint: str, destination_folder: str) -> None:
+        detail_page_url = URL + detail_link
+        homework_id = homework_id_from_link(detail_link)
+        stored = stored_homework(course.crn, homework_id)
+        if stored and stored.list_fingerprint == list_fingerprint:
+            logger.debug(f"Ödev {homework_id} değişmemiş. Atlanıyor.")
+            return
+
+        detail_html, encoding = await self._get_html(detail_page_url)
+        if "debug" in globals.ARGV:
+            _dump_homework_html(course.crn, detail_html, encoding, f"Homework_Detail_{homework_id}")
+
+        detail_fingerprint = await asyncio.to_thread(detail_page_fingerprint, detail_html)
+        if stored and stored.detail_fingerprint == detail_fingerprint:
+            logger.debug(f"Ödev {homework_id} detay sayfası değişmemiş. Atlanıyor.")
+            DB.add_homework(course.crn, homework_id, list_fingerprint, detail_fingerprint)
+            return
+
+        detail_soup = await asyncio.to_thread(BeautifulSoup, detail_html, "lxml")
+        detail = await asyncio.to_thread(parse_homework_detail, detail_soup, detail_page_url)
+        if detail is None:
+            return
+
+        homework_specific_folder = await asyncio.to_thread(save_homework_details, detail, destination_folder, detail_page_url)
+
+        tasks = [self._download_file(URL + link, homework_specific_folder) for link in detail.resource_links]
+        if detail.submitted_href:
+            if 'javascript:__doPostBack' in detail.submitted_href:
+                tasks.append(self._postback_download(detail_soup, detail.submitted_href, homework_specific_folder))
+            else:
+                tasks.append(self._download_file(URL + detail.submitted_href, homework_specific_folder))
+        if all(await asyncio.gather(*tasks)):
+            DB.add_homework(course.crn, homework_id, list_fingerprint, detail_fingerprint)
+
+    async def _postback_download(self, page_soup: BeautifulSoup, href_value: str, destination_folder: str) -> bool:
+        request = postback_request(page_soup, href_value)
+        if request is None:
+            return False
+        post_url, post_data = request
+
+        try:
+            async with await self._request("POST", post_url, data=post_data, timeout=_DOWNLOAD_TIMEOUT) as resp:
+                resp.raise_for_status()
+                filename = extract_filename(resp.headers.get('content-disposition', '')) or "teslim_edilen_dosya.zip"
+                file_path = join(destination_folder, sanitize_filename(filename))
+                if os.path.exists(file_path):
+                    logger.verbose(f"Teslim edilen dosya '{file_path}' zaten mevcut. Atlanıyor.")
+                    return True
+                temp_path = file_path + ".tmp"
+                await _stream_to_file(resp, temp_path)
+            os.replace(temp_path, file_path)
+            logger.new_file(file_path)
+            return True
+        except _NETWORK_ERRORS as e:
+            logger.error(f"Postback ile dosya indirilirken hata oluştu: {e}")
+            return False
+
+
+async def _stream_to_file(resp: aiohttp.ClientResponse, file_path: str, mode: str = "wb", initial_crc: int = 0) -> int:
+    """
+    utils.stream_to_file'ın aiohttp karşılığı: gövdeyi parça parça yazar ve crc32'sini döner.
+    Olay döngüsü bloklanmasın diye yazma ve crc32 hesabı ayrı iş parçacığında yapılır; ağdan gelen
+    küçük parçalar DOWNLOAD_CHUNK_SIZE'a ulaşana kadar biriktirilir.
+    """
+    file_crc = initial_crc
+    written = 0
+    write_seconds = 0.0
+    buffer = bytearray()
+    f = await asyncio.to_thread(open, file_path, mode)
+    try:
+        async for chunk in resp.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+            buffer += chunk
+            if len(buffer) >= DOWNLOAD_CHUNK_SIZE:
+                file_crc, seconds = await asyncio.to_thread(_write_chunk, f, buffer, file_crc)
+                write_seconds += seconds
+                written += len(buffer)
+                buffer.clear()
+        if buffer:
+            file_crc, seconds = await asyncio.to_thread(_write_chunk, f, buffer, file_crc)
+            write_seconds += seconds
+            written += len(buffer)
+    finally:
+        await asyncio.to_thread(f.close)
+    record_download(written, write_seconds)
+    return file_crc
+
+
+def _write_chunk(f, data: bytearray, file_crc: int) -> tuple[int, float]:
+    """Parçayı dosyaya yazar; güncellenmiş crc32'yi ve yazma süresini döner."""
+    start = perf_counter()
+    f.write(data)
+    return crc32(data, file_crc), perf_counter() - start
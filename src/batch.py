@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+# Toplu arşivleme modu (-batch hesaplar.json)
+# Dosyadaki her hesap ayrı bir süreçte, kendi oturumu, indirme klasörü ve veritabanı ile arşivlenir.
+# Süreçler birbirinden bağımsız olduğu için sınıf düzeyindeki paylaşılan durumlar (DB, Scheduler,
+# Metrics, Sessions) karışmaz. Her hesabın çıktısı kendi klasöründeki günlük dosyasına yazılır,
+# sonunda tüm hesapların özeti yazdırılır.
+#
+# Hesap dosyası örneği:
+# [
+#     {"username": "ogrenci1", "password": "env:NINOVA_SIFRE_1", "directory": "/arsiv/ogrenci1"},
+#     {"username": "ogrenci2", "password": "file:/etc/ninova/ogrenci2", "directory": "/arsiv/ogrenci2",
+#      "courses": ["BLG 101E", "21345"]}
+# ]
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stderr, redirect_stdout
+from os.path import join
+from time import perf_counter
+
+from src import logger
+from src.metrics import Metrics
+
+DEFAULT_BATCH_JOBS = 4
+BATCH_LOG_FILE_NAME = "ninova_arsivci.log"
+# Hesaplara aktarılmayan, sadece toplu moda ait bayraklar
+_BATCH_ONLY_FLAGS = ("batch", "jobs", "d", "u", "report", "prometheus")
+_SUMMARY_COUNTERS = {
+    "files": "files_downloaded_total",
+    "deduplicated": "files_deduplicated_total",
+    "failed": "files_failed_total",
+    "bytes": "downloaded_bytes_total",
+}
+
+
+def run_batch(argv: dict) -> None:
+    logger._DEBUG, logger._VERBOSE = ("debug" in argv, "verbose" in argv)
+    accounts_path = argv["batch"][0]
+    try:
+        accounts = load_accounts(accounts_path)
+    except (OSError, ValueError) as e:
+        logger.fail(f"Hesap dosyası okunamadı ({accounts_path}): {e}")
+
+    account_argv = {flag: params for flag, params in argv.items() if flag not in _BATCH_ONLY_FLAGS}
+    jobs = _get_job_count(argv, len(accounts))
+    print(f"{len(accounts)} hesap, {jobs} süreç ile arşivlenecek.")
+
+    results = []
+    start = perf_counter()
+    # Her hesap yeni bir süreçte çalışır (max_tasks_per_child=1), önceki hesabın durumu taşınmaz
+    with ProcessPoolExecutor(max_workers=jobs, max_tasks_per_child=1) as pool:
+        futures = {}
+        for account in accounts:
+            try:
+                password = resolve_secret(account["password"])
+            except (ValueError, OSError) as e:
+                results.append(_failed_result(account, f"Şifre alınamadı: {e}"))
+                continue
+            futures[pool.submit(archive_account, account, password, account_argv)] = account
+
+        for future in as_completed(futures):
+            account = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = _failed_result(account, f"Süreç hata ile sonlandı: {e}")
+            results.append(result)
+            status = "tamamlandı" if result["ok"] else f"başarısız ({result['error']})"
+            print(f"{account['username']}: {status}")
+
+    _print_summary(results, perf_counter() - start)
+    if "report" in argv:
+        try:
+            with open(argv["report"][0], "w", encoding="utf-8") as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            logger.warning(f"Toplu mod raporu yazılamadı: {e}")
+
+
+def load_accounts(path: str) -> list[dict]:
+    """Hesap dosyasını okur ve doğrular. Her hesapta username, password ve directory bulunmalıdır."""
+    with open(path, "r", encoding="utf-8") as f:
+        accounts = json.load(f)
+    if not isinstance(accounts, list) or not accounts:
+        raise ValueError("Dosya, hesaplardan oluşan boş olmayan bir liste içermeli.")
+    for index, account in enumerate(accounts):
+        missing = [key for key in ("username", "password", "directory") if not account.get(key)]
+        if missing:
+            raise ValueError(f"{index}. hesapta eksik alanlar: {', '.join(missing)}")
+        if not isinstance(account.get("courses", []), list):
+            raise ValueError(f"{index}. hesabın 'courses' alanı bir liste olmalı.")
+    return accounts
+
+
+def resolve_secret(reference: str) -> str:
+    """
+    Şifre referansını çözer: 'env:DEĞİŞKEN' ortam değişkeninden, 'file:YOL' dosyanın içeriğinden okunur.
+    Şifrelerin hesap dosyasına açık olarak yazılmaması için başka biçim kabul edilmez.
+    """
+    kind, _, value = reference.partition(":")
+    if kind == "env":
+        if value not in os.environ:
+            raise ValueError(f"'{value}' ortam değişkeni tanımlı değil")
+        return os.environ[value]
+    if kind == "file":
+        with open(value, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    raise ValueError("şifre 'env:DEĞİŞKEN' veya 'file:YOL' biçiminde verilmeli")
+
+
+def archive_account(account: dict, password: str, account_argv: dict) -> dict:
+    """Alt süreçte çalışır: hesabı arşivler ve özetini döner. Çıktı hesabın klasöründeki günlüğe yazılır."""
+    # Süreç içinde import edilir; ana süreç sadece hesapları dağıtır
+    from src import globals
+    from src.kampus import select_courses
+    from src.task_handler import archive
+
+    directory = account["directory"]
+    os.makedirs(directory, exist_ok=True)
+    argv = dict(account_argv, d=(directory,), u=(account["username"], password))
+
+    log_path = join(directory, BATCH_LOG_FILE_NAME)
+    result = {"username": account["username"], "directory": directory, "log": log_path, "ok": False, "error": None, "courses": 0}
+    start = perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log, redirect_stdout(log), redirect_stderr(log):
+        try:
+            globals.init_globals(argv, interactive=False)
+            courses = archive(lambda courses: select_courses(courses, account.get("courses")))
+            result["courses"] = len(courses)
+            result["ok"] = True
+        except (Exception, SystemExit) as e:
+            # logger.fail() programı exit() ile sonlandırır, mesajı günlüktedir
+            result["error"] = str(e) or "ayrıntılar günlükte"
+            logger.error(f"Hesap arşivlenemedi: {result['error']}")
+
+    result["seconds"] = perf_counter() - start
+    counters = Metrics.snapshot()["counters"]
+    for key, name in _SUMMARY_COUNTERS.items():
+        result[key] = int(sum(item["value"] for item in counters.get(name, [])))
+    return result
+
+
+def _get_job_count(argv: dict, account_count: int) -> int:
+    jobs = DEFAULT_BATCH_JOBS
+    if "jobs" in argv:
+        try:
+            jobs = int(argv["jobs"][0])
+        except ValueError:
+            logger.warning(f"-jobs parametresi bir sayı olmalı. Varsayılan değer ({DEFAULT_BATCH_JOBS}) kullanılacak.")
+    return max(1, min(jobs, account_count))
+
+
+def _failed_result(account: dict, error: str) -> dict:
+    result = {"username": account["username"], "directory": account["directory"], "log": None, "ok": False,
+              "error": error, "courses": 0, "seconds": 0.0}
+    result.update({key: 0 for key in _SUMMARY_COUNTERS})
+    return result
+
+
+def _print_summary(results: list[dict], elapsed: float) -> None:
+    print(f"\n{'Hesap':<20}{'Durum':>10}{'Ders':>6}{'Dosya':>8}{'Ortak':>7}{'Hata':>6}{'MB':>9}{'Süre (s)':>10}")
+    for result in sorted(results, key=lambda result: result["username"]):
+        status = "tamam" if result["ok"] else "HATA"
+        print(
+            f"{result['username'][:19]:<20}{status:>10}{result['courses']:>6}{result['files']:>8}"
+            f"{result['deduplicated']:>7}{result['failed']:>6}{result['bytes'] / 1024 / 1024:>9.1f}{result['seconds']:>10.1f}"
+        )
+    succeeded = sum(result["ok"] for result in results)
+    total_files = sum(result["files"] for result in results)
+    total_bytes = sum(result["bytes"] for result in results)
+    print(
+        f"\n{succeeded}/{len(results)} hesap tamamlandı, {total_files} yeni dosya "
+        f"({total_bytes / 1024 / 1024:.1f} MB), toplam süre {elapsed:.1f} saniye."
+    )
+    for result in results:
+        if not result["ok"]:
+            log_hint = f" (günlük: {result['log']})" if result["log"] else ""
+            logger.warning(f"{result['username']}: {result['error']}{log_hint}")
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+# İçerik adresli dosya deposu (-dedup)
+# Her dosya içeriği, sha256 özetiyle adlandırılarak indirme klasöründeki '.ninova_blobs'
+# klasöründe bir kez saklanır. Ders klasörlerindeki dosyalar bu içeriğe hardlink
+# (desteklenmiyorsa symlink, o da olmazsa kopya) olarak yerleştirilir. Böylece farklı
+# CRN'lerde veya hem Sınıf hem Ders Dosyaları'nda yayınlanan aynı dosya diskte bir kez yer kaplar.
+
+import os
+import shutil
+from os.path import abspath, exists, getsize, join
+
+from src import logger
+
+BLOB_FOLDER_NAME = ".ninova_blobs"
+
+
+def blob_folder(base_path: str) -> str:
+    return join(base_path, BLOB_FOLDER_NAME)
+
+
+def blob_path(base_path: str, digest: str) -> str:
+    # Tek klasörde çok sayıda dosya birikmemesi için ilk iki karaktere göre alt klasörlere ayrılır
+    return join(blob_folder(base_path), digest[:2], digest)
+
+
+def has_blob(base_path: str, digest: str, size: int) -> bool:
+    """Verilen özet ve boyutta bir içeriğin depoda bulunup bulunmadığını döner"""
+    path = blob_path(base_path, digest)
+    return exists(path) and (size is None or getsize(path) == size)
+
+
+def store_blob(file_path: str, base_path: str, digest: str) -> str:
+    """
+    Dosyayı depoya taşır ve deponun içindeki yolunu döner. Aynı içerik zaten depoda
+    varsa dosya silinir, mevcut içerik kullanılır.
+    """
+    path = blob_path(base_path, digest)
+    if exists(path):
+        os.unlink(file_path)
+        logger.verbose(f"İçerik depoda zaten var, tekrar saklanmadı: {digest[:12]}")
+        return path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(file_path, path)
+    return path
+
+
+def link_blob(path: str, destination: str) -> None:
+    """Depodaki içeriği destination'a hardlink, olmazsa symlink, o da olmazsa kopya olarak yerleştirir"""
+    try:
+        os.link(path, destination)
+        return
+    except OSError as e:
+        logger.debug(f"Hardlink oluşturulamadı ({e}), symlink deneniyor: {destination}")
+    try:
+        os.symlink(abspath(path), destination)
+        return
+    except OSError as e:
+        logger.debug(f"Symlink oluşturulamadı ({e}), dosya kopyalanıyor: {destination}")
+    shutil.copy2(path, destination)
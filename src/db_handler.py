@@ -1,22 +1,58 @@
 from collections import namedtuple
+import json
 import sqlite3
 from os.path import join, exists
 from os import remove as delete_file
 from enum import Enum
-from zlib import crc32
-from queue import Queue
+from queue import Empty, Queue
+from time import perf_counter, time
 import threading  # Import the threading module
 
 from src import logger
 from src import globals
+from src.metrics import Metrics, STAGE_DB_WRITE
 
 DATABASE_FILE_NAME = "ninova_arsivci.db"
-TABLE_CREATION_QUERY = "CREATE TABLE files (id INTEGER PRIMARY KEY, path TEXT UNIQUE, hash INT, isDeleted INT DEFAULT 0);"
+WRITER_BATCH_SIZE = 200  # bu kadar kayıt biriktiğinde hemen yazılır
+WRITER_COMMIT_INTERVAL = 5  # saniye, biriken kayıtlar en geç bu sürede yazılır
+TABLE_CREATION_QUERY = "CREATE TABLE files (id INTEGER PRIMARY KEY, path TEXT UNIQUE, hash INT, isDeleted INT DEFAULT 0, size INT, blob TEXT, mtime REAL);"
 TABLE_CHECK_QUERY = (
     "SELECT name FROM sqlite_master WHERE type='table' AND name='files';"
 )
-SELECT_FILE_BY_ID_QUERY = "SELECT isDeleted, id FROM files WHERE id = ?"
-FILE_INSERTION_QUERY = "INSERT INTO files (id, path, hash) VALUES (?, ?, ?)"
+SELECT_FILE_INDEX_QUERY = "SELECT id, isDeleted FROM files"
+SELECT_FILE_RECORDS_QUERY = "SELECT id, path, hash, size, mtime, blob FROM files WHERE path IS NOT NULL AND size IS NOT NULL AND mtime IS NOT NULL"
+# INSERT OR REPLACE, 'path UNIQUE' çakışmasında başka bir dosyanın kaydını sessizce silerdi; çakışmalar write_records'ta ele alınır
+FILE_INSERTION_QUERY = (
+    "INSERT INTO files (id, path, hash, size, mtime, blob) VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(id) DO UPDATE SET path = excluded.path, hash = excluded.hash, size = excluded.size, "
+    "mtime = excluded.mtime, blob = excluded.blob, isDeleted = 0"
+)
+SELECT_PATH_OWNER_QUERY = "SELECT id FROM files WHERE path = ?"
+FILE_COLUMNS_QUERY = "PRAGMA table_info(files)"
+# Eski sürümlerin oluşturduğu veritabanlarına sonradan eklenen sütunlar
+FILE_COLUMN_MIGRATIONS = {
+    "size": "ALTER TABLE files ADD COLUMN size INT",
+    "blob": "ALTER TABLE files ADD COLUMN blob TEXT",
+    "mtime": "ALTER TABLE files ADD COLUMN mtime REAL",
+}
+
+# Ek tablolar sonradan eklendiği için eski veritabanlarında da oluşturulabilmeleri adına IF NOT EXISTS kullanılır
+ANNOUNCEMENTS_TABLE_CREATION_QUERY = "CREATE TABLE IF NOT EXISTS announcements (crn TEXT, id TEXT, path TEXT, PRIMARY KEY (crn, id));"
+SELECT_ANNOUNCEMENTS_QUERY = "SELECT crn, id, path FROM announcements"
+ANNOUNCEMENT_INSERTION_QUERY = "INSERT OR REPLACE INTO announcements (crn, id, path) VALUES (?, ?, ?)"
+HOMEWORKS_TABLE_CREATION_QUERY = "CREATE TABLE IF NOT EXISTS homeworks (crn TEXT, id TEXT, list_fingerprint TEXT, detail_fingerprint TEXT, PRIMARY KEY (crn, id));"
+SELECT_HOMEWORKS_QUERY = "SELECT crn, id, list_fingerprint, detail_fingerprint FROM homeworks"
+HOMEWORK_INSERTION_QUERY = "INSERT OR REPLACE INTO homeworks (crn, id, list_fingerprint, detail_fingerprint) VALUES (?, ?, ?, ?)"
+COURSES_TABLE_CREATION_QUERY = "CREATE TABLE IF NOT EXISTS courses (link TEXT PRIMARY KEY, crn TEXT, code TEXT, name TEXT, fetched_at REAL);"
+SELECT_COURSES_QUERY = "SELECT link, crn, code, name, fetched_at FROM courses"
+COURSE_INSERTION_QUERY = "INSERT OR REPLACE INTO courses (link, crn, code, name, fetched_at) VALUES (?, ?, ?, ?, ?)"
+FOLDERS_TABLE_CREATION_QUERY = "CREATE TABLE IF NOT EXISTS folders (url TEXT PRIMARY KEY, fingerprint TEXT, file_ids TEXT);"
+SELECT_FOLDERS_QUERY = "SELECT url, fingerprint, file_ids FROM folders"
+FOLDER_INSERTION_QUERY = "INSERT OR REPLACE INTO folders (url, fingerprint, file_ids) VALUES (?, ?, ?)"
+# -f ile tamamen silinen tablolar. 'files' tablosu silinmez: kayıtlar sadece diskteki dosyaları
+# tanımak için kullanılır, dosyalar arşivlenmiş sayılmaz.
+RESET_TABLES = ("announcements", "homeworks", "courses", "folders")
+COURSE_CACHE_TTL = 7 * 24 * 60 * 60  # saniye, ders kodu ve adı bu süreden eski ise tekrar sorgulanır
 
 
 class FILE_STATUS(Enum):
@@ -25,7 +61,29 @@ class FILE_STATUS(Enum):
     EXISTS = 2
 
 
-FileRecord = namedtuple("FileRecord", "id, path")
+FileRecord = namedtuple("FileRecord", "id, path, hash, size, mtime, blob")
+# Diskteki dosyanın, hash'i hesaplandığı andaki boyutu ve değiştirilme zamanı
+PathRecord = namedtuple("PathRecord", "size, mtime, hash")
+# -dedup ile saklanan dosyanın içerik deposundaki özeti (sha256), crc32 hash'i ve boyutu
+FileBlob = namedtuple("FileBlob", "blob, hash, size")
+AnnouncementRecord = namedtuple("AnnouncementRecord", "crn, id, path")
+HomeworkRecord = namedtuple("HomeworkRecord", "crn, id, list_fingerprint, detail_fingerprint")
+CourseRecord = namedtuple("CourseRecord", "link, crn, code, name, fetched_at")
+# file_ids veritabanında JSON metni olarak saklanır
+FolderRecord = namedtuple("FolderRecord", "url, fingerprint, file_ids")
+# Klasör listesinin son çalıştırmadaki parmak izi ve listedeki dosyaların numaraları
+FolderListing = namedtuple("FolderListing", "fingerprint, file_ids")
+
+RECORD_INSERTION_QUERIES = {
+    FileRecord: FILE_INSERTION_QUERY,
+    AnnouncementRecord: ANNOUNCEMENT_INSERTION_QUERY,
+    HomeworkRecord: HOMEWORK_INSERTION_QUERY,
+    CourseRecord: COURSE_INSERTION_QUERY,
+    FolderRecord: FOLDER_INSERTION_QUERY,
+}
+
+
+_STOP_WRITER = object()
 
 
 class DB:
@@ -33,6 +91,20 @@ class DB:
     _thread_local = threading.local()
     to_add = Queue()
     db_path: str
+    _writer: threading.Thread = None
+    # Sorgu yapmadan dosya durumuna bakabilmek için 'files' tablosunun bellekteki kopyası: id -> isDeleted
+    file_index: dict[int, bool] = {}
+    file_blobs: dict[int, FileBlob] = {}
+    path_index: dict[str, PathRecord] = {}
+    # Boyutu ve değiştirilme zamanı bilinen dosya kayıtları: id -> FileRecord (-f ile sıfırlanmaz)
+    known_files: dict[int, FileRecord] = {}
+    _index_lock = threading.Lock()
+    archived_announcements: set[tuple[str, str]] = set()
+    # Duyuru dosyası yolu -> dosyayı yazan duyuru (crn, id). Aynı isimli duyurulardan hangisinin dosyası olduğunu belirler.
+    announcement_paths: dict[str, tuple[str, str]] = {}
+    homework_index: dict[tuple[str, str], HomeworkRecord] = {}
+    course_index: dict[str, CourseRecord] = {}
+    folder_index: dict[str, FolderListing] = {}
 
     @classmethod
     def get_thread_safe_connection(cls):
@@ -44,7 +116,11 @@ class DB:
         if not hasattr(cls._thread_local, "connection"):
             # If not, create a new one and store it in the thread-local storage
             try:
-                cls._thread_local.connection = sqlite3.connect(cls.db_path, check_same_thread=True)
+                connection = sqlite3.connect(cls.db_path, check_same_thread=True)
+                # WAL, yazma sırasında okumaları bloklamaz ve her commit'te daha az fsync yapar
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+                cls._thread_local.connection = connection
                 logger.debug(f"Thread {threading.get_ident()} created a new DB connection.")
             except Exception as e:
                 logger.fail(f"Veritabanına bağlanılamadı: {e}")
@@ -56,62 +132,235 @@ class DB:
         Initializes the DB path and prepares the database file for the main thread.
         """
         cls.db_path = join(globals.BASE_PATH, DATABASE_FILE_NAME)
-        if globals.FIRST_RUN:
-            if exists(cls.db_path):
-                delete_file(cls.db_path)
+        if globals.FIRST_RUN and exists(cls.db_path) and not cls._has_files_table():
+            # -f ile bozuk bir veritabanı baştan oluşturulur
+            delete_file(cls.db_path)
         
         # Get a connection for the main thread and set up the table
         main_conn = cls.get_thread_safe_connection()
         cursor = main_conn.cursor()
         
-        if globals.FIRST_RUN:
+        cursor.execute(TABLE_CHECK_QUERY)
+        result = cursor.fetchone()
+        if result and result[0] == "files":
+            cls._migrate_file_columns(cursor)
+        elif globals.FIRST_RUN:
             cursor.execute(TABLE_CREATION_QUERY)
             logger.verbose("Veritabanı ilk çalıştırma için hazırlandı.")
         else:
-            cursor.execute(TABLE_CHECK_QUERY)
-            result = cursor.fetchone()
-            if not result or result[0] != "files":
-                logger.fail(
-                    f"Veritabanı bozuk. '{DATABASE_FILE_NAME}' dosyasını silip tekrar başlatın. Silme işlemi sonrasında tüm dosyalar yeniden indirilir."
-                )
+            logger.fail(
+                f"Veritabanı bozuk. '{DATABASE_FILE_NAME}' dosyasını silip tekrar başlatın. Silme işlemi sonrasında tüm dosyalar yeniden indirilir."
+            )
+
+        if globals.FIRST_RUN:
+            # -f: Dosyalar arşivlenmemiş sayılır ve tekrar kontrol edilir. Kayıtlardaki boyut, değiştirilme
+            # zamanı ve hash bilgileri ise diskte değişmemiş dosyaların tekrar indirilmemesi için korunur.
+            for table in RESET_TABLES:
+                cursor.execute(f"DROP TABLE IF EXISTS {table}")
+            cls.file_index = {}
+        else:
+            cursor.execute(SELECT_FILE_INDEX_QUERY)
+            cls.file_index = {file_id: bool(deleted) for file_id, deleted in cursor.fetchall()}
+        logger.debug(f"Dosya indeksine {len(cls.file_index)} kayıt yüklendi.")
+        cursor.execute(SELECT_FILE_RECORDS_QUERY)
+        cls.known_files = {record.id: record for record in map(FileRecord._make, cursor.fetchall())}
+        cls.path_index = {record.path: PathRecord(record.size, record.mtime, record.hash) for record in cls.known_files.values()}
+        cls.file_blobs = {
+            record.id: FileBlob(record.blob, record.hash, record.size) for record in cls.known_files.values() if record.blob
+        }
+
+        cursor.execute(ANNOUNCEMENTS_TABLE_CREATION_QUERY)
+        cursor.execute(SELECT_ANNOUNCEMENTS_QUERY)
+        announcement_records = [AnnouncementRecord._make(row) for row in cursor.fetchall()]
+        cls.archived_announcements = {(record.crn, record.id) for record in announcement_records}
+        cls.announcement_paths = {record.path: (record.crn, record.id) for record in announcement_records if record.path}
+
+        cursor.execute(HOMEWORKS_TABLE_CREATION_QUERY)
+        cursor.execute(SELECT_HOMEWORKS_QUERY)
+        cls.homework_index = {
+            (record.crn, record.id): record for record in map(HomeworkRecord._make, cursor.fetchall())
+        }
+
+        cursor.execute(COURSES_TABLE_CREATION_QUERY)
+        cursor.execute(SELECT_COURSES_QUERY)
+        cls.course_index = {
+            record.link: record for record in map(CourseRecord._make, cursor.fetchall())
+        }
+
+        cursor.execute(FOLDERS_TABLE_CREATION_QUERY)
+        cursor.execute(SELECT_FOLDERS_QUERY)
+        cls.folder_index = {
+            url: FolderListing(folder_fingerprint, tuple(json.loads(file_ids)))
+            for url, folder_fingerprint, file_ids in cursor.fetchall()
+        }
         cursor.close()
+        main_conn.commit()
+
+        cls._start_writer()
 
     @classmethod
-    def check_file_status(cls, file_id: int, cursor: sqlite3.Cursor):
+    def _start_writer(cls):
         """
-        Checks the database for a given file_id using the provided cursor.
+        Kuyruktaki kayıtları çalışma boyunca veritabanına yazan arka plan iş parçacığını başlatır.
+        Böylece program yarıda kesilse bile o ana kadar indirilen dosyalar kayıtlı kalır.
         """
+        cls._writer = threading.Thread(target=cls._write_loop, name="db-writer", daemon=True)
+        cls._writer.start()
+
+    @classmethod
+    def stop_writer(cls):
+        """Kuyrukta kalan kayıtları yazar ve yazıcı iş parçacığını durdurur."""
+        if cls._writer is None:
+            return
+        cls.to_add.put(_STOP_WRITER)
+        cls._writer.join()
+        cls._writer = None
+
+    @classmethod
+    def _has_files_table(cls) -> bool:
+        """Mevcut veritabanı dosyasının okunabildiğini ve 'files' tablosunu içerdiğini döner."""
         try:
-            logger.debug(f"file_id ile sorgu çalıştırılıyor: {file_id}")
-            cursor.execute(SELECT_FILE_BY_ID_QUERY, (file_id,))
-            file = cursor.fetchone()
-            logger.debug(f"file_id {file_id} için sorgu sonucu: {file}")
-            
-            if file:
-                deleted, id = file
-                if file_id != id:
-                    logger.fail(
-                        "Eş zamanlı erişim nedeniyle bir race condition oluştu. Veritabanından gelen bilgi bu dosyaya ait değil. Geliştiriciye bildirin."
-                    )
-                if deleted:
-                    return FILE_STATUS.DELETED
-                else:
-                    return FILE_STATUS.EXISTS
-            else:
-                return FILE_STATUS.NEW
-        except sqlite3.InterfaceError as e:
-            logger.error(f"SQLite InterfaceError for file_id {file_id}: {e}")
-            raise
-        except sqlite3.Error as e:
-            logger.error(f"SQLite Hatası for file_id {file_id}: {e}")
-            raise
-        except Exception as e:
-            logger.error(f"check_file_status fonksiyonunda beklenmeyen hata for file_id {file_id}: {e}")
-            raise
+            connection = sqlite3.connect(cls.db_path)
+            try:
+                return connection.execute(TABLE_CHECK_QUERY).fetchone() is not None
+            finally:
+                connection.close()
+        except sqlite3.Error:
+            return False
+
+    @classmethod
+    def _migrate_file_columns(cls, cursor: sqlite3.Cursor):
+        """Eski veritabanlarının 'files' tablosuna eksik sütunları ekler."""
+        cursor.execute(FILE_COLUMNS_QUERY)
+        existing_columns = {row[1] for row in cursor.fetchall()}
+        for column, query in FILE_COLUMN_MIGRATIONS.items():
+            if column not in existing_columns:
+                cursor.execute(query)
+                logger.verbose(f"Veritabanına '{column}' sütunu eklendi.")
+
+    @classmethod
+    def check_file_status(cls, file_id: int) -> FILE_STATUS:
+        """
+        Returns the status of the given file_id from the in-memory index that is
+        loaded in init() and kept up to date by add_file().
+        """
+        with cls._index_lock:
+            deleted = cls.file_index.get(file_id)
+        logger.debug(f"file_id {file_id} için indeks sonucu: {deleted}")
+
+        if deleted is None:
+            return FILE_STATUS.NEW
+        if deleted:
+            return FILE_STATUS.DELETED
+        return FILE_STATUS.EXISTS
+
+    @classmethod
+    def add_file(cls, id: int, path: str, hash: int, size: int, mtime: float, blob: str = None):
+        """
+        Queues a downloaded file for the DB. The hash and size are the ones
+        computed while the file was being downloaded, so the file is not read again.
+        mtime is the modification time of the file at path right after it was stored.
+        blob is the content store digest when the file is stored with -dedup.
+        """
+        record = FileRecord(id, path, hash, size, mtime, blob)
+        with cls._index_lock:
+            cls.file_index[id] = False
+            cls.path_index[path] = PathRecord(size, mtime, hash)
+            if mtime is not None:
+                cls.known_files[id] = record
+            if blob:
+                cls.file_blobs[id] = FileBlob(blob, hash, size)
+        cls.to_add.put(record)
+
+    @classmethod
+    def get_cached_hash(cls, path: str, size: int, mtime: float) -> int:
+        """
+        Diskteki dosyanın kayıtlı hash'ini döner. Dosyanın boyutu veya değiştirilme zamanı
+        kayıttakinden farklıysa (kayıt eskimişse) ya da kayıt yoksa None döner.
+        """
+        with cls._index_lock:
+            record = cls.path_index.get(path)
+        if record is None or record.size != size or record.mtime != mtime:
+            return None
+        return record.hash
 
     @classmethod
-    def add_file(cls, id: int, path: str):
-        cls.to_add.put(FileRecord(id, path))
+    def get_known_file(cls, file_id: int) -> FileRecord:
+        """Dosyanın kayıtlı yolunu, boyutunu, değiştirilme zamanını ve hash'ini döner (-f ile sıfırlanmaz)."""
+        with cls._index_lock:
+            return cls.known_files.get(file_id)
+
+    @classmethod
+    def get_file_blob(cls, file_id: int) -> FileBlob:
+        """Dosyanın içerik deposundaki kaydını döner, -dedup ile saklanmamışsa None döner."""
+        with cls._index_lock:
+            return cls.file_blobs.get(file_id)
+
+    @classmethod
+    def is_announcement_archived(cls, crn: str, announcement_id: str) -> bool:
+        """Duyurunun daha önce (önceki bir çalıştırmada veya -watch ile önceki bir turda) arşivlenip arşivlenmediğini döner."""
+        with cls._index_lock:
+            return (crn, announcement_id) in cls.archived_announcements
+
+    @classmethod
+    def get_announcement_owner(cls, path: str) -> tuple[str, str]:
+        """Yoldaki duyuru dosyasını yazan duyurunun (crn, id) bilgisini döner, kayıt yoksa None döner."""
+        with cls._index_lock:
+            return cls.announcement_paths.get(path)
+
+    @classmethod
+    def add_announcement(cls, crn: str, announcement_id: str, path: str):
+        """path None ise duyuru aynı isimli başka bir duyurunun dosyası yüzünden kaydedilmemiştir."""
+        with cls._index_lock:
+            cls.archived_announcements.add((crn, announcement_id))
+            if path:
+                cls.announcement_paths[path] = (crn, announcement_id)
+        cls.to_add.put(AnnouncementRecord(crn, announcement_id, path))
+
+    @classmethod
+    def get_homework(cls, crn: str, homework_id: str) -> HomeworkRecord:
+        """Ödevin son kaydedilen parmak izlerini döner, kayıt yoksa None döner."""
+        with cls._index_lock:
+            return cls.homework_index.get((crn, homework_id))
+
+    @classmethod
+    def add_homework(cls, crn: str, homework_id: str, list_fingerprint: str, detail_fingerprint: str):
+        record = HomeworkRecord(crn, homework_id, list_fingerprint, detail_fingerprint)
+        with cls._index_lock:
+            cls.homework_index[(crn, homework_id)] = record
+        cls.to_add.put(record)
+
+    @classmethod
+    def get_cached_course(cls, link: str) -> CourseRecord:
+        """Dersin kayıtlı kodunu ve adını döner. Kayıt yoksa veya COURSE_CACHE_TTL'den eskiyse None döner."""
+        record = cls.course_index.get(link)
+        if record is None or time() - record.fetched_at > COURSE_CACHE_TTL:
+            return None
+        return record
+
+    @classmethod
+    def add_course(cls, link: str, crn: str, code: str, name: str):
+        record = CourseRecord(link, crn, code, name, time())
+        cls.course_index[link] = record
+        cls.to_add.put(record)
+
+    @classmethod
+    def get_folder(cls, url: str) -> FolderListing:
+        """Klasör listesinin önceki çalıştırmadaki kaydını döner, kayıt yoksa None döner."""
+        with cls._index_lock:
+            return cls.folder_index.get(url)
+
+    @classmethod
+    def add_folder(cls, url: str, fingerprint: str, file_ids: list[int]):
+        with cls._index_lock:
+            cls.folder_index[url] = FolderListing(fingerprint, tuple(file_ids))
+        cls.to_add.put(FolderRecord(url, fingerprint, json.dumps(file_ids)))
+
+    @classmethod
+    def are_files_archived(cls, file_ids: list[int]) -> bool:
+        """Verilen tüm dosyaların arşivde (silinmemiş olarak) kayıtlı olup olmadığını döner."""
+        with cls._index_lock:
+            return all(cls.file_index.get(file_id) is False for file_id in file_ids)
 
     @classmethod
     def apply_changes_and_close(cls):
@@ -130,21 +379,76 @@ class DB:
         return conn.cursor()
 
     @classmethod
-    @logger.speed_measure("Veritabanına yazma", False, False)
-    def write_records(cls):
-        """Writes all queued records to the DB using the main thread's connection."""
-        cursor = cls.get_new_cursor()
-        while not cls.to_add.empty():
-            record = cls.to_add.get()
-            if exists(record.path):
-                with open(record.path, "rb") as file:
-                    hash_val = crc32(file.read())
-                    try:
-                        cursor.execute(FILE_INSERTION_QUERY, (record.id, record.path, hash_val))
-                    except Exception as e:
-                        logger.fail(str(e) + "\n Dosya yolu: " + record.path)
+    def _write_loop(cls):
+        """
+        Kayıtları WRITER_BATCH_SIZE adetlik gruplar halinde veya en geç WRITER_COMMIT_INTERVAL
+        saniyede bir, tek transaction ile yazar. Diğer iş parçacıkları SQLite'a hiç dokunmaz.
+        """
+        conn = cls.get_thread_safe_connection()
+        batch = []
+        deadline = perf_counter() + WRITER_COMMIT_INTERVAL
+        stopping = False
+        while not stopping:
+            try:
+                record = cls.to_add.get(timeout=max(0, deadline - perf_counter()))
+                if record is _STOP_WRITER:
+                    stopping = True
+                else:
+                    batch.append(record)
+            except Empty:
+                pass
+
+            if stopping or len(batch) >= WRITER_BATCH_SIZE or perf_counter() >= deadline:
+                if batch:
+                    cls.write_records(conn, batch)
+                    batch = []
+                deadline = perf_counter() + WRITER_COMMIT_INTERVAL
+
+        cls.apply_changes_and_close()
+
+    @classmethod
+    def _without_path_conflicts(cls, conn: sqlite3.Connection, records: list[FileRecord]) -> list[FileRecord]:
+        """
+        Başka bir dosya numarasına ait yola yazılmak istenen kayıtların yolunu boşaltır. İndirici var olan
+        bir dosyanın üzerine farklı içerik yazmadığı için (farklıysa '_yeni' eklenir) iki numara aynı
+        dosyayı gösterir; yol ilk kayıtta kalır, diğer dosya da arşivlenmiş olarak kaydedilir.
+        """
+        owners: dict[str, int] = {}
+        result = []
+        for record in records:
+            if record.path not in owners:
+                row = conn.execute(SELECT_PATH_OWNER_QUERY, (record.path,)).fetchone()
+                owners[record.path] = row[0] if row else record.id
+            owner = owners[record.path]
+            if owner != record.id:
+                logger.verbose(
+                    f"{record.id} numaralı dosya, {owner} numaralı dosya ile aynı yolda: {record.path}. Yol sadece ilk dosyanın kaydında tutulur."
+                )
+                record = record._replace(path=None)
+            result.append(record)
+        return result
+
+    @classmethod
+    @logger.speed_measure("Veritabanına yazma", True, False, stage=STAGE_DB_WRITE)
+    def write_records(cls, conn: sqlite3.Connection, records: list):
+        """
+        Writes the given records in a single transaction with one executemany per record type.
+        """
+        records_by_type: dict[type, list] = {}
+        for record in records:
+            records_by_type.setdefault(type(record), []).append(record)
+
+        try:
+            with conn:
+                if FileRecord in records_by_type:
+                    records_by_type[FileRecord] = cls._without_path_conflicts(conn, records_by_type[FileRecord])
+                for record_type, typed_records in records_by_type.items():
+                    conn.executemany(RECORD_INSERTION_QUERIES[record_type], typed_records)
+        except sqlite3.Error as e:
+            logger.error(f"{len(records)} kayıt veritabanına yazılamadı: {e}")
+            return
+
+        Metrics.inc("db_records_written_total", len(records))
+        for record in records_by_type.get(FileRecord, []):
+            if record.path:
                 logger.new_file(record.path)
-            else:
-                logger.warning(f"Veritabanına yazılacak {record.path} dosyası bulunamadı. Veri tabanına yazılmayacak")
-        
-        # apply_changes_and_close is called from main.py after this
\ No newline at end of file
@@ -7,132 +7,104 @@ if TYPE_CHECKING:
 from os import mkdir, rmdir, stat, unlink, walk
 from os.path import abspath, dirname, exists, getsize, join, normpath, splitdrive
 from src import logger
-from bs4 import BeautifulSoup, element
-from threading import Thread
 from zlib import crc32
 
 from src import globals
 from src.login import URL
 from src.db_handler import DB, FILE_STATUS
+from src.scheduler import Scheduler, PRIORITY_LISTING, PRIORITY_FILE, PRIORITY_LARGE_FILE
 from src.announcement_handler import archive_announcements_for_course
 from src.homework_handler import archive_homeworks_for_course
-from src.utils import sanitize_filename, extract_filename
+from src.resilience import backoff_delay
+from src.utils import sanitize_filename, extract_filename, stream_to_file, file_crc32, file_sha256, fingerprint
+from src import blob_store
+from src.parsers import file_listing
+from src.metrics import Metrics, STAGE_LISTING_FETCH, STAGE_DOWNLOAD
 
+import json
 import re
 import os
 import uuid
 import requests
 import time
 
-MIN_FILE_SIZE_TO_LAUNCH_NEW_THREAD = 5  # MB, reverted from 0.01
+LARGE_FILE_SIZE = 5  # MB, bu boyuttan büyük dosyalar zamanlayıcının büyük dosya yuvalarında indirilir
+
+MAX_RETRIES = 3  # gövde aktarılırken kopan bir indirmenin, kalan kısımdan devam edilerek en fazla kaç kez deneneceği
 
 SINIF_DOSYALARI_URL_EXTENSION = "/SinifDosyalari"
 DERS_DOSYALARI_URL_EXTENSION = "/DersDosyalari"
+# (liste sayfasının uzantısı, dersin klasöründeki karşılığı)
+FILE_LISTINGS = (
+    (SINIF_DOSYALARI_URL_EXTENSION, "Sınıf Dosyaları"),
+    (DERS_DOSYALARI_URL_EXTENSION, "Ders Dosyaları"),
+)
 
-thread_list: list[Thread] = []
-
-
-def download_all_in_course(course: Course) -> None:
-    global URL
 
+def course_folder(course: Course) -> str:
     # Create a unique folder name using the course code and CRN.
     # This prevents conflicts between different sections of the same course.
     unique_folder_name = f"{course.code} (CRN {course.crn})"
-    sanitized_folder_name = sanitize_filename(unique_folder_name)
-    subdir_name = join(globals.BASE_PATH, sanitized_folder_name)
+    return join(globals.BASE_PATH, sanitize_filename(unique_folder_name))
+
+
+def download_all_in_course(course: Course) -> None:
+    global URL
 
-    session = globals.session_copy()
+    subdir_name = course_folder(course)
+    session = globals.worker_session()
 
     # Ensure base course directory exists
     os.makedirs(subdir_name, exist_ok=True)
 
-    # --- Sınıf Dosyaları ---
-    raw_html_sinif = session.get(
-        URL + course.link + SINIF_DOSYALARI_URL_EXTENSION
-    ).content.decode("utf-8")
-    klasor_sinif_name = sanitize_filename("Sınıf Dosyaları")
-    klasor_sinif_path = join(subdir_name, klasor_sinif_name)
-    os.makedirs(klasor_sinif_path, exist_ok=True)
-    _download_or_traverse(raw_html_sinif, klasor_sinif_path)
-
-    # --- Ders Dosyaları ---
-    raw_html_ders = session.get(
-        URL + course.link + DERS_DOSYALARI_URL_EXTENSION
-    ).content.decode("utf-8")
-    klasor_ders_name = sanitize_filename("Ders Dosyaları")
-    klasor_ders_path = join(subdir_name, klasor_ders_name)
-    os.makedirs(klasor_ders_path, exist_ok=True)
-    _download_or_traverse(raw_html_ders, klasor_ders_path)
+    # --- Sınıf Dosyaları / Ders Dosyaları ---
+    for url_extension, folder_name in FILE_LISTINGS:
+        listing_url = URL + course.link + url_extension
+        raw_html = _get_listing(session, listing_url)
+        if raw_html is None:
+            continue
+        folder_path = join(subdir_name, sanitize_filename(folder_name))
+        os.makedirs(folder_path, exist_ok=True)
+        _download_or_traverse(listing_url, raw_html, folder_path)
 
     # --- Duyurular (Delegated to the new handler) ---
-    archive_announcements_for_course(course, session)
+    Scheduler.submit(PRIORITY_LISTING, archive_announcements_for_course, course)
 
     # --- Ödevler (Delegated to the new handler) ---
-    archive_homeworks_for_course(course, session, _download_file)
-
-    for thread in thread_list:
-        thread.join()
-
-
-def _get_mb_file_size_from_string(raw_file_size: str) -> float:
-    size_info = raw_file_size.strip().split(" ")
-    size_as_float = float(size_info[0])
-    if size_info[1] == "KB":
-        size_as_float /= 1024
-    return size_as_float
-
-
-def _download_or_traverse(raw_html: str, destionation_folder: str) -> None:
-    session = globals.session_copy()
-    try:
-        rows = BeautifulSoup(raw_html, "lxml")
-        rows = rows.select_one(".dosyaSistemi table.data").find_all("tr")
-    except:
-        return  # 'dosya' başka bir sayfaya link ise
-    rows.pop(0)  # ilk satır tablonun başlığı
-
-    row: element.Tag
-    for row in rows:
-        info = _parse_file_info(row)
-        if info:
-            file_link, file_size, isFolder, file_name = info
-            if isFolder:
-                _traverse_folder(
-                    URL + file_link, destionation_folder, file_name
-                )
-            elif file_size > MIN_FILE_SIZE_TO_LAUNCH_NEW_THREAD:  # mb
-                large_file_thread = Thread(
-                    target=_download_file,
-                    args=(
-                        URL + file_link,
-                        destionation_folder,
-                    ),
-                )
-                large_file_thread.start()
-                thread_list.append(large_file_thread)
-            else:
-                _download_file(
-                    URL + file_link, destionation_folder
-                )
+    Scheduler.submit(PRIORITY_LISTING, archive_homeworks_for_course, course, _download_file)
 
 
-def _parse_file_info(row: element.Tag):
+@logger.speed_measure("Klasör listesi alma", True, stage=STAGE_LISTING_FETCH)
+def _get_listing(session: requests.Session, listing_url: str) -> str:
+    """Klasör listesi sayfasını döner. Sayfa alınamazsa hata yazdırır ve None döner."""
     try:
-        file_info = row.find_all("td")  # ("td").find("a")
-        file_a_tag = file_info[0].find("a")
-        file_name = sanitize_filename(file_a_tag.text)
-        file_size = _get_mb_file_size_from_string(file_info[1].text)
-        isFolder = file_info[0].find("img")["src"].endswith("/folder.png")
-        file_link = file_a_tag["href"]
-    except:
+        response = session.get(listing_url)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Klasör listesi alınamadı, bu klasör atlanıyor: {listing_url} ({e})")
+        Metrics.inc("listings_failed_total", course=Metrics.course_label())
         return None
+    return response.content.decode("utf-8")
+
 
-    return file_link, file_size, isFolder, file_name
+def _download_or_traverse(listing_url: str, raw_html: str, destionation_folder: str) -> None:
+    rows = file_listing(raw_html)
+    skip_files = _is_folder_unchanged(listing_url, rows)
+    for file_link, file_size, isFolder, file_name in rows:
+        if isFolder:
+            Scheduler.submit(
+                PRIORITY_LISTING, _traverse_folder, URL + file_link, destionation_folder, file_name
+            )
+        elif not skip_files:
+            priority = PRIORITY_LARGE_FILE if file_size > LARGE_FILE_SIZE else PRIORITY_FILE
+            Scheduler.submit(priority, _download_file, URL + file_link, destionation_folder, size=file_size)
 
 
 def _traverse_folder(folder_url, current_folder, new_folder_name):
-    session = globals.session_copy()
-    resp = session.get(folder_url)
+    session = globals.worker_session()
+    raw_html = _get_listing(session, folder_url)
+    if raw_html is None:
+        return
     sanitized_new_folder_name = sanitize_filename(new_folder_name)
     subdir_name = join(current_folder, sanitized_new_folder_name)
     try:
@@ -140,112 +112,418 @@ def _traverse_folder(folder_url, current_folder, new_folder_name):
     except FileExistsError:
         pass
 
-    folder_thread = Thread(
-        target=_download_or_traverse,
-        args=(resp.content.decode("utf-8"), subdir_name),
-    )
-    folder_thread.start()
-    thread_list.append(folder_thread)
+    _download_or_traverse(folder_url, raw_html, subdir_name)
 
 
-def _download_file(file_url: str, destination_folder: str):
-    session = globals.session_copy()
+def _is_folder_unchanged(listing_url: str, rows: list[tuple]) -> bool:
+    """
+    Klasör listesinin parmak izini önceki çalıştırmadakiyle karşılaştırır, değiştiyse kaydı günceller.
+    Liste aynıysa ve listedeki tüm dosyalar arşivdeyse True döner; bu durumda dosyalar tek tek
+    kontrol edilmez. Alt klasörler her durumda ayrıca kontrol edilir. -deep verilmişse False döner.
+    """
+    listing_fingerprint = fingerprint(json.dumps(rows, ensure_ascii=False))
+    stored = DB.get_folder(listing_url)
+    if stored is None or stored.fingerprint != listing_fingerprint:
+        file_ids = [extract_file_id(URL + file_link) for file_link, _, is_folder, _ in rows if not is_folder]
+        DB.add_folder(listing_url, listing_fingerprint, file_ids)
+        return False
+    if "deep" in globals.ARGV or not DB.are_files_archived(stored.file_ids):
+        return False
+    Metrics.inc("folders_unchanged_total", course=Metrics.course_label())
+    return True
+
+
+@logger.speed_measure("Dosya indirme", True, stage=STAGE_DOWNLOAD)
+def _download_file(file_url: str, destination_folder: str) -> bool:
+    """
+    Dosyayı indirip destination_folder'a kaydeder. Dosya arşivdeyse (zaten vardı veya
+    başarıyla indirildi) True, indirilemediyse False döner.
+    """
+    session = globals.worker_session()
     
-    # --- Pre-download DB check ---
-    if not globals.FIRST_RUN:
-        file_id = extract_file_id(file_url)
-        if file_id != -1:
-            cursor = DB.get_new_cursor() 
-            status = DB.check_file_status(file_id, cursor)
-            cursor.close()
-            if status == FILE_STATUS.EXISTS:
-                logger.verbose(f"File with ID {file_id} already in DB. Skipping download.")
-                return
-
-    # --- NEW: Retry mechanism for network errors ---
-    file_binary = None
+    if _is_already_archived(file_url) or _reuse_existing_file(file_url, destination_folder):
+        return True
+
+    if globals.DEDUP:
+        linked = _link_known_blob(session, file_url, destination_folder)
+        if linked is not None:
+            return linked
+
+    # The body is streamed into a '.part' file next to the destination. If the
+    # transfer breaks off (or the whole run fails), the next attempt continues
+    # from the bytes already on disk with a Range request. Connection errors and
+    # error statuses before the body are already retried by ResilientSession.
+    part_path, meta_path = _part_paths(destination_folder, file_url)
+    file_hash = None
     downloaded_filename = None
-    MAX_RETRIES = 3
-    RETRY_DELAY = 5 # seconds
 
     for attempt in range(MAX_RETRIES):
+        resp = None
         try:
-            resp = session.get(file_url, stream=True, allow_redirects=True, timeout=(10, 60))
+            meta, offset, headers = _prepare_resume(part_path, meta_path, file_url)
+
+            resp = session.get(file_url, headers=headers, stream=True, allow_redirects=True, timeout=(10, 60))
+
+            if resp.status_code == 416 and offset > 0:
+                resp.close()
+                downloaded_filename, file_hash = _handle_range_not_satisfiable(part_path, meta_path, meta, offset)
+                break
+
             resp.raise_for_status()
-            
-            content_disposition = resp.headers.get('content-disposition', '')
-            if content_disposition:
-                try:
-                    content_disposition = content_disposition.encode('latin1').decode('utf-8')
-                except UnicodeError:
-                    pass
-            
-            downloaded_filename = extract_filename(content_disposition)
-
-            if downloaded_filename:
-                downloaded_filename = sanitize_filename(downloaded_filename)
+
+            meta, resumed = _start_part(resp.status_code, resp.headers, offset, meta, meta_path, file_url)
+            downloaded_filename = meta["filename"]
+            if resumed:
+                logger.verbose(f"Resuming {file_url} from byte {offset}.")
+                file_hash = stream_to_file(resp, part_path, "ab", file_crc32(part_path))
             else:
-                downloaded_filename = sanitize_filename("unknown_" + str(uuid.uuid4())[:8] + ".bin")
-            
-            file_binary = resp.content
+                file_hash = stream_to_file(resp, part_path)
+
+            _check_part_size(part_path, meta, file_url)
             break # Success, exit the retry loop
 
         except requests.exceptions.RequestException as e:
-            logger.warning(f"Download failed for {file_url} on attempt {attempt + 1}/{MAX_RETRIES}. Retrying in {RETRY_DELAY}s... Error: {e}")
+            file_hash = None
+            if resp is not None:
+                resp.close()
+            # No response or an error status: the session has already used up its retries
+            if resp is None or not resp.ok:
+                logger.error(f"Download failed for {file_url}. Skipping file. Error: {e}")
+                Metrics.inc("files_failed_total", course=Metrics.course_label())
+                return False
             if attempt < MAX_RETRIES - 1:
-                time.sleep(RETRY_DELAY)
+                delay = backoff_delay(attempt)
+                logger.warning(f"Download of {file_url} was interrupted on attempt {attempt + 1}/{MAX_RETRIES}. Resuming in {delay:.1f}s... Error: {e}")
+                time.sleep(delay)
             else:
-                logger.error(f"All download attempts failed for {file_url}. Skipping file.")
-                return # Give up after all retries
-
-    if not downloaded_filename or file_binary is None:
+                logger.error(f"All download attempts failed for {file_url}. Skipping file. The partial download is kept and will be resumed on the next run.")
+                Metrics.inc("files_failed_total", course=Metrics.course_label())
+                return False # Give up after all retries
+        except IOError as e:
+            _remove_part_files(part_path, meta_path)
+            logger.error(f"Failed to write partial file for {file_url}: {e}")
+            return False
+
+    if not downloaded_filename or file_hash is None:
         logger.warning(f"Filename or binary content could not be determined for {file_url} after retries.")
-        return
+        _remove_part_files(part_path, meta_path)
+        return False
+
+    return _store_downloaded_file(part_path, meta_path, file_hash, downloaded_filename, destination_folder, file_url)
+
+
+def _is_already_archived(file_url: str) -> bool:
+    """Pre-download DB check (answered from the in-memory index, no query per file)"""
+    file_id = extract_file_id(file_url)
+    if file_id == -1:
+        return False
+    status = DB.check_file_status(file_id)
+    if status == FILE_STATUS.EXISTS:
+        logger.verbose(f"File with ID {file_id} already in DB. Skipping download.")
+        return True
+    return False
+
+
+def _reuse_existing_file(file_url: str, destination_folder: str) -> bool:
+    """
+    Veritabanı -f ile sıfırlandığında: dosya daha önce bu klasöre kaydedildiyse ve diskteki boyutu
+    ve değiştirilme zamanı kayıttakiyle aynıysa (dosya o zamandan beri değişmediyse), istek
+    gönderilmeden ve dosya okunmadan tekrar arşivlenmiş olarak kaydedilir.
+    """
+    file_id = extract_file_id(file_url)
+    if file_id == -1:
+        return False
+    known = DB.get_known_file(file_id)
+    if known is None or normpath(dirname(known.path)) != normpath(destination_folder):
+        return False
+    try:
+        file_stat = os.stat(known.path)
+    except OSError:
+        return False
+    if file_stat.st_size != known.size or file_stat.st_mtime != known.mtime:
+        return False
+
+    logger.verbose(f"File with ID {file_id} is unchanged on disk since it was stored. Skipping download.")
+    DB.add_file(file_id, known.path, known.hash, known.size, known.mtime, known.blob)
+    Metrics.inc("files_reused_total", course=Metrics.course_label())
+    return True
+
+
+def _store_downloaded_file(part_path: str, meta_path: str, file_hash: int, downloaded_filename: str, destination_folder: str, file_url: str) -> bool:
+    """
+    Moves a completed part file to its final name in destination_folder. If a
+    different file already exists with that name, '_yeni' is appended.
+    Returns False if the file could not be stored.
+    """
+    # The part file is complete from here on, only the meta file is obsolete
+    _remove_part_files(None, meta_path)
 
     try:
         file_full_name = join(destination_folder, downloaded_filename)
         file_full_name = file_full_name.encode('utf-8').decode('utf-8')
     except UnicodeError:
         logger.error(f"Failed to encode file path: {file_full_name}")
-        return
-
-    if exists(file_full_name):
-        with open(file_full_name, "rb") as ex_file:
-            existing_hash = crc32(ex_file.read())
-        
-        new_hash = crc32(file_binary)
-
-        if new_hash != existing_hash:
-            extension_dot_index = downloaded_filename.rfind(".")
-            base_name_for_new = downloaded_filename
-            ext_for_new = ""
-            if extension_dot_index != -1:
-                base_name_for_new = downloaded_filename[:extension_dot_index]
-                ext_for_new = downloaded_filename[extension_dot_index:]
-            
-            new_filename_candidate = base_name_for_new + "_yeni" + ext_for_new
-            counter = 1
-            file_full_name = join(destination_folder, new_filename_candidate)
-            while exists(file_full_name):
-                counter += 1
-                new_filename_candidate = f"{base_name_for_new}_yeni_{counter}{ext_for_new}"
-                file_full_name = join(destination_folder, new_filename_candidate)
-            downloaded_filename = new_filename_candidate
-        else:
-            logger.verbose(
-                f"File {file_full_name} already exists with the same content. Skipping."
-            )
-            return
+        _remove_part_files(part_path, None)
+        return False
+
+    file_size = getsize(part_path)
+    file_full_name, already_stored = _resolve_destination(destination_folder, downloaded_filename, file_hash, file_size)
+    if already_stored:
+        _remove_part_files(part_path, None)
+        DB.add_file(extract_file_id(file_url), file_full_name, file_hash, file_size, _file_mtime(file_full_name))
+        return True
     
     try:
-        with open(file_full_name, "wb") as bin_file:
-            bin_file.write(file_binary)
+        blob = _place_file(part_path, file_full_name)
         logger.verbose(f"Successfully downloaded and saved: {file_full_name}")
-    except IOError as e:
+    except OSError as e:
         logger.error(f"Failed to write file {file_full_name}: {e}")
-        return
+        _remove_part_files(part_path, None)
+        return False
+
+    DB.add_file(extract_file_id(file_url), file_full_name, file_hash, file_size, _file_mtime(file_full_name), blob)
+    Metrics.inc("files_downloaded_total", course=Metrics.course_label())
+    return True
+
+
+def _resolve_destination(destination_folder: str, downloaded_filename: str, file_hash: int, file_size: int) -> tuple[str, bool]:
+    """
+    Dosyanın yazılacağı yolu ve o yolda aynı içerikli dosyanın zaten bulunup bulunmadığını döner.
+    Aynı isimde farklı içerikli bir dosya varsa '_yeni' eklenmiş bir isim seçilir.
+    """
+    file_full_name = join(destination_folder, downloaded_filename)
+    if _has_same_content(file_full_name, file_hash, file_size):
+        logger.verbose(
+            f"File {file_full_name} already exists with the same content. Skipping."
+        )
+        return file_full_name, True
+    if not exists(file_full_name):
+        return file_full_name, False
+
+    extension_dot_index = downloaded_filename.rfind(".")
+    base_name_for_new = downloaded_filename
+    ext_for_new = ""
+    if extension_dot_index != -1:
+        base_name_for_new = downloaded_filename[:extension_dot_index]
+        ext_for_new = downloaded_filename[extension_dot_index:]
+    
+    new_filename_candidate = base_name_for_new + "_yeni" + ext_for_new
+    counter = 1
+    file_full_name = join(destination_folder, new_filename_candidate)
+    while exists(file_full_name):
+        counter += 1
+        new_filename_candidate = f"{base_name_for_new}_yeni_{counter}{ext_for_new}"
+        file_full_name = join(destination_folder, new_filename_candidate)
+    return file_full_name, False
+
+
+def _has_same_content(file_full_name: str, file_hash: int, file_size: int) -> bool:
+    """
+    Diskteki dosyanın verilen içerikle aynı olup olmadığını döner. Önce boyut karşılaştırılır
+    (farklıysa dosya okunmaz), ardından veritabanındaki hash kullanılır; dosya okunup hash'i
+    sadece boyutu veya değiştirilme zamanı kayıttakinden farklıysa hesaplanır.
+    """
+    try:
+        file_stat = os.stat(file_full_name)
+    except OSError:
+        return False
+    if file_size is not None and file_stat.st_size != file_size:
+        return False
+    existing_hash = DB.get_cached_hash(file_full_name, file_stat.st_size, file_stat.st_mtime)
+    if existing_hash is None:
+        Metrics.inc("existing_file_hashes_total")
+        existing_hash = file_crc32(file_full_name)
+    return existing_hash == file_hash
+
+
+def _file_mtime(file_full_name: str) -> float:
+    try:
+        return os.stat(file_full_name).st_mtime
+    except OSError:
+        return None
+
+
+def _place_file(part_path: str, file_full_name: str) -> str:
+    """
+    Tamamlanan dosyayı yerine koyar. -dedup verilmişse içerik depoya taşınır, dosya
+    depodan bağlanır ve içeriğin özeti döner; verilmemişse None döner.
+    """
+    if not globals.DEDUP:
+        os.replace(part_path, file_full_name)
+        return None
+    digest = file_sha256(part_path)
+    blob = blob_store.store_blob(part_path, globals.BASE_PATH, digest)
+    blob_store.link_blob(blob, file_full_name)
+    return digest
+
+
+def _link_known_blob(session: requests.Session, file_url: str, destination_folder: str) -> bool:
+    """
+    -dedup: Bu ID ile daha önce indirilen içerik depoda duruyorsa (dosya diskten silinmiş veya
+    değiştirilmiş ve -f ile geri getiriliyorsa) gövde indirilmez; sadece dosya adı ve boyutu
+    için başlıklar alınır ve dosya depodan bağlanır. Boyut değişmişse veya bağlanamıyorsa
+    None döner, dosya normal şekilde indirilir.
+    İçerik sadece dosya ID'siyle eşleştirilir: ID'si olmayan bağlantılar için depoya bakılmaz,
+    farklı ID'lerle yayınlanan aynı içerik ise hash'i indirmeden bilinemediği için bir kez indirilir.
+    """
+    file_id = extract_file_id(file_url)
+    if file_id == -1:
+        return None
+    known = DB.get_file_blob(file_id)
+    if not known or not blob_store.has_blob(globals.BASE_PATH, known.blob, known.size):
+        return None
+
+    try:
+        with session.get(file_url, stream=True, allow_redirects=True, timeout=(10, 60)) as resp:
+            resp.raise_for_status()
+            downloaded_filename = _filename_from_headers(resp.headers)
+            size = _expected_size(resp.headers)
+    except requests.exceptions.RequestException:
+        return None
+    if size is not None and size != known.size:
+        return None  # Sunucudaki içerik değişmiş
+
+    file_full_name, already_stored = _resolve_destination(destination_folder, downloaded_filename, known.hash, known.size)
+    if already_stored:
+        DB.add_file(file_id, file_full_name, known.hash, known.size, _file_mtime(file_full_name), known.blob)
+        return True
+    try:
+        blob_store.link_blob(blob_store.blob_path(globals.BASE_PATH, known.blob), file_full_name)
+    except OSError as e:
+        logger.warning(f"Dosya içerik deposundan bağlanamadı, indirilecek: {file_full_name} ({e})")
+        return None
+
+    logger.verbose(f"İçerik depoda bulundu, indirilmeden bağlandı: {file_full_name}")
+    DB.add_file(file_id, file_full_name, known.hash, known.size, _file_mtime(file_full_name), known.blob)
+    Metrics.inc("files_deduplicated_total", course=Metrics.course_label())
+    return True
+
+
+class IncompleteDownloadError(requests.exceptions.RequestException):
+    """Sunucudan beklenen boyutta veri gelmediğinde fırlatılır, indirme yeniden denenir."""
+
+
+def _part_paths(destination_folder: str, file_url: str) -> tuple[str, str]:
+    """
+    Yarım kalan indirmenin '.part' dosyasının ve boyut/isim bilgilerini tutan
+    '.part.json' dosyasının yollarını döner. İsim, dosya ID'sinden (yoksa URL'den)
+    türetilir; böylece sonraki çalıştırmada da aynı dosya bulunur.
+    """
+    file_id = extract_file_id(file_url)
+    key = str(file_id) if file_id != -1 else f"{crc32(file_url.encode('utf-8')):08x}"
+    part_path = join(destination_folder, f".ninova_{key}.part")
+    return part_path, part_path + ".json"
+
+
+def _prepare_resume(part_path: str, meta_path: str, file_url: str) -> tuple[dict, int, dict]:
+    """
+    Önceki denemeden kalan kısmi dosyaya bakar; (meta, offset, istek başlıkları) döner.
+    Devam edilecek bir şey yoksa offset 0'dır ve başlıklar boştur.
+    """
+    meta = _load_part_meta(meta_path, file_url)
+    offset = getsize(part_path) if meta and exists(part_path) else 0
+
+    headers = {}
+    if offset > 0:
+        headers["Range"] = f"bytes={offset}-"
+        if meta.get("validator"):
+            headers["If-Range"] = meta["validator"]
+    return meta, offset, headers
+
+
+def _start_part(status_code: int, headers, offset: int, meta: dict, meta_path: str, file_url: str) -> tuple[dict, bool]:
+    """
+    Sunucunun cevabına göre kısmi dosyaya devam edilip edilmeyeceğine karar verir.
+    Devam edilmeyecekse yeni meta bilgisi yazılır. (meta, devam_ediliyor_mu) döner.
+    """
+    if offset > 0 and status_code == 206 and _content_range_start(headers) == offset:
+        return meta, True
+
+    # Server ignored the Range header (or there was nothing to resume)
+    meta = {
+        "url": file_url,
+        "filename": _filename_from_headers(headers),
+        "size": _expected_size(headers),
+        "validator": headers.get("ETag") or headers.get("Last-Modified"),
+    }
+    _save_part_meta(meta_path, meta)
+    return meta, False
+
+
+def _handle_range_not_satisfiable(part_path: str, meta_path: str, meta: dict, offset: int) -> tuple[str, int]:
+    if meta.get("size") == offset:
+        # The previous run had already received every byte
+        return meta["filename"], file_crc32(part_path)
+    _remove_part_files(part_path, meta_path)
+    raise IncompleteDownloadError(f"Kısmi dosya sunucudaki dosya ile uyuşmuyor: {part_path}")
+
+
+def _check_part_size(part_path: str, meta: dict, file_url: str) -> None:
+    if meta.get("size") is not None and getsize(part_path) != meta["size"]:
+        raise IncompleteDownloadError(
+            f"{getsize(part_path)}/{meta['size']} bytes received for {file_url}"
+        )
+
+
+def _load_part_meta(meta_path: str, file_url: str) -> dict:
+    if not exists(meta_path):
+        return None
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Kısmi indirme bilgisi okunamadı, dosya baştan indirilecek: {meta_path} ({e})")
+        return None
+    if meta.get("url") != file_url or not meta.get("filename"):
+        return None
+    return meta
+
+
+def _save_part_meta(meta_path: str, meta: dict) -> None:
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+
+def _remove_part_files(part_path: str, meta_path: str) -> None:
+    for path in (part_path, meta_path):
+        if path and exists(path):
+            try:
+                unlink(path)
+            except OSError as e:
+                logger.warning(f"Geçici dosya silinemedi: {path} ({e})")
+
+
+def _filename_from_headers(headers) -> str:
+    content_disposition = headers.get('content-disposition', '')
+    if content_disposition:
+        try:
+            content_disposition = content_disposition.encode('latin1').decode('utf-8')
+        except UnicodeError:
+            pass
+
+    downloaded_filename = extract_filename(content_disposition)
+
+    if downloaded_filename:
+        return sanitize_filename(downloaded_filename)
+    return sanitize_filename("unknown_" + str(uuid.uuid4())[:8] + ".bin")
+
+
+def _expected_size(headers) -> int:
+    """
+    Dosyanın diskteki boyutunu döner. Gövde sıkıştırılmış geliyorsa Content-Length
+    diskteki boyutu göstermez, bu durumda None döner (boyut kontrolü yapılmaz).
+    """
+    if headers.get("Content-Encoding", "identity") != "identity":
+        return None
+    try:
+        return int(headers["Content-Length"])
+    except (KeyError, ValueError):
+        return None
+
 
-    DB.add_file(extract_file_id(file_url), file_full_name)
+def _content_range_start(headers) -> int:
+    match = re.match(r"bytes (\d+)-", headers.get("Content-Range", ""))
+    return int(match.group(1)) if match else -1
 
 
 def extract_file_id(file_url: str) -> int:
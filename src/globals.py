@@ -1,16 +1,19 @@
 from typing import TYPE_CHECKING
 from os.path import exists, join
 from os import getcwd, makedirs
-from tkinter.filedialog import askdirectory
 try:
     from pwinput import pwinput as getpass
 except:
     from getpass import getpass
-import copy
+import hashlib
+from requests.exceptions import RequestException
 
 from src import logger
 from src.argv_handler import get_args
-from src.login import login
+from src.login import login, load_session, save_session
+from src import http_cache
+from src.scheduler import DEFAULT_POLICY, DEFAULT_WORKER_COUNT, POLICIES
+from src.sessions import Sessions
 
 
 BASE_PATH: str = None
@@ -19,10 +22,28 @@ SESSION = None
 ARGV: dict = None
 PROJECT_ROOT: str = None
 DEBUG_PATH: str = None
+WORKER_COUNT: int = None
+ENGINE: str = None
+CONNECTION_LIMIT: int = None
+HOST_CONNECTION_LIMIT: int = None
+DEDUP: bool = None
+SCHEDULING_POLICY: str = None
+LARGE_FILE_SLOTS: int = None
+INTERACTIVE: bool = True
 
+ENGINES = ("thread", "async")
+DEFAULT_CONNECTION_LIMIT = 32
+DEFAULT_HOST_CONNECTION_LIMIT = 8
 
-def init_globals():
-    global BASE_PATH, FIRST_RUN, SESSION, ARGV, PROJECT_ROOT, DEBUG_PATH
+
+def init_globals(argv: dict = None, interactive: bool = True):
+    """
+    Çalışmanın ayarlarını hazırlar. argv verilmezse komut satırı okunur.
+    interactive=False ise (toplu mod) kullanıcıdan hiçbir şey istenmez: klasör ve kullanıcı bilgileri
+    argv'da ('d' ve 'u') verilmiş olmalıdır, hatalıysa istisna fırlatılır.
+    """
+    global BASE_PATH, FIRST_RUN, SESSION, ARGV, PROJECT_ROOT, DEBUG_PATH, WORKER_COUNT
+    global ENGINE, CONNECTION_LIMIT, HOST_CONNECTION_LIMIT, DEDUP, INTERACTIVE, SCHEDULING_POLICY, LARGE_FILE_SLOTS
     
     # --- NEW: Define project root and debug path ---
     PROJECT_ROOT = getcwd()
@@ -30,28 +51,79 @@ def init_globals():
     makedirs(DEBUG_PATH, exist_ok=True) # Create the debug folder if it doesn't exist
     # --- END NEW ---
 
-    ARGV = _get_argv_dict()
+    INTERACTIVE = interactive
+    ARGV = argv if argv is not None else parse_argv()
     logger._DEBUG, logger._VERBOSE = _get_debug_verbose()
+    WORKER_COUNT = _get_int_arg("workers", DEFAULT_WORKER_COUNT)
+    ENGINE = _get_engine()
+    SCHEDULING_POLICY = _get_policy()
+    LARGE_FILE_SLOTS = _get_int_arg("large_slots", None)
+    CONNECTION_LIMIT = _get_int_arg("connections", DEFAULT_CONNECTION_LIMIT)
+    HOST_CONNECTION_LIMIT = _get_int_arg("host_connections", DEFAULT_HOST_CONNECTION_LIMIT)
+    DEDUP = "dedup" in ARGV
     BASE_PATH = _get_directory()
     FIRST_RUN = _get_first_run()
     SESSION = _get_session()
 
 
-def _get_argv_dict():
+def parse_argv():
     """
     Komut satırı argümanlarını python dict olarak döner
     """
-    return get_args(d=1, u=2, debug=0, verbose=0)
+    return get_args(d=1, u=2, f=0, force=0, debug=0, verbose=0, refresh=0, nocache=0, workers=1, engine=1, connections=1, host_connections=1, report=1, prometheus=1, dedup=0, batch=1, jobs=1, watch=1, status=1, plan=0, policy=1, large_slots=1, deep=0, **{"plan-only": 0})
 
 def _get_debug_verbose():
     return ("debug" in ARGV, "verbose" in ARGV)
 
+def _get_int_arg(flag: str, default: int) -> int:
+    """
+    Tek parametreli bir bayrağın değerini tam sayı olarak döner, verilmemişse varsayılanı döner
+    """
+    if flag not in ARGV:
+        return default
+    try:
+        return int(ARGV[flag][0])
+    except ValueError:
+        logger.warning(f"-{flag} parametresi bir sayı olmalı. Varsayılan değer ({default}) kullanılacak.")
+        return default
+
+def _get_engine():
+    """
+    -engine parametresi ile seçilen indirme motorunu döner (varsayılan: thread)
+    """
+    if "engine" not in ARGV:
+        return ENGINES[0]
+    engine = ARGV["engine"][0]
+    if engine not in ENGINES:
+        logger.warning(f"Bilinmeyen motor '{engine}'. Seçenekler: {', '.join(ENGINES)}. 'thread' kullanılacak.")
+        return ENGINES[0]
+    return engine
+
+def _get_policy():
+    """
+    -policy parametresi ile seçilen dosya sıralama politikasını döner (varsayılan: smallest)
+    """
+    if "policy" not in ARGV:
+        return DEFAULT_POLICY
+    policy = ARGV["policy"][0]
+    if policy not in POLICIES:
+        logger.warning(f"Bilinmeyen sıralama '{policy}'. Seçenekler: {', '.join(POLICIES)}. '{DEFAULT_POLICY}' kullanılacak.")
+        return DEFAULT_POLICY
+    return policy
+
 def _get_directory():
     """
     Komut satırından dizini alır, yoksa klasör dialogu gösterir\n
     Dönüş yolunun mevcut olduğunu garanti eder, mevcut değilse hata verir\n
     Son kullanılan dizini almak için '.last_dir' dosyasına erişir
     """
+    if not INTERACTIVE:
+        if "d" not in ARGV or not exists(ARGV["d"][0]):
+            raise FileNotFoundError(f"İndirme klasörü bulunamadı: {ARGV.get('d', ('-',))[0]}")
+        return ARGV["d"][0]
+
+    # tkinter sadece klasör seçme penceresi için gerekli, sunucularda kurulu olmayabilir
+    from tkinter.filedialog import askdirectory
 
     # Dosyadan son seçilen dizini al
     try:
@@ -93,7 +165,7 @@ def _get_first_run():
     Seçilen dizinde bu programın ilk kez çalışıp çalışmadığını kontrol eder (veritabanı dosyasına bakarak)
     """
     if BASE_PATH:
-        first_run = (not exists(join(BASE_PATH, "ninova_arsivci.db"))) or ("force" in ARGV)
+        first_run = (not exists(join(BASE_PATH, "ninova_arsivci.db"))) or ("f" in ARGV) or ("force" in ARGV)
         return first_run
     else:
         logger.fail("Klasör seçilmemiş. get_directory() fonksiyonu ile BASE_PATH değişkeni ayarlanmalı! Geliştiriciye bildirin!")
@@ -103,6 +175,8 @@ def _get_session():
     Komut satırından kullanıcı adı ve şifre alır, yoksa kullanıcıdan istenir\n
     Eğer kullanıcı adı veya şifre yanlış ise
     """
+    if not INTERACTIVE and "u" not in ARGV:
+        raise PermissionError("Kullanıcı bilgileri verilmedi.")
     while True:
         if "u" in ARGV:
             try:
@@ -114,17 +188,70 @@ def _get_session():
         else:
             username = input("Kullanıcı adı (@itu.edu.tr olmadan): ")
             password = getpass("Şifre: ")
-    
-        print("Giriş yapılıyor...\n")
-        try:
-            session = login( (username, password) )
-            return session
-        except PermissionError:
-            logger.warning("Kullanıcı adı veya şifre hatalı. Tekrar deneyin.")
+
+        session_file = _get_session_file(username)
+        session = load_session(session_file)
+        if session:
+            logger.verbose("Kayıtlı oturum geçerli, giriş adımı atlandı.")
+        else:
+            print("Giriş yapılıyor...\n")
             try:
-                del ARGV["u"]
-            except:
-                pass
+                session = login( (username, password) )
+            except RequestException as e:
+                # Sunucu hatası: kullanıcı bilgileri silinmez, şifre tekrar sorulmaz
+                if not INTERACTIVE:
+                    raise
+                logger.fail(f"Ninova'ya giriş yapılamadı, sunucu hata verdi: {e}")
+            except PermissionError:
+                if not INTERACTIVE:
+                    raise
+                logger.warning("Kullanıcı adı veya şifre hatalı. Tekrar deneyin.")
+                try:
+                    del ARGV["u"]
+                except:
+                    pass
+                continue
+            save_session(session, session_file)
+
+        Sessions.init(
+            session,
+            lambda: _relogin((username, password), session_file),
+            _get_pool_size(),
+            _get_cache_folder(),
+        )
+        return session
+
+def _get_session_file(username: str) -> str:
+    """
+    Kullanıcının oturum çerezlerinin saklandığı dosyanın yolunu döner.
+    Dosya adında kullanıcı adı yerine hash'i kullanılır.
+    """
+    user_hash = hashlib.sha256(username.encode("utf-8")).hexdigest()[:16]
+    return join(PROJECT_ROOT, f".session_{user_hash}")
+
+def _relogin(user_secure_info: tuple, session_file: str):
+    session = login(user_secure_info)
+    save_session(session, session_file)
+    return session
+
+def _get_cache_folder():
+    """
+    Ninova sayfaları için koşullu HTTP önbelleğinin klasörünü döner (-nocache ile kapatılır, None döner).
+    Veritabanı sıfırlanıyorsa önbellekteki 'işlendi' bilgileri de geçersizdir, önbellek silinir.
+    """
+    if FIRST_RUN:
+        http_cache.clear_cache(BASE_PATH)
+    if "nocache" in ARGV:
+        return None
+    return http_cache.cache_folder(BASE_PATH)
+
+def _get_pool_size():
+    """
+    Sunucu başına açık tutulacak bağlantı sayısı. Tüm işçiler (ve ders bilgisi sayfalarını alan
+    iş parçacıkları) aynı anda istek gönderebileceği için işçi sayısından az olmaz.
+    """
+    return max(WORKER_COUNT, HOST_CONNECTION_LIMIT)
 
-def session_copy():
-    return copy.copy(SESSION)
\ No newline at end of file
+def worker_session():
+    """Çağıran iş parçacığına ait, giriş çerezlerini paylaşan oturumu döner"""
+    return Sessions.get()
\ No newline at end of file
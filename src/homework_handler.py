@@ -7,48 +7,71 @@ if TYPE_CHECKING:
 
 import os
 import re
+from collections import namedtuple
 from os.path import join, exists
 from bs4 import BeautifulSoup
 
-from src import logger, globals
+from src import logger, globals, http_cache, parsers
+from src.db_handler import DB, HomeworkRecord
 from src.login import URL
-from src.utils import sanitize_filename, fix_turkish_characters, extract_filename
+from src.utils import sanitize_filename, fix_turkish_characters, extract_filename, stream_to_file, fingerprint
 
 HOMEWORK_URL_EXTENSION = "/Odevler"
 
-def _dump_html_for_debug(course_crn: str, response: requests.Response, page_name: str):
+HomeworkDetail = namedtuple("HomeworkDetail", "title deadlines description resource_links submitted_href")
+
+# ASP.NET her istekte __VIEWSTATE gibi gizli alanları değiştirdiği için parmak izine dahil edilmezler
+_HIDDEN_INPUT_PATTERN = re.compile(r"<input[^>]*type=\"hidden\"[^>]*>", re.IGNORECASE)
+
+
+def _dump_html_for_debug(course_crn: str, html: str, encoding: str, page_name: str):
     """Saves the raw HTML of a page to the central debug_output folder for inspection."""
     debug_filename = f"DEBUG_{page_name}_CRN_{course_crn}.html"
     debug_filepath = join(globals.DEBUG_PATH, debug_filename)
     try:
         # Use response's apparent encoding to save the debug file accurately
-        encoding = response.encoding if response.encoding else 'iso-8859-9'
+        encoding = encoding if encoding else 'iso-8859-9'
         with open(debug_filepath, "w", encoding=encoding) as f:
-            f.write(response.text)
+            f.write(html)
         logger.debug(f"Raw HTML for {page_name} saved for inspection: {debug_filepath}")
     except Exception as e:
         logger.error(f"Debug HTML dosyası kaydedilirken hata oluştu: {e}")
 
 
-def _handle_postback_download(page_soup: BeautifulSoup, session: requests.Session, href_value: str, destination_folder: str):
-    """Handles the download of files linked via ASP.NET's __doPostBack mechanism."""
-    try:
-        form = page_soup.find("form", id="aspnetForm")
-        if not form:
-            logger.warning("Postback formu bulunamadı, dosya indirilemiyor.")
-            return
+def postback_request(page_soup: BeautifulSoup, href_value: str) -> tuple[str, dict]:
+    """
+    ASP.NET'in __doPostBack linkleri için gönderilmesi gereken (post_url, post_data) ikilisini döner.
+    Form veya event target bulunamazsa None döner.
+    """
+    form = page_soup.find("form", id="aspnetForm")
+    if not form:
+        logger.warning("Postback formu bulunamadı, dosya indirilemiyor.")
+        return None
+
+    match = re.search(r"__doPostBack\('([^']*)'", href_value)
+    if not match:
+        logger.warning(f"Postback event target ayrıştırılamadı: {href_value}")
+        return None
+    event_target = match.group(1)
+
+    post_data = {field.get("name"): field.get("value") for field in form.find_all("input")}
+    post_data['__EVENTTARGET'] = event_target
+    
+    post_url = URL + form['action']
+    logger.verbose(f"Postback isteği gönderiliyor: {post_url} (Event: {event_target})")
+    return post_url, post_data
 
-        match = re.search(r"__doPostBack\('([^']*)'", href_value)
-        if not match:
-            logger.warning(f"Postback event target ayrıştırılamadı: {href_value}")
-            return
-        event_target = match.group(1)
 
-        post_data = {field.get("name"): field.get("value") for field in form.find_all("input")}
-        post_data['__EVENTTARGET'] = event_target
-        
-        post_url = URL + form['action']
-        logger.verbose(f"Postback isteği gönderiliyor: {post_url} (Event: {event_target})")
+def _handle_postback_download(page_soup: BeautifulSoup, session: requests.Session, href_value: str, destination_folder: str) -> bool:
+    """
+    Handles the download of files linked via ASP.NET's __doPostBack mechanism.
+    Returns True if the file is in the archive afterwards.
+    """
+    try:
+        request = postback_request(page_soup, href_value)
+        if request is None:
+            return False
+        post_url, post_data = request
 
         file_response = session.post(post_url, data=post_data, stream=True, timeout=(10, 60))
         file_response.raise_for_status()
@@ -61,29 +84,39 @@ def _handle_postback_download(page_soup: BeautifulSoup, session: requests.Sessio
         
         if exists(file_path):
             logger.verbose(f"Teslim edilen dosya '{file_path}' zaten mevcut. Atlanıyor.")
-            return
+            return True
 
-        with open(file_path, "wb") as f:
-            f.write(file_response.content)
+        temp_path = file_path + ".tmp"
+        stream_to_file(file_response, temp_path)
+        os.replace(temp_path, file_path)
         
         logger.new_file(file_path)
+        return True
 
     except Exception as e:
         logger.error(f"Postback ile dosya indirilirken hata oluştu: {e}")
+        return False
 
 
-def archive_homeworks_for_course(course: Course, session: requests.Session, download_file_func: Callable):
-    """
-    Fetches, parses, and saves all homeworks, their details, and associated files for a given course.
-    """
-    logger.verbose(f"'{course.code} (CRN: {course.crn})' için ödevler arşivleniyor...")
-
+def homeworks_folder(course: Course) -> str:
+    """Dersin ödev klasörünün yolunu döner, klasör yoksa oluşturur."""
     unique_folder_name = f"{course.code} (CRN {course.crn})"
     sanitized_folder_name = sanitize_filename(unique_folder_name)
     course_base_path = join(globals.BASE_PATH, sanitized_folder_name)
     
     homeworks_path = join(course_base_path, sanitize_filename("Ödevler"))
     os.makedirs(homeworks_path, exist_ok=True)
+    return homeworks_path
+
+
+def archive_homeworks_for_course(course: Course, download_file_func: Callable):
+    """
+    Fetches, parses, and saves all homeworks, their details, and associated files for a given course.
+    """
+    session = globals.worker_session()
+    logger.verbose(f"'{course.code} (CRN: {course.crn})' için ödevler arşivleniyor...")
+
+    homeworks_path = homeworks_folder(course)
 
     homework_list_url = URL + course.link.strip() + HOMEWORK_URL_EXTENSION
     
@@ -93,9 +126,14 @@ def archive_homeworks_for_course(course: Course, session: requests.Session, down
         response.raise_for_status()
         
         if "debug" in globals.ARGV:
-            _dump_html_for_debug(course.crn, response, "Homework_List")
+            _dump_html_for_debug(course.crn, response.text, response.encoding, "Homework_List")
 
-        _parse_and_save_homeworks(response, homeworks_path, course, session, download_file_func)
+        if http_cache.is_unchanged(response) and "refresh" not in globals.ARGV:
+            logger.verbose(f"CRN {course.crn} ödev listesi son çalıştırmadan beri değişmemiş. Atlanıyor.")
+            return
+
+        if _parse_and_save_homeworks(response, homeworks_path, course, session, download_file_func):
+            http_cache.mark_processed(response)
 
     except requests.exceptions.RequestException as e:
         logger.error(f"'{course.code}' dersi için ödevler alınırken HTTP hatası oluştu: {e}")
@@ -103,105 +141,178 @@ def archive_homeworks_for_course(course: Course, session: requests.Session, down
         logger.error(f"'{course.code}' dersi için ödevler işlenirken beklenmedik bir hata oluştu: {e}")
 
 
-def _parse_and_save_homeworks(list_page_response: requests.Response, destination_folder: str, course: Course, session: requests.Session, download_file_func: Callable):
+def parse_homework_list(list_html: str) -> list[tuple[str, str]]:
+    """
+    Ödev listesi sayfasındaki her ödev için ('Ödevi Görüntüle' linki, satır parmak izi) döner.
+    Satır parmak izi, listede görünen başlık ve tarih bilgilerinden hesaplanır.
+    """
+    return parsers.homework_list(list_html)
+
+
+def homework_id_from_link(detail_link: str) -> str:
+    return detail_link.split('/')[-1]
+
+
+def stored_homework(course_crn: str, homework_id: str) -> HomeworkRecord:
+    """Ödevin önceki çalıştırmadaki kaydını döner. -refresh verilmişse None döner (ödev tekrar işlenir)."""
+    if "refresh" in globals.ARGV:
+        return None
+    return DB.get_homework(course_crn, homework_id)
+
+
+def detail_page_fingerprint(detail_html: str) -> str:
+    """Ödev detay sayfasının, her istekte değişen gizli form alanları hariç parmak izini döner."""
+    return fingerprint(_HIDDEN_INPUT_PATTERN.sub("", detail_html))
+
+
+def parse_homework_detail(detail_soup: BeautifulSoup, detail_page_url: str) -> HomeworkDetail:
+    """
+    Ödev detay sayfasını ayrıştırır. Ana içerik veya başlık bulunamazsa None döner.
+    'div.form2' bulunamazsa deadlines ve description None olur.
+    """
+    container = detail_soup.select_one("div.orta > div.ic")
+    if not container:
+        logger.warning(f"Ödev detay sayfasında ana içerik konteyneri ('div.orta > div.ic') bulunamadı: {detail_page_url}")
+        return None
+        
+    detail_title_element = container.select_one("h1")
+    if not detail_title_element:
+        logger.warning(f"Ödev başlığı ('h1') bulunamadı: {detail_page_url}")
+        return None
+
+    title = fix_turkish_characters(detail_title_element.get_text(strip=True))
+
+    deadlines_text = None
+    description_text = None
+    form_div = container.select_one("div.form2")
+    if form_div:
+        deadlines_text = "Tarih bilgisi bulunamadı."
+        deadline_table = form_div.find("table")
+        if deadline_table:
+            deadlines_text = fix_turkish_characters(deadline_table.get_text("\n", strip=True))
+
+        description_text = "Açıklama bulunamadı."
+        desc_title = form_div.find("span", class_="title_field", string=re.compile("Ödev Açıklaması", re.I))
+        if desc_title:
+            desc_content = desc_title.find_next_sibling("span", class_="data_field")
+            if desc_content:
+                description_text = fix_turkish_characters(desc_content.get_text("\n", strip=True))
+
+    resource_links = []
+    kaynak_dosyalar_header = container.find("h2", string=lambda t: t and "Kaynak Dosyalar" in fix_turkish_characters(t))
+    if kaynak_dosyalar_header:
+        table_container = kaynak_dosyalar_header.find_next_sibling("div")
+        if table_container:
+            table = table_container.find("table", class_="data")
+            if table:
+                resource_links = [link['href'] for link in table.select("a[href]")]
+
+    submitted_href = None
+    for a_tag in container.select('a[href]'):
+        link_text = fix_turkish_characters(a_tag.get_text(strip=True))
+        if "Yüklediğiniz ödev dosyalarını indirin" in link_text:
+            submitted_href = a_tag['href']
+            break
+
+    return HomeworkDetail(title, deadlines_text, description_text, resource_links, submitted_href)
+
+
+def save_homework_details(detail: HomeworkDetail, destination_folder: str, detail_page_url: str) -> str:
+    """
+    Ödeve ait klasörü oluşturur ve içine 'detaylar.txt' dosyasını (yoksa) yazar.
+    Ödev klasörünün yolunu döner.
+    """
+    homework_specific_folder = join(destination_folder, sanitize_filename(detail.title))
+    os.makedirs(homework_specific_folder, exist_ok=True)
+
+    info_file_path = join(homework_specific_folder, "detaylar.txt")
+    if not exists(info_file_path):
+        if detail.deadlines is not None:
+            with open(info_file_path, "w", encoding="utf-8") as f:
+                f.write(f"Ödev Detayları: {detail.title}\n" + "="*40 + "\n")
+                f.write(f"{detail.deadlines}\n\n")
+                f.write("--- Açıklama ---\n" + f"{detail.description}\n")
+            logger.new_file(info_file_path)
+        else:
+            logger.warning(f"Ödev detayları için 'div.form2' bulunamadı: {detail_page_url}")
+
+    return homework_specific_folder
+
+
+def _parse_and_save_homeworks(list_page_response: requests.Response, destination_folder: str, course: Course, session: requests.Session, download_file_func: Callable) -> bool:
     """
     Parses the homework list page, visits each homework's detail page,
     and saves the content and files.
+    Homeworks whose list row or detail page did not change since the last run are skipped.
+    Returns True if every homework on the page was archived without errors.
     """
-    list_soup = BeautifulSoup(list_page_response.text, "lxml")
-    homework_items = list_soup.select("table.data td")
+    homeworks = parse_homework_list(list_page_response.text)
+    failures = 0
     
-    if not homework_items:
+    if not homeworks:
         logger.verbose(f"CRN {course.crn} için 'table.data td' yapısında ödev bulunamadı.")
-        return
-
-    logger.verbose(f"{len(homework_items)} adet potansiyel ödev bulundu.")
-
-    for item in homework_items:
-        try:
-            detail_link_element = item.find("a", string=re.compile(r"Ödevi Görüntüle"))
-            if not detail_link_element or not detail_link_element.has_attr('href'):
-                continue
-
-            detail_page_url = URL + detail_link_element['href']
-            detail_response = session.get(detail_page_url)
-            detail_response.raise_for_status()
-
-            if "debug" in globals.ARGV:
-                try:
-                    homework_id = detail_link_element['href'].split('/')[-1]
-                    _dump_html_for_debug(course.crn, detail_response, f"Homework_Detail_{homework_id}")
-                except Exception as e:
-                    logger.warning(f"Could not dump homework detail HTML: {e}")
-
-            detail_soup = BeautifulSoup(detail_response.text, 'lxml')
-
-            container = detail_soup.select_one("div.orta > div.ic")
-            if not container:
-                logger.warning(f"Ödev detay sayfasında ana içerik konteyneri ('div.orta > div.ic') bulunamadı: {detail_page_url}")
-                continue
-                
-            detail_title_element = container.select_one("h1")
-            if not detail_title_element:
-                logger.warning(f"Ödev başlığı ('h1') bulunamadı: {detail_page_url}")
-                continue
-
-            title = fix_turkish_characters(detail_title_element.get_text(strip=True))
-            sanitized_title = sanitize_filename(title)
-            
-            homework_specific_folder = join(destination_folder, sanitized_title)
-            os.makedirs(homework_specific_folder, exist_ok=True)
-
-            info_file_path = join(homework_specific_folder, "detaylar.txt")
-            if not exists(info_file_path):
-                form_div = container.select_one("div.form2")
-                if form_div:
-                    deadlines_text = "Tarih bilgisi bulunamadı."
-                    deadline_table = form_div.find("table")
-                    if deadline_table:
-                        deadlines_text = fix_turkish_characters(deadline_table.get_text("\n", strip=True))
-
-                    description_text = "Açıklama bulunamadı."
-                    desc_title = form_div.find("span", class_="title_field", string=re.compile("Ödev Açıklaması", re.I))
-                    if desc_title:
-                        desc_content = desc_title.find_next_sibling("span", class_="data_field")
-                        if desc_content:
-                            description_text = fix_turkish_characters(desc_content.get_text("\n", strip=True))
-
-                    with open(info_file_path, "w", encoding="utf-8") as f:
-                        f.write(f"Ödev Detayları: {title}\n" + "="*40 + "\n")
-                        f.write(f"{deadlines_text}\n\n")
-                        f.write("--- Açıklama ---\n" + f"{description_text}\n")
-                    logger.new_file(info_file_path)
-                else:
-                    logger.warning(f"Ödev detayları için 'div.form2' bulunamadı: {detail_page_url}")
-
-            kaynak_dosyalar_header = container.find("h2", string=lambda t: t and "Kaynak Dosyalar" in fix_turkish_characters(t))
-            if kaynak_dosyalar_header:
-                table_container = kaynak_dosyalar_header.find_next_sibling("div")
-                if table_container:
-                    table = table_container.find("table", class_="data")
-                    if table:
-                        for link in table.select("a[href]"):
-                            download_file_func(URL + link['href'], homework_specific_folder)
-
-            submitted_files_link = None
-            for a_tag in container.select('a[href]'):
-                link_text = fix_turkish_characters(a_tag.get_text(strip=True))
-                if "Yüklediğiniz ödev dosyalarını indirin" in link_text:
-                    submitted_files_link = a_tag
-                    break
-            
-            if submitted_files_link:
-                href = submitted_files_link['href']
-                if 'javascript:__doPostBack' in href:
-                    _handle_postback_download(detail_soup, session, href, homework_specific_folder)
-                else:
-                    download_file_func(URL + href, homework_specific_folder)
-
-        except Exception as e:
-            error_url_part = "Bilinmeyen URL"
-            if 'detail_page_url' in locals():
-                error_url_part = detail_page_url
-            logger.warning(f"Bir ödev ({error_url_part}) işlenirken hata oluştu, atlanıyor: {e}")
-            continue
\ No newline at end of file
+        return True
+
+    logger.verbose(f"{len(homeworks)} adet potansiyel ödev bulundu.")
+
+    for detail_link, list_fingerprint in homeworks:
+        homework_id = homework_id_from_link(detail_link)
+        stored = stored_homework(course.crn, homework_id)
+        if stored and stored.list_fingerprint == list_fingerprint:
+            logger.debug(f"Ödev {homework_id} değişmemiş. Atlanıyor.")
+            continue
+
+        if not archive_homework(course, detail_link, list_fingerprint, destination_folder, session, download_file_func):
+            failures += 1
+
+    return failures == 0
+
+
+def archive_homework(course: Course, detail_link: str, list_fingerprint: str, destination_folder: str, session: requests.Session, download_file_func: Callable) -> bool:
+    """
+    Tek bir ödevin detay sayfasını, kaynak dosyalarını ve teslim edilen dosyayı arşivler.
+    Ödev (veya değişmemişse kaydı) arşivlendiyse True döner.
+    """
+    detail_page_url = URL + detail_link
+    homework_id = homework_id_from_link(detail_link)
+    stored = stored_homework(course.crn, homework_id)
+    try:
+        detail_response = session.get(detail_page_url)
+        detail_response.raise_for_status()
+
+        if "debug" in globals.ARGV:
+            _dump_html_for_debug(course.crn, detail_response.text, detail_response.encoding, f"Homework_Detail_{homework_id}")
+
+        detail_fingerprint = detail_page_fingerprint(detail_response.text)
+        if stored and stored.detail_fingerprint == detail_fingerprint:
+            logger.debug(f"Ödev {homework_id} detay sayfası değişmemiş. Atlanıyor.")
+            DB.add_homework(course.crn, homework_id, list_fingerprint, detail_fingerprint)
+            return True
+
+        detail_soup = BeautifulSoup(detail_response.text, 'lxml')
+        detail = parse_homework_detail(detail_soup, detail_page_url)
+        if detail is None:
+            return False
+
+        homework_specific_folder = save_homework_details(detail, destination_folder, detail_page_url)
+
+        archived = [
+            download_file_func(URL + resource_link, homework_specific_folder)
+            for resource_link in detail.resource_links
+        ]
+
+        if detail.submitted_href:
+            if 'javascript:__doPostBack' in detail.submitted_href:
+                archived.append(_handle_postback_download(detail_soup, session, detail.submitted_href, homework_specific_folder))
+            else:
+                archived.append(download_file_func(URL + detail.submitted_href, homework_specific_folder))
+
+        # Bir dosya indirilemediyse ödev kaydedilmez, sonraki çalıştırmada tekrar denenir
+        if all(archived):
+            DB.add_homework(course.crn, homework_id, list_fingerprint, detail_fingerprint)
+            return True
+        return False
+
+    except Exception as e:
+        logger.warning(f"Bir ödev ({detail_page_url}) işlenirken hata oluştu, atlanıyor: {e}")
+        return False
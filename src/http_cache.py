@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from os.path import basename, dirname, exists, join
+
+from requests import PreparedRequest, Response
+from requests.adapters import HTTPAdapter
+from requests.utils import get_encoding_from_headers
+
+from src import logger
+from src.metrics import Metrics
+
+CACHE_FOLDER_NAME = ".ninova_cache"
+
+
+class CachingAdapter(HTTPAdapter):
+    """
+    Ninova sayfaları için diskte tutulan koşullu HTTP önbelleği.
+
+    Her GET cevabının gövdesi, ETag / Last-Modified bilgisi ve gövdenin hash'i saklanır.
+    Sonraki isteklerde If-None-Match / If-Modified-Since gönderilir; 304 cevabı önbellekteki
+    gövde ile 200'e çevrilir. Dönen her cevapta 'unchanged' özelliği bulunur: sayfa son
+    işlendiğinden beri değişmediyse (304 veya aynı gövde hash'i) True olur. Sayfayı işleyen
+    kod işini bitirdiğinde mark_processed() ile bunu kaydeder.
+
+    stream=True ile yapılan istekler (dosya indirmeleri) önbelleğe alınmaz.
+    """
+
+    def __init__(self, cache_dir: str, **kwargs):
+        super().__init__(**kwargs)
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def send(self, request: PreparedRequest, stream=False, **kwargs) -> Response:
+        if request.method != "GET" or stream or "Range" in request.headers:
+            response = super().send(request, stream=stream, **kwargs)
+            response.unchanged = False
+            return response
+
+        meta_path, body_path = _entry_paths(self.cache_dir, request.url)
+        entry = _load_entry(meta_path, body_path)
+        if entry:
+            if entry.get("etag"):
+                request.headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                request.headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = super().send(request, stream=stream, **kwargs)
+
+        if response.status_code == 304 and entry:
+            # Gövde ham cevaptan okunmadığı için bağlantı havuza elle geri verilir, yoksa tekrar kullanılamaz
+            response.raw.drain_conn()
+            response.raw.release_conn()
+            with open(body_path, "rb") as f:
+                response._content = f.read()
+            response._content_consumed = True
+            response.status_code = 200
+            if entry.get("content_type"):
+                response.headers["Content-Type"] = entry["content_type"]
+            response.encoding = get_encoding_from_headers(response.headers)
+            response.unchanged = entry["processed"]
+            response.cache_meta_path = meta_path
+            Metrics.inc("http_cache_revalidated_total")
+            logger.debug(f"Önbellekten kullanıldı (304): {request.url}")
+            return response
+
+        response.unchanged = False
+        if response.status_code != 200 or "content-disposition" in response.headers:
+            return response
+
+        # Doğrulayıcı (ETag / Last-Modified) göndermeyen sunucular için gövde hash'i karşılaştırılır
+        body = response.content
+        body_hash = hashlib.sha1(body).hexdigest()
+        unchanged = bool(entry) and entry["hash"] == body_hash and entry["processed"]
+        try:
+            _store_entry(meta_path, body_path, {
+                "url": request.url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "content_type": response.headers.get("Content-Type"),
+                "hash": body_hash,
+                "processed": unchanged,
+            }, body)
+        except OSError as e:
+            logger.warning(f"Sayfa önbelleğe yazılamadı: {request.url} ({e})")
+            return response
+
+        response.unchanged = unchanged
+        response.cache_meta_path = meta_path
+        return response
+
+
+def cache_folder(base_path: str) -> str:
+    return join(base_path, CACHE_FOLDER_NAME)
+
+
+def clear_cache(base_path: str) -> None:
+    """Önbelleği siler. Veritabanı sıfırlandığında, önceki işlenme bilgileri geçersiz olduğu için çağrılır."""
+    folder = cache_folder(base_path)
+    if exists(folder):
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def is_unchanged(response: Response) -> bool:
+    """Sayfanın, son mark_processed() çağrısından beri değişmediğini döner."""
+    return getattr(response, "unchanged", False)
+
+
+def mark_processed(response: Response) -> None:
+    """
+    Sayfanın içeriğinin tamamen işlendiğini kaydeder. Sonraki çalıştırmalarda aynı içerik
+    gelirse cevap 'unchanged' olarak işaretlenir ve ayrıştırma atlanabilir.
+    """
+    meta_path = getattr(response, "cache_meta_path", None)
+    if not meta_path:
+        return
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        meta["processed"] = True
+        _write_json(meta_path, meta)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Önbellek kaydı güncellenemedi: {meta_path} ({e})")
+
+
+def _entry_paths(cache_dir: str, url: str) -> tuple[str, str]:
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return join(cache_dir, key + ".json"), join(cache_dir, key + ".body")
+
+
+def _load_entry(meta_path: str, body_path: str) -> dict:
+    if not (exists(meta_path) and exists(body_path)):
+        return None
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _store_entry(meta_path: str, body_path: str, meta: dict, body: bytes) -> None:
+    _write_atomically(body_path, body)
+    _write_json(meta_path, meta)
+
+
+def _write_json(path: str, data: dict) -> None:
+    _write_atomically(path, json.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+
+def _write_atomically(path: str, data: bytes) -> None:
+    """
+    Veriyi aynı klasörde benzersiz isimli geçici bir dosyaya yazıp path'in yerine koyar. Aynı sayfayı
+    aynı anda alan iş parçacıkları birbirinin geçici dosyasının üzerine yazmaz.
+    """
+    fd, temp_path = tempfile.mkstemp(prefix=basename(path) + ".", suffix=".tmp", dir=dirname(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
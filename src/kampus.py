@@ -2,28 +2,28 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from collections import namedtuple
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
 
-from src import globals
+from src import globals, parsers
 from src.login import URL
 from src import logger
+from src.db_handler import DB
+from src.metrics import STAGE_COURSE_DISCOVERY
 
 Course = namedtuple("Course", "code name crn link")
 COURSE_TITLE_OFFSET = 8
 
 
 # Kurs listesi döner: kurs kodu, kurs adı ve kursa ait ninova linki olan Course nesneleri
+@logger.speed_measure("Ders listesi alma", False, stage=STAGE_COURSE_DISCOVERY)
 def get_course_list() -> tuple[Course]:
     global URL
-    course_list = []
-    processed_crns = set() # Use a set to track processed CRNs for uniqueness
-    session = globals.SESSION
+    session = globals.worker_session()
 
     response = session.get(URL + "/Kampus1")
     raw_html = response.content.decode("utf-8")
-    page = BeautifulSoup(raw_html, "lxml")
 
-    crn_link_tags = page.select('.menuErisimAgaci a[href*="/Sinif/"]')
+    crn_link_tags = parsers.course_links(raw_html)
     
     logger.verbose(f"Erişim Ağacı içinde {len(crn_link_tags)} adet ders bölümü (CRN) linki bulundu.")
 
@@ -31,43 +31,71 @@ def get_course_list() -> tuple[Course]:
         logger.warning("Erişim Ağacı'nda hiçbir ders bölümü (CRN) bulunamadı.")
         return tuple()
 
-    for crn_link_tag in crn_link_tags:
-        try:
-            link_text = crn_link_tag.get_text(strip=True)
-            
-            if not link_text.startswith("CRN:"):
-                logger.verbose(f"Standart olmayan CRN linki atlanıyor: '{link_text}'")
-                continue
+    crn_links = _get_crn_links(crn_link_tags)
+
+    # Kodu ve adı veritabanında kayıtlı olan dersler için sınıf bilgileri sayfası istenmez
+    courses: list[Course] = [None] * len(crn_links)
+    to_fetch = []
+    for index, (crn, link) in enumerate(crn_links):
+        cached = None if "refresh" in globals.ARGV else DB.get_cached_course(link)
+        if cached:
+            courses[index] = Course(cached.code, cached.name, crn, link)
+            logger.verbose(f"Bulunan ders (kayıtlı): {cached.code} (CRN: {crn}) - {cached.name}")
+        else:
+            to_fetch.append(index)
+
+    if to_fetch:
+        # -workers 0 veya negatif verilse de en az bir iş parçacığı açılır (zamanlayıcıdaki gibi)
+        worker_count = max(1, min(globals.WORKER_COUNT, len(to_fetch)))
+        with ThreadPoolExecutor(max_workers=worker_count) as pool:
+            fetched = pool.map(lambda index: _fetch_course_info(*crn_links[index]), to_fetch)
+            for index, course in zip(to_fetch, fetched):
+                if course:
+                    courses[index] = course
+                    DB.add_course(course.link, course.crn, course.code, course.name)
+
+    return tuple(course for course in courses if course)
+
+
+def _get_crn_links(crn_link_tags: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    """Erişim ağacındaki (link metni, href) çiftlerinden, sırasını koruyarak tekil (crn, link) çiftlerini döner"""
+    crn_links = []
+    processed_crns = set() # Use a set to track processed CRNs for uniqueness
+    for link_text, href in crn_link_tags:
+
+        if not link_text.startswith("CRN:"):
+            logger.verbose(f"Standart olmayan CRN linki atlanıyor: '{link_text}'")
+            continue
+
+        crn = link_text.replace("CRN:", "").strip()
 
-            crn = link_text.replace("CRN:", "").strip()
+        if crn in processed_crns:
+            logger.verbose(f"Yinelenen CRN {crn} atlanıyor.")
+            continue
+        processed_crns.add(crn)
 
-            if crn in processed_crns:
-                logger.verbose(f"Yinelenen CRN {crn} atlanıyor.")
-                continue
-            processed_crns.add(crn)
+        crn_links.append((crn, href.strip()))
+    return crn_links
 
-            link = crn_link_tag["href"].strip()
-            
-            ders_info_page = session.get(URL + link + "/SinifBilgileri").content.decode("utf-8")
-            ders_info_soup = BeautifulSoup(ders_info_page, "lxml")
-            
-            ders_info_table = ders_info_soup.find(class_="formAbetGoster")
-            if not ders_info_table:
-                logger.warning(f"CRN {crn} için sınıf bilgileri tablosu bulunamadı, atlanıyor.")
-                continue
 
-            ders_info_rows = ders_info_table.select("tr")
-            
-            code = ders_info_rows[0].select("td")[1].text.strip()
-            name = ders_info_rows[1].select("td")[2].text.strip()
+def _fetch_course_info(crn: str, link: str) -> Course:
+    """Dersin sınıf bilgileri sayfasından kodunu ve adını okur, hata olursa None döner"""
+    try:
+        ders_info_page = globals.worker_session().get(URL + link + "/SinifBilgileri").content.decode("utf-8")
 
-            course_list.append(Course(code, name, crn, link))
-            logger.verbose(f"Bulunan ders: {code} (CRN: {crn}) - {name}")
+        ders_info = parsers.course_info(ders_info_page)
+        if not ders_info:
+            logger.warning(f"CRN {crn} için sınıf bilgileri tablosu bulunamadı, atlanıyor.")
+            return None
 
-        except Exception as e:
-            logger.warning(f"Bir ders/CRN ayrıştırılırken hata oluştu, atlanıyor: {e}")
+        code, name = ders_info
 
-    return tuple(course_list)
+        logger.verbose(f"Bulunan ders: {code} (CRN: {crn}) - {name}")
+        return Course(code, name, crn, link)
+
+    except Exception as e:
+        logger.warning(f"Bir ders/CRN ayrıştırılırken hata oluştu, atlanıyor: {e}")
+        return None
 
 
 def filter_courses(courses: tuple[Course]) -> tuple[Course]:
@@ -104,4 +132,27 @@ Tüm dersleri indirmek için boş bırakın ve enter'a basın
         return courses_filtered
     else:
         print("Tüm dersler indirilecek.")
-        return courses
\ No newline at end of file
+        return courses
+
+
+def select_courses(courses: tuple[Course], course_filters: list[str]) -> tuple[Course]:
+    """
+    Kullanıcıya sormadan (toplu mod) ders seçer: ders kodu (ör. 'BLG 101E', boşluk ve büyük/küçük harf
+    farkı gözetilmez) veya CRN ile eşleşen dersleri döner. Filtre verilmemişse tüm dersler seçilir.
+    """
+    if not course_filters:
+        return courses
+    wanted = {_normalize_course_filter(course_filter) for course_filter in course_filters}
+    selected = tuple(
+        course for course in courses
+        if _normalize_course_filter(course.code) in wanted or course.crn in wanted
+    )
+    matched = {_normalize_course_filter(course.code) for course in selected} | {course.crn for course in selected}
+    for course_filter in wanted - matched:
+        logger.warning(f"'{course_filter}' ile eşleşen bir ders bulunamadı.")
+    print(f"{len(selected)} ders indirilecek.")
+    return selected
+
+
+def _normalize_course_filter(text: str) -> str:
+    return "".join(text.split()).upper()
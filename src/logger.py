@@ -2,6 +2,8 @@
 
 from time import perf_counter
 
+from src.metrics import Metrics
+
 _DEBUG = False
 _VERBOSE = False
 _FILE_NAME_MAX_LENGTH = 30
@@ -42,12 +44,18 @@ def debug(message):
         print("DEBUG:  " + message)
 
 
-def speed_measure(debug_name: str, is_level_debug: bool, return_is_debug_info: bool = False):
+def speed_measure(debug_name: str, is_level_debug: bool, return_is_debug_info: bool = False, stage: str = None):
+    """
+    Fonksiyonun süresini ölçer ve yazdırır. stage verilirse süre, çalışma sonu raporu için
+    o aşamanın histogramına da eklenir.
+    """
     def decorator(func):
         def wrapper(*args, **kwargs):
             start = perf_counter()
             return_val = func(*args, **kwargs)
             end = perf_counter()
+            if stage:
+                Metrics.observe_stage(stage, end - start)
             
             additional_info = return_val[0] if return_is_debug_info else ""
 
@@ -1,14 +1,27 @@
 from src import logger
+from src.metrics import STAGE_LOGIN
+
+import json
+import os
+from os.path import exists
+from threading import local
+from typing import Callable
 
 try:
-    from bs4 import BeautifulSoup
     import requests
+    from src import parsers
+    from src.resilience import ResilientSession
 except ModuleNotFoundError:
     logger.fail(
         "Gerekli kütüphaneler eksik. Yüklemek için 'pip install -r requirements.txt' komutunu çalıştırın."
     )
 
 URL = "https://ninova.itu.edu.tr"
+LOGIN_HOST = "girisv3.itu.edu.tr"
+LOGIN_URL = "https://" + LOGIN_HOST
+LOGGED_IN_MARKER = "ctl00_Header1_tdLogout"  # sadece giriş yapılmışken sayfada bulunan çıkış butonu
+
+_reauth_state = local()
 
 
 def check_connection() -> bool:
@@ -33,36 +46,133 @@ def login(user_secure_info: tuple) -> requests.Session:
     }
 
     # Sayfayı isteyip parse etme
-    session = requests.Session()
+    # Giriş istekleri de diğer istekler gibi bağlantı hatalarında ve 429/5xx cevaplarında tekrar denenir
+    session = ResilientSession()
     try:
         page = session.get(_URL, headers=HEADERS)
-    except:
+    except requests.exceptions.RequestException:
         logger.warning("Ninova sunucusuna bağlanılamadı.")
         if check_connection():
             logger.fail("İnternet var ancak Ninova'ya bağlanılamıyor.")
         else:
             logger.fail("İnternete erişim yok. Bağlantınızı kontrol edin.")
+    # Tekrar denemelerden sonra hala hata dönüyorsa bu bir sunucu hatasıdır, şifre hatası değil
+    page.raise_for_status()
 
-    page = BeautifulSoup(page.content, "lxml")
-
-    post_data = dict()
-    for field in page.find_all("input"):
-        post_data[field.get("name")] = field.get("value")
+    form_action, post_data = parsers.login_form(page.content)
     post_data["ctl00$ContentPlaceHolder1$tbUserName"] = user_secure_info[0]
     post_data["ctl00$ContentPlaceHolder1$tbPassword"] = user_secure_info[1]
 
-    page = _login_request(session, post_data, page)
+    page = _login_request(session, post_data, form_action)
+    page.raise_for_status()
 
-    page = BeautifulSoup(page.content, "lxml")
-    if page.find(id="ctl00_Header1_tdLogout") is None:
+    # Sadece başarılı bir cevapta çıkış butonu yoksa giriş bilgileri yanlıştır
+    if LOGGED_IN_MARKER not in page.text:
         raise PermissionError("Kullanıcı adı veya şifre yanlış!")
     return session
 
-@logger.speed_measure("Giriş yapma", False, False)
-def _login_request(session: requests.Session, post_data: dict, page: BeautifulSoup):
+@logger.speed_measure("Giriş yapma", False, False, stage=STAGE_LOGIN)
+def _login_request(session: requests.Session, post_data: dict, form_action: str):
     page = session.post(
-        "https://girisv3.itu.edu.tr" + page.form.get("action")[1:], data=post_data
+        LOGIN_URL + form_action[1:], data=post_data
     )
     return page
 
+
+def is_logged_in(session: requests.Session) -> bool:
+    """
+    Oturumun hala geçerli olup olmadığını ana sayfayı isteyerek kontrol eder. İstek tekrar denemelerden
+    sonra da başarısız olursa (bağlantı hatası veya 5xx) requests.exceptions.RequestException fırlatılır;
+    bu durumda oturumun geçerli olup olmadığı bilinmez.
+    """
+    page = session.get(URL + "/Kampus1", timeout=(10, 30))
+    page.raise_for_status()
+    return LOGGED_IN_MARKER in page.text
+
+
+def save_session(session: requests.Session, file_path: str) -> None:
+    """
+    Oturum çerezlerini dosyaya yazar. Dosya sadece kullanıcının okuyabileceği izinlerle oluşturulur.
+    Şifre kaydedilmez.
+    """
+    cookies = [
+        {
+            "name": cookie.name,
+            "value": cookie.value,
+            "domain": cookie.domain,
+            "path": cookie.path,
+            "expires": cookie.expires,
+            "secure": cookie.secure,
+        }
+        for cookie in session.cookies
+    ]
+    try:
+        fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(cookies, f)
+    except OSError as e:
+        logger.warning(f"Oturum bilgileri kaydedilemedi: {e}")
+
+
+def load_session(file_path: str) -> requests.Session:
+    """
+    Kaydedilmiş çerezlerle bir oturum oluşturur. Dosya yoksa veya oturum artık geçerli değilse None döner.
+    """
+    if not exists(file_path):
+        return None
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            cookies = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Kayıtlı oturum okunamadı: {e}")
+        return None
+
+    session = ResilientSession()
+    for cookie in cookies:
+        session.cookies.set(
+            cookie["name"],
+            cookie["value"],
+            domain=cookie["domain"],
+            path=cookie["path"],
+            expires=cookie["expires"],
+            secure=cookie["secure"],
+        )
+
+    try:
+        if not is_logged_in(session):
+            logger.verbose("Kayıtlı oturumun süresi dolmuş.")
+            return None
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Kayıtlı oturum kontrol edilemedi, tekrar giriş yapılacak: {e}")
+        return None
+    return session
+
+
+def is_login_redirect(response: requests.Response) -> bool:
+    return response.is_redirect and LOGIN_HOST in response.headers.get("Location", "")
+
+
+def enable_reauthentication(session: requests.Session, refresh_login: Callable[[requests.Session], None]) -> None:
+    """
+    Oturum süresi dolduğunda giriş sayfasına yönlendirilen istekleri yakalar; refresh_login ile
+    oturumun çerezlerini yeniletir (gerekirse tekrar giriş yapılır) ve isteği yeni çerezlerle
+    yeniden gönderir.
+    """
+    def reauthenticate(response: requests.Response, *args, **kwargs):
+        if not is_login_redirect(response) or getattr(_reauth_state, "active", False):
+            return response
+
+        _reauth_state.active = True
+        try:
+            refresh_login(session)
+
+            request = response.request.copy()
+            request.headers.pop("Cookie", None)
+            request.prepare_cookies(session.cookies)
+            return session.send(request, allow_redirects=True, **kwargs)
+        finally:
+            _reauth_state.active = False
+
+    session.hooks["response"].append(reauthenticate)
+
 # Fonksiyon debug isimleri
\ No newline at end of file
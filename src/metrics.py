@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+# Çalışma boyunca toplanan performans ölçümleri (sayaç, gösterge ve süre histogramları).
+# Çalışma sonunda JSON raporu ve isteğe bağlı Prometheus metin dosyası olarak yazılır.
+# logger bu modülü kullandığı için burada logger import edilmez.
+
+import json
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+
+# Süre histogramlarının üst sınırları (saniye)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+PROMETHEUS_PREFIX = "ninova_"
+
+# Aşama isimleri, speed_measure(stage=...) ve Metrics.timer() ile kullanılır
+STAGE_LOGIN = "login"
+STAGE_COURSE_DISCOVERY = "course_discovery"
+STAGE_LISTING_FETCH = "listing_fetch"
+STAGE_PARSE = "parse"
+STAGE_DOWNLOAD = "download"
+STAGE_DISK_WRITE = "disk_write"
+STAGE_DB_WRITE = "db_write"
+
+
+class _Histogram:
+    __slots__ = ("buckets", "count", "sum", "min", "max")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # son eleman +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float) -> None:
+        self.buckets[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Kovalardan yaklaşık yüzdelik değeri (kova içinde doğrusal ara değer) döner"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        lower = 0.0
+        for index, bucket_count in enumerate(self.buckets):
+            upper = LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else self.max
+            if cumulative + bucket_count >= rank and bucket_count:
+                fraction = (rank - cumulative) / bucket_count
+                return min(lower + (upper - lower) * fraction, self.max)
+            cumulative += bucket_count
+            lower = upper
+        return self.max
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": {str(bound): count for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), self.buckets)},
+        }
+
+
+class Metrics:
+    """
+    İş parçacıkları arasında paylaşılan ölçüm kaydı. Her ölçüm bir isim ve etiketlerle
+    (ör. stage="download", course="BLG 101E (CRN 12345)") tanımlanır.
+    Zamanlayıcının çalıştırdığı işlerde (ve async motordaki görevlerde) set_course() ile
+    dersin adı o iş parçacığına/göreve bağlanır, course_label() ile okunur.
+    """
+
+    _lock = Lock()
+    _counters: dict[tuple, float] = {}
+    _gauges: dict[tuple, float] = {}
+    _histograms: dict[tuple, _Histogram] = {}
+    _course: ContextVar[str] = ContextVar("course", default=None)
+    started_at = time.time()
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls._counters = {}
+            cls._gauges = {}
+            cls._histograms = {}
+        cls.started_at = time.time()
+
+    @classmethod
+    def set_course(cls, course: str) -> None:
+        cls._course.set(course)
+
+    @classmethod
+    def course_label(cls) -> str:
+        return cls._course.get() or "-"
+
+    @classmethod
+    def inc(cls, name: str, value: float = 1, **labels) -> None:
+        key = _key(name, labels)
+        with cls._lock:
+            cls._counters[key] = cls._counters.get(key, 0) + value
+
+    @classmethod
+    def set_gauge(cls, name: str, value: float, **labels) -> None:
+        with cls._lock:
+            cls._gauges[_key(name, labels)] = value
+
+    @classmethod
+    def max_gauge(cls, name: str, value: float, **labels) -> None:
+        """Göstergeyi, verilen değer mevcut değerden büyükse günceller (en yüksek değer takibi)"""
+        key = _key(name, labels)
+        with cls._lock:
+            if value > cls._gauges.get(key, float("-inf")):
+                cls._gauges[key] = value
+
+    @classmethod
+    def observe(cls, name: str, value: float, **labels) -> None:
+        key = _key(name, labels)
+        with cls._lock:
+            histogram = cls._histograms.get(key)
+            if histogram is None:
+                histogram = cls._histograms[key] = _Histogram()
+            histogram.observe(value)
+
+    @classmethod
+    def observe_stage(cls, stage: str, seconds: float) -> None:
+        cls.observe("stage_seconds", seconds, stage=stage)
+
+    @classmethod
+    def record_response(cls, response, *args, **kwargs) -> None:
+        """requests için response hook'u: HTTP durum kodlarını ders bazında sayar"""
+        cls.inc("http_responses_total", status=response.status_code, course=cls.course_label())
+        cls.observe("http_response_seconds", response.elapsed.total_seconds())
+
+    @classmethod
+    @contextmanager
+    def timer(cls, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls.observe_stage(stage, time.perf_counter() - start)
+
+    @classmethod
+    def snapshot(cls) -> dict:
+        """Tüm ölçümleri JSON'a yazılabilir bir sözlük olarak döner"""
+        with cls._lock:
+            counters = dict(cls._counters)
+            gauges = dict(cls._gauges)
+            histograms = {key: histogram.as_dict() for key, histogram in cls._histograms.items()}
+
+        finished_at = time.time()
+        return {
+            "started_at": cls.started_at,
+            "finished_at": finished_at,
+            "duration_seconds": finished_at - cls.started_at,
+            "counters": _group(counters),
+            "gauges": _group(gauges),
+            "histograms": _group(histograms),
+        }
+
+    @classmethod
+    def write_json(cls, path: str) -> None:
+        _write_text(path, json.dumps(cls.snapshot(), ensure_ascii=False, indent=2))
+
+    @classmethod
+    def write_prometheus(cls, path: str) -> None:
+        """Ölçümleri Prometheus metin formatında (node_exporter textfile collector için) yazar"""
+        with cls._lock:
+            counters = sorted(cls._counters.items())
+            gauges = sorted(cls._gauges.items())
+            histograms = sorted(
+                ((key, list(h.buckets), h.sum, h.count) for key, h in cls._histograms.items()),
+                key=lambda item: item[0],
+            )
+
+        lines = []
+        for metric_type, items in (("counter", counters), ("gauge", gauges)):
+            last_name = None
+            for (name, labels), value in items:
+                if name != last_name:
+                    lines.append(f"# TYPE {PROMETHEUS_PREFIX}{name} {metric_type}")
+                    last_name = name
+                lines.append(f"{PROMETHEUS_PREFIX}{name}{_prometheus_labels(labels)} {value}")
+
+        last_name = None
+        for (name, labels), buckets, total, count in histograms:
+            full_name = PROMETHEUS_PREFIX + name
+            if name != last_name:
+                lines.append(f"# TYPE {full_name} histogram")
+                last_name = name
+            cumulative = 0
+            for bound, bucket_count in zip(LATENCY_BUCKETS + ("+Inf",), buckets):
+                cumulative += bucket_count
+                lines.append(f"{full_name}_bucket{_prometheus_labels(labels + (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{full_name}_sum{_prometheus_labels(labels)} {total}")
+            lines.append(f"{full_name}_count{_prometheus_labels(labels)} {count}")
+
+        _write_text(path, "\n".join(lines) + "\n")
+
+
+def _key(name: str, labels: dict) -> tuple:
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+def _group(values: dict) -> dict:
+    """{(isim, etiketler): değer} sözlüğünü {isim: [{"labels": {...}, "value": değer}]} biçimine çevirir"""
+    grouped = {}
+    for (name, labels), value in sorted(values.items(), key=lambda item: item[0]):
+        grouped.setdefault(name, []).append({"labels": dict(labels), "value": value})
+    return grouped
+
+
+def _prometheus_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{label}="{_escape_label_value(value)}"' for label, value in labels) + "}"
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _write_text(path: str, text: str) -> None:
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temp_path, path)
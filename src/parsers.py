@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+# Sık istenen Ninova sayfaları için lxml üzerine kurulu, derlenmiş XPath kullanan ayrıştırıcılar.
+# Her fonksiyon sayfanın sadece ihtiyaç duyulan kısmını okur ve düz tuple/list döner;
+# BeautifulSoup ağacı oluşturulmadığı için sayfa başına işlemci maliyeti çok daha düşüktür.
+# Metin çıkarma kuralları BeautifulSoup'un get_text() davranışı ile aynıdır
+# (yorumlar, script ve style içerikleri dahil edilmez).
+
+from lxml import etree, html
+
+from src import logger
+from src.metrics import STAGE_PARSE
+from src.utils import sanitize_filename, fingerprint
+
+_HTML_PARSER = html.HTMLParser(encoding="utf-8")
+
+
+def _has_class(name: str) -> str:
+    """CSS'teki '.name' seçicisinin XPath karşılığı"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _xpath(expression: str) -> etree.XPath:
+    return etree.XPath(expression, smart_strings=False)
+
+
+_TEXT_NODES = _xpath(".//text()[not(ancestor::script) and not(ancestor::style)]")
+
+# --- Dosya listeleri (/SinifDosyalari, /DersDosyalari ve alt klasörler) ---
+_FILE_TABLE = _xpath(f"//*[{_has_class('dosyaSistemi')}]//table[{_has_class('data')}]")
+_ROWS = _xpath(".//tr")
+_CELLS = _xpath(".//td")
+_FIRST_LINK = _xpath("(.//a)[1]")
+_FIRST_IMAGE = _xpath("(.//img)[1]")
+
+# --- Duyurular ---
+_ANNOUNCEMENT_BLOCKS = _xpath(f"//div[{_has_class('duyuruGoruntule')}]")
+_ANNOUNCEMENT_TITLE_LINK = _xpath("(.//h2//a)[1]")
+_CONTENT_CONTAINER = _xpath(f"(//div[{_has_class('orta')}]/div[{_has_class('ic')}])[1]")
+_FIRST_H1 = _xpath("(.//h1)[1]")
+_FIRST_ANNOUNCEMENT_BLOCK = _xpath(f"(.//div[{_has_class('duyuruGoruntule')}])[1]")
+_DATE_AUTHOR_SPANS = _xpath(f".//div[{_has_class('tarih')}]/span[{_has_class('tarih')}]")
+_ANNOUNCEMENT_CONTENT = _xpath(f"(.//div[{_has_class('icerik')}])[1]")
+
+# --- Ödev listesi ---
+_HOMEWORK_CELLS = _xpath(f"//table[{_has_class('data')}]//td")
+_HOMEWORK_DETAIL_LINK = _xpath("(.//a[contains(string(.), 'Ödevi Görüntüle')])[1]")
+_PARENT_ROW = _xpath("ancestor::tr[1]")
+
+# --- Kampüs sayfaları ve giriş formu ---
+_COURSE_LINKS = _xpath(f"//*[{_has_class('menuErisimAgaci')}]//a[contains(@href, '/Sinif/')]")
+_COURSE_INFO_TABLE = _xpath(f"(//*[{_has_class('formAbetGoster')}])[1]")
+_INPUTS = _xpath("//input")
+_FIRST_FORM = _xpath("(//form)[1]")
+
+
+def _parse(page: str | bytes):
+    """
+    Sayfayı lxml ağacına çevirir, sayfa boşsa veya ayrıştırılamıyorsa None döner.
+    Metin olarak verilen sayfalar, karakterleri değişmeden kalsın diye UTF-8 olarak ayrıştırılır;
+    byte olarak verilenlerde kodlama sayfadan okunur.
+    """
+    try:
+        if isinstance(page, str):
+            return html.fromstring(page.encode("utf-8"), parser=_HTML_PARSER)
+        return html.fromstring(page)
+    except (etree.ParserError, ValueError):
+        return None
+
+
+def _text(element, separator: str = "", strip: bool = False) -> str:
+    """BeautifulSoup'taki element.get_text(separator, strip) ile aynı sonucu verir"""
+    strings = _TEXT_NODES(element)
+    if strip:
+        strings = [string.strip() for string in strings]
+        strings = [string for string in strings if string]
+    return separator.join(strings)
+
+
+def _first(xpath: etree.XPath, element):
+    result = xpath(element)
+    return result[0] if result else None
+
+
+def _get_mb_file_size_from_string(raw_file_size: str) -> float:
+    size_info = raw_file_size.strip().split(" ")
+    size_as_float = float(size_info[0])
+    if size_info[1] == "KB":
+        size_as_float /= 1024
+    return size_as_float
+
+
+@logger.speed_measure("Dosya listesi ayrıştırma", True, stage=STAGE_PARSE)
+def file_listing(raw_html: str) -> list[tuple]:
+    """
+    Dosya listesi sayfasındaki satırları (file_link, file_size, isFolder, file_name) olarak döner.
+    Sayfa bir dosya listesi değilse boş liste döner.
+    """
+    root = _parse(raw_html)
+    table = _first(_FILE_TABLE, root) if root is not None else None
+    if table is None:
+        return []  # 'dosya' başka bir sayfaya link ise
+
+    file_infos = []
+    for row in _ROWS(table)[1:]:  # ilk satır tablonun başlığı
+        info = _file_info(row)
+        if info:
+            file_infos.append(info)
+    return file_infos
+
+
+def _file_info(row) -> tuple:
+    try:
+        file_info = _CELLS(row)
+        file_a_tag = _first(_FIRST_LINK, file_info[0])
+        file_name = sanitize_filename(_text(file_a_tag))
+        file_size = _get_mb_file_size_from_string(_text(file_info[1]))
+        isFolder = _first(_FIRST_IMAGE, file_info[0]).attrib["src"].endswith("/folder.png")
+        file_link = file_a_tag.attrib["href"]
+    except:
+        return None
+
+    return file_link, file_size, isFolder, file_name
+
+
+@logger.speed_measure("Duyuru listesi ayrıştırma", True, stage=STAGE_PARSE)
+def announcement_links(list_html: str) -> list[str]:
+    """
+    Duyuru listesi sayfasındaki her duyurunun detay sayfası linkini döner.
+    Sayfada 'div.duyuruGoruntule' yapısı yoksa None döner.
+    """
+    root = _parse(list_html)
+    announcement_items = _ANNOUNCEMENT_BLOCKS(root) if root is not None else []
+    if not announcement_items:
+        return None
+
+    detail_links = []
+    for item in announcement_items:
+        title_link_element = _first(_ANNOUNCEMENT_TITLE_LINK, item)
+        if title_link_element is not None and "href" in title_link_element.attrib:
+            detail_links.append(title_link_element.attrib["href"])
+    return detail_links
+
+
+@logger.speed_measure("Duyuru detayı ayrıştırma", True, stage=STAGE_PARSE)
+def announcement_detail(detail_html: str) -> tuple[str, str, str, str]:
+    """
+    Duyuru detay sayfasından (başlık, yayınlayan, tarih, içerik) ham metinlerini döner.
+    Ana içerik (div.orta > div.ic) yoksa None, diğer parçalardan biri eksikse
+    ilgili alan None olur.
+    """
+    root = _parse(detail_html)
+    container = _first(_CONTENT_CONTAINER, root) if root is not None else None
+    if container is None:
+        return None
+
+    title_element = _first(_FIRST_H1, container)
+    title = _text(title_element, strip=True) if title_element is not None else None
+
+    author = date_str = content = None
+    announcement_block = _first(_FIRST_ANNOUNCEMENT_BLOCK, container)
+    if announcement_block is not None:
+        date_and_author_spans = _DATE_AUTHOR_SPANS(announcement_block)
+        if len(date_and_author_spans) >= 2:
+            date_str = _text(date_and_author_spans[0], strip=True)
+            author = _text(date_and_author_spans[1], strip=True)
+        content_element = _first(_ANNOUNCEMENT_CONTENT, announcement_block)
+        if content_element is not None:
+            content = _text(content_element, "\n", strip=True)
+
+    return title, author, date_str, content
+
+
+@logger.speed_measure("Ödev listesi ayrıştırma", True, stage=STAGE_PARSE)
+def homework_list(list_html: str) -> list[tuple[str, str]]:
+    """
+    Ödev listesi sayfasındaki her ödev için ('Ödevi Görüntüle' linki, satır parmak izi) döner.
+    Satır parmak izi, listede görünen başlık ve tarih bilgilerinden hesaplanır.
+    """
+    root = _parse(list_html)
+    if root is None:
+        return []
+
+    homeworks = []
+    for item in _HOMEWORK_CELLS(root):
+        detail_link_element = _first(_HOMEWORK_DETAIL_LINK, item)
+        if detail_link_element is not None and "href" in detail_link_element.attrib:
+            row = _first(_PARENT_ROW, item)
+            row = row if row is not None else item
+            homeworks.append((detail_link_element.attrib["href"], fingerprint(_text(row, " ", strip=True))))
+    return homeworks
+
+
+@logger.speed_measure("Erişim ağacı ayrıştırma", True, stage=STAGE_PARSE)
+def course_links(kampus_html: str) -> list[tuple[str, str]]:
+    """Erişim ağacındaki ders bölümü linklerini (link metni, href) olarak döner"""
+    root = _parse(kampus_html)
+    if root is None:
+        return []
+    return [(_text(link, strip=True), link.get("href", "")) for link in _COURSE_LINKS(root)]
+
+
+@logger.speed_measure("Sınıf bilgileri ayrıştırma", True, stage=STAGE_PARSE)
+def course_info(info_html: str) -> tuple[str, str]:
+    """
+    Sınıf bilgileri sayfasından (ders kodu, ders adı) döner.
+    Bilgi tablosu yoksa None döner, tablo beklenen yapıda değilse IndexError oluşur.
+    """
+    root = _parse(info_html)
+    table = _first(_COURSE_INFO_TABLE, root) if root is not None else None
+    if table is None:
+        return None
+    rows = _ROWS(table)
+    code = _text(_CELLS(rows[0])[1]).strip()
+    name = _text(_CELLS(rows[1])[2]).strip()
+    return code, name
+
+
+@logger.speed_measure("Giriş formu ayrıştırma", True, stage=STAGE_PARSE)
+def login_form(login_html: str | bytes) -> tuple[str, dict]:
+    """Giriş sayfasındaki ilk formun action adresini ve tüm input alanlarını (isim -> değer) döner"""
+    root = _parse(login_html)
+    if root is None:
+        return None, {}
+    form = _first(_FIRST_FORM, root)
+    action = form.get("action") if form is not None else None
+    return action, {field.get("name"): field.get("value") for field in _INPUTS(root)}
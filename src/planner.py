@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+# Plan modu (-plan, -plan-only)
+# 1. aşama: Tüm derslerin Sınıf/Ders Dosyaları ağaçları, duyuru ve ödev listeleri taranır ve bir
+#    plana (JSON manifest) yazılır. Dosya indirilmez; her kaydın adresi, numarası, listedeki boyutu,
+#    hedef klasörü ve veritabanındaki durumu tutulur. Dosyaların diske yazılacağı isim sunucunun
+#    gönderdiği başlıktan belli olduğu için planda sadece listedeki isim (listing_name) bulunur.
+# 2. aşama: Plandaki yapılacak işler, ders ayrımı olmadan tek bir kuyruğa eklenir: önce duyuru ve
+#    ödevler, sonra dosyalar zamanlayıcının sıralama politikasına (-policy) göre.
+# -plan-only sadece planı yazar ve toplamları gösterir.
+
+import json
+import os
+import time
+from os.path import join
+from threading import Lock
+
+from src import globals, http_cache, logger
+from src.announcement_handler import (
+    DUYURULAR_URL_EXTENSION,
+    announcement_id_from_link,
+    announcements_folder,
+    AnnouncementBatch,
+    is_detail_fetch_needed,
+    parse_announcement_list,
+)
+from src.db_handler import DB, FILE_STATUS
+from src.downloader import FILE_LISTINGS, LARGE_FILE_SIZE, _download_file, _get_listing, course_folder, extract_file_id
+from src.homework_handler import (
+    HOMEWORK_URL_EXTENSION,
+    archive_homework,
+    homework_id_from_link,
+    homeworks_folder,
+    parse_homework_list,
+    stored_homework,
+)
+from src.kampus import Course
+from src.login import URL
+from src.parsers import file_listing
+from src.scheduler import PRIORITY_FILE, PRIORITY_LARGE_FILE, PRIORITY_LISTING, Scheduler
+from src.task_handler import course_group
+from src.utils import sanitize_filename
+
+PLAN_FILE_NAME = "ninova_arsivci_plan.json"
+MANIFEST_VERSION = 2
+
+KIND_FILE = "file"
+KIND_ANNOUNCEMENT = "announcement"
+KIND_HOMEWORK = "homework"
+
+STATUS_NEW = "new"
+STATUS_CHANGED = "changed"
+STATUS_DELETED = "deleted"
+STATUS_ARCHIVED = "archived"
+# Bu durumdaki kayıtlar 2. aşamada işlenir
+PENDING_STATUSES = (STATUS_NEW, STATUS_CHANGED, STATUS_DELETED)
+
+
+def plan_path() -> str:
+    return join(globals.BASE_PATH, PLAN_FILE_NAME)
+
+
+def run_plan(courses: tuple[Course]) -> None:
+    """Planı oluşturur, dosyaya yazar ve -plan-only verilmemişse uygular."""
+    manifest = crawl(courses)
+    path = plan_path()
+    try:
+        write_manifest(manifest, path)
+        print(f"Plan yazıldı: {path}")
+    except OSError as e:
+        logger.warning(f"Plan dosyası yazılamadı: {e}")
+    print_totals(manifest)
+    if "plan-only" not in globals.ARGV:
+        execute(manifest)
+
+
+class _Crawl:
+    """1. aşamada işçilerin bulduğu kayıtları toplar"""
+
+    def __init__(self):
+        self.entries: list[dict] = []
+        self.listing_requests = 0
+        self._lock = Lock()
+
+    def add(self, entry: dict) -> None:
+        with self._lock:
+            self.entries.append(entry)
+
+    def count_request(self) -> None:
+        with self._lock:
+            self.listing_requests += 1
+
+
+@logger.speed_measure("Plan oluşturma", False)
+def crawl(courses: tuple[Course]) -> dict:
+    """Derslerin dosya ağaçlarını, duyuru ve ödev listelerini tarar ve planı döner. Dosya indirilmez."""
+    print("Dersler taranıyor...")
+    state = _Crawl()
+    Scheduler.init(globals.WORKER_COUNT, globals.SCHEDULING_POLICY, globals.LARGE_FILE_SLOTS)
+    for course in courses:
+        Scheduler.submit(PRIORITY_LISTING, _crawl_course, course, state, group=course_group(course))
+    Scheduler.wait()
+    Scheduler.shutdown()
+
+    entries = sorted(state.entries, key=lambda entry: (entry["course"], entry["kind"], entry["destination"]))
+    return {
+        "version": MANIFEST_VERSION,
+        "created_at": time.time(),
+        "base_path": globals.BASE_PATH,
+        "courses": [course._asdict() for course in courses],
+        "listing_requests": state.listing_requests,
+        "totals": _totals(entries),
+        "entries": entries,
+    }
+
+
+def _crawl_course(course: Course, state: _Crawl) -> None:
+    session = globals.worker_session()
+    group = course_group(course)
+    for url_extension, folder_name in FILE_LISTINGS:
+        listing_url = URL + course.link + url_extension
+        Scheduler.submit(PRIORITY_LISTING, _crawl_folder, listing_url, join(course_folder(course), sanitize_filename(folder_name)), group, state)
+
+    state.count_request()
+    response = session.get(URL + course.link + DUYURULAR_URL_EXTENSION)
+    if not _is_skippable(response):
+        for detail_link in parse_announcement_list(response.text) or []:
+            announcement_id = announcement_id_from_link(detail_link)
+            state.add({
+                "kind": KIND_ANNOUNCEMENT,
+                "course": group,
+                "url": URL + detail_link,
+                "id": announcement_id,
+                "size": None,
+                "destination": join(course_folder(course), sanitize_filename("Duyurular")),
+                "status": STATUS_NEW if is_detail_fetch_needed(course.crn, announcement_id) else STATUS_ARCHIVED,
+            })
+
+    state.count_request()
+    response = session.get(URL + course.link.strip() + HOMEWORK_URL_EXTENSION)
+    if not _is_skippable(response):
+        for detail_link, list_fingerprint in parse_homework_list(response.text):
+            homework_id = homework_id_from_link(detail_link)
+            stored = stored_homework(course.crn, homework_id)
+            if stored is None:
+                status = STATUS_NEW
+            elif stored.list_fingerprint != list_fingerprint:
+                status = STATUS_CHANGED
+            else:
+                status = STATUS_ARCHIVED
+            state.add({
+                "kind": KIND_HOMEWORK,
+                "course": group,
+                "url": URL + detail_link,
+                "id": homework_id,
+                "size": None,
+                "destination": join(course_folder(course), sanitize_filename("Ödevler")),
+                "status": status,
+                "list_fingerprint": list_fingerprint,
+            })
+
+
+def _is_skippable(response) -> bool:
+    """Liste sayfası alınamadıysa veya son işlendiğinden beri değişmediyse True döner"""
+    if not response.ok:
+        logger.warning(f"{response.url} alınamadı ({response.status_code}), plana eklenmedi.")
+        return True
+    return http_cache.is_unchanged(response) and "refresh" not in globals.ARGV
+
+
+def _crawl_folder(listing_url: str, destination_folder: str, group: str, state: _Crawl) -> None:
+    state.count_request()
+    raw_html = _get_listing(globals.worker_session(), listing_url)
+    if raw_html is None:
+        return
+    for file_link, file_size, is_folder, file_name in file_listing(raw_html):
+        if is_folder:
+            Scheduler.submit(PRIORITY_LISTING, _crawl_folder, URL + file_link, join(destination_folder, sanitize_filename(file_name)), group, state)
+            continue
+        file_id = extract_file_id(URL + file_link)
+        state.add({
+            "kind": KIND_FILE,
+            "course": group,
+            "url": URL + file_link,
+            "id": file_id,
+            # Listede KB/MB olarak yuvarlanmış boyut
+            "size": int(file_size * 1024 * 1024),
+            "destination": destination_folder,
+            # Listedeki isim; dosya sunucunun gönderdiği isimle kaydedilir, bu isimden farklı olabilir
+            "listing_name": file_name,
+            "status": _file_status(file_id),
+        })
+
+
+def _file_status(file_id: int) -> str:
+    if file_id == -1:
+        return STATUS_NEW
+    status = DB.check_file_status(file_id)
+    if status == FILE_STATUS.EXISTS:
+        return STATUS_ARCHIVED
+    if status == FILE_STATUS.DELETED:
+        return STATUS_DELETED
+    return STATUS_NEW
+
+
+def _totals(entries: list[dict]) -> dict:
+    pending = [entry for entry in entries if entry["status"] in PENDING_STATUSES]
+    pending_files = [entry for entry in pending if entry["kind"] == KIND_FILE]
+    return {
+        "entries": len(entries),
+        "pending": len(pending),
+        "new_files": len(pending_files),
+        "new_file_bytes": sum(entry["size"] for entry in pending_files),
+        "new_announcements": sum(entry["kind"] == KIND_ANNOUNCEMENT for entry in pending),
+        "changed_homeworks": sum(entry["kind"] == KIND_HOMEWORK for entry in pending),
+        # Her bekleyen kayıt en az bir istek; ödevlerin dosyaları detay sayfası alınınca belli olur
+        "estimated_requests": len(pending),
+    }
+
+
+def write_manifest(manifest: dict, path: str) -> None:
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+def print_totals(manifest: dict) -> None:
+    totals = manifest["totals"]
+    print(
+        f"Plan: {len(manifest['courses'])} ders, {totals['entries']} kayıt ({manifest['listing_requests']} liste isteği ile tarandı).\n"
+        f"  Yeni dosya: {totals['new_files']} ({totals['new_file_bytes'] / 1024 / 1024:.1f} MB, listedeki boyutlara göre)\n"
+        f"  Yeni duyuru: {totals['new_announcements']}, yeni/değişen ödev: {totals['changed_homeworks']}\n"
+        f"  Uygulamak için gereken en az istek sayısı: {totals['estimated_requests']}"
+    )
+
+
+def execute(manifest: dict) -> None:
+    """Plandaki bekleyen kayıtları tek bir kuyrukta, dersler arasında ayrım yapmadan işler."""
+    courses = {course_group(course): course for course in (Course(**course) for course in manifest["courses"])}
+    pending = [entry for entry in manifest["entries"] if entry["status"] in PENDING_STATUSES]
+    if not pending:
+        print("Plana göre yapılacak bir iş yok.")
+        return
+
+    Scheduler.init(globals.WORKER_COUNT, globals.SCHEDULING_POLICY, globals.LARGE_FILE_SLOTS)
+    # Duyuru sayfaları aynı anda alınır ama ders ders plandaki sırayla kaydedilir (aynı isimli duyurular için)
+    announcement_links: dict[str, list[str]] = {}
+    for entry in pending:
+        if entry["kind"] == KIND_FILE:
+            size = entry["size"] / 1024 / 1024
+            priority = PRIORITY_LARGE_FILE if size > LARGE_FILE_SIZE else PRIORITY_FILE
+            Scheduler.submit(priority, _execute_file, entry, group=entry["course"], size=size)
+        elif entry["kind"] == KIND_ANNOUNCEMENT:
+            announcement_links.setdefault(entry["course"], []).append(entry["url"][len(URL):])
+        else:
+            Scheduler.submit(PRIORITY_LISTING, _execute_homework, courses[entry["course"]], entry, group=entry["course"])
+    for group, detail_links in announcement_links.items():
+        course = courses[group]
+        AnnouncementBatch(course.crn, announcements_folder(course), detail_links).submit(group=group)
+
+    print(f"Plan uygulanıyor: {len(pending)} iş. Bu işlem birkaç dakika sürebilir.")
+    Scheduler.wait()
+    Scheduler.shutdown()
+
+
+def _execute_file(entry: dict) -> None:
+    os.makedirs(entry["destination"], exist_ok=True)
+    _download_file(entry["url"], entry["destination"])
+
+
+def _execute_homework(course: Course, entry: dict) -> None:
+    detail_link = entry["url"][len(URL):]
+    archive_homework(course, detail_link, entry["list_fingerprint"], homeworks_folder(course), globals.worker_session(), _download_file)
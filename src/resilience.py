@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+# Tüm HTTP istekleri için ortak hata dayanıklılığı katmanı
+# - Bağlantı hataları, zaman aşımları ve 429/5xx cevapları üstel artan, rastgele sapmalı (jitter)
+#   bekleme süreleriyle tekrar denenir. Sunucu Retry-After gönderirse o süre beklenir.
+# - CircuitBreaker son isteklerin sonuçlarını izler. Hata oranı yükseldiğinde zamanlayıcının
+#   aynı anda çalıştırdığı iş sayısını yarıya indirir, sunucu düzeldiğinde birer birer geri artırır.
+
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+import requests
+
+from src import logger
+from src.metrics import Metrics
+from src.scheduler import Scheduler
+
+MAX_ATTEMPTS = 4
+BASE_DELAY = 1  # saniye
+MAX_DELAY = 60  # saniye
+MAX_RETRY_AFTER = 300  # saniye, sunucunun istediği bekleme süresinin üst sınırı
+DEFAULT_TIMEOUT = (10, 60)  # (bağlanma, okuma) saniye
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+BREAKER_WINDOW = 40  # son kaç isteğin sonucuna bakılacağı
+BREAKER_MIN_SAMPLES = 10
+BREAKER_TRIP_RATE = 0.25  # bu orandan fazla hata varsa eş zamanlılık yarıya iner
+BREAKER_RECOVER_RATE = 0.05  # bu orandan az hata varsa eş zamanlılık bir artar
+BREAKER_COOLDOWN = 5  # saniye, iki ayar arasında geçmesi gereken en kısa süre
+
+_RETRY_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+
+def backoff_delay(attempt: int, retry_after: float = None) -> float:
+    """
+    attempt. denemeden (0'dan başlar) sonra beklenecek süreyi döner. Retry-After verilmişse o
+    kullanılır; verilmemişse 'full jitter' ile 0 ile BASE_DELAY * 2^attempt arasında rastgele bir süre.
+    """
+    if retry_after is not None:
+        return min(retry_after, MAX_RETRY_AFTER)
+    return random.uniform(0, min(MAX_DELAY, BASE_DELAY * 2 ** attempt))
+
+
+def parse_retry_after(value: str) -> float:
+    """Retry-After başlığını (saniye veya HTTP tarihi) saniyeye çevirir, okunamazsa None döner"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    Son BREAKER_WINDOW isteğin başarılı/başarısız sonuçlarını tutar ve zamanlayıcının eş zamanlılık
+    sınırını ayarlar: hata oranı yükselince yarıya indirir, hatalar azalınca işçi sayısına kadar birer artırır.
+    """
+
+    _lock = threading.Lock()
+    _outcomes: deque[bool] = deque(maxlen=BREAKER_WINDOW)
+    _adjusted_at = 0.0
+
+    @classmethod
+    def record(cls, failed: bool) -> None:
+        with cls._lock:
+            cls._outcomes.append(failed)
+            if len(cls._outcomes) < BREAKER_MIN_SAMPLES:
+                return
+            now = time.monotonic()
+            if now - cls._adjusted_at < BREAKER_COOLDOWN:
+                return
+            failure_rate = sum(cls._outcomes) / len(cls._outcomes)
+            limit, max_limit = Scheduler.concurrency(), Scheduler.worker_count()
+
+            if failure_rate > BREAKER_TRIP_RATE and limit > 1:
+                new_limit = max(1, limit // 2)
+                Metrics.inc("circuit_breaker_trips_total")
+                logger.warning(
+                    f"Sunucu hata oranı yüksek (%{failure_rate * 100:.0f}). Eş zamanlı iş sayısı {limit} -> {new_limit} düşürüldü."
+                )
+            elif failure_rate < BREAKER_RECOVER_RATE and limit < max_limit and len(cls._outcomes) == BREAKER_WINDOW:
+                new_limit = limit + 1
+                logger.verbose(f"Sunucu hataları azaldı. Eş zamanlı iş sayısı {limit} -> {new_limit} artırıldı.")
+            else:
+                return
+
+            Scheduler.set_concurrency(new_limit)
+            Metrics.set_gauge("scheduler_concurrency", new_limit)
+            cls._outcomes.clear()
+            cls._adjusted_at = now
+
+
+class ResilientSession(requests.Session):
+    """
+    Her isteği RETRY_STATUSES cevaplarında ve bağlantı hatalarında tekrar deneyen oturum.
+    Sonuçlar CircuitBreaker'a bildirilir. Zaman aşımı verilmeyen isteklere DEFAULT_TIMEOUT uygulanır.
+    """
+
+    def request(self, method, url, *args, **kwargs):
+        kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+        for attempt in range(MAX_ATTEMPTS):
+            is_last = attempt == MAX_ATTEMPTS - 1
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except _RETRY_EXCEPTIONS as e:
+                CircuitBreaker.record(True)
+                if is_last:
+                    raise
+                reason, retry_after = type(e).__name__, None
+            else:
+                failed = response.status_code in RETRY_STATUSES
+                CircuitBreaker.record(failed)
+                if not failed or is_last:
+                    return response
+                reason, retry_after = response.status_code, parse_retry_after(response.headers.get("Retry-After"))
+                response.close()
+
+            delay = backoff_delay(attempt, retry_after)
+            Metrics.inc("http_retries_total", reason=reason)
+            logger.verbose(f"{url} isteği başarısız ({reason}), {delay:.1f} saniye sonra tekrar denenecek ({attempt + 1}/{MAX_ATTEMPTS}).")
+            time.sleep(delay)
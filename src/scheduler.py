@@ -0,0 +1,216 @@
+from __future__ import annotations
+from typing import Callable
+
+from collections import namedtuple
+from heapq import heappop, heappush
+from itertools import count
+from threading import Condition, Thread, local
+from time import perf_counter
+
+from src import logger
+from src.metrics import Metrics
+
+# Küçük sayı önce çalışır. Klasör listeleri önce gelir ki keşif indirmelerin önünde ilerlesin.
+PRIORITY_LISTING = 0
+PRIORITY_FILE = 1
+PRIORITY_LARGE_FILE = 2
+_PRIORITY_KINDS = {PRIORITY_LISTING: "listing", PRIORITY_FILE: "file", PRIORITY_LARGE_FILE: "large_file"}
+
+DEFAULT_WORKER_COUNT = 8
+
+# Aynı öncelikteki işlerin sırası (listedeki boyutlar kullanılır):
+# smallest: küçük dosyalar önce, kısmi sonuçlar hızlı gelir
+# largest: büyük dosyalar önce, en son biten dosya daha erken biter
+# fair: derslerin işleri sırayla, bir dersin yüzlerce dosyası diğerlerini bekletmez
+# fifo: bulunma sırası
+POLICIES = ("smallest", "largest", "fair", "fifo")
+DEFAULT_POLICY = POLICIES[0]
+
+_STOP_PRIORITY = float("inf")
+
+Job = namedtuple("Job", "priority order seq group func args submitted_at")
+
+
+class Scheduler:
+    """
+    Sabit sayıda işçi iş parçacığı ile çalışan, öncelikli iş kuyruğu.
+    İşler bir gruba (ders) aittir; her grubun bekleyen iş sayısı tutulur ve
+    grup bittiğinde wait() ile beklenebilir.
+    Aynı anda çalışan iş sayısı set_concurrency() ile işçi sayısının altına indirilebilir.
+    PRIORITY_LARGE_FILE işleri ayrı bir kuyrukta tutulur. Başka iş bekliyorsa aynı anda en fazla
+    large_slots tanesi çalışır; büyük dosyalar bu yuvalarda kendi sıralarıyla ilerlerken diğer
+    işçiler küçük dosyalara devam eder. Bekleyen başka iş yoksa boştaki işçiler de büyük dosya alır.
+    """
+
+    _queue: list[Job] = []
+    _large_queue: list[Job] = []
+    _workers: list[Thread] = []
+    _sequence = count()
+    _pending: dict[str, int] = {}
+    _started_at: dict[str, float] = {}
+    _condition = Condition()
+    _current = local()
+    _limit: int = None
+    _active = 0
+    _active_large = 0
+    _large_slots = 1
+    _policy = DEFAULT_POLICY
+    _turns: dict[tuple, int] = {}
+    _run_started_at = 0.0
+    _slots = Condition()
+
+    @classmethod
+    def init(cls, worker_count: int = DEFAULT_WORKER_COUNT, policy: str = DEFAULT_POLICY, large_slots: int = None):
+        """
+        İşçi iş parçacıklarını başlatır.
+        large_slots verilmezse işçilerin dörtte biri (en az 1) büyük dosyalara ayrılır.
+        """
+        if cls._workers:
+            return
+        worker_count = max(1, worker_count)
+        cls._limit = worker_count
+        cls._policy = policy
+        cls._large_slots = max(1, min(large_slots or worker_count // 4, worker_count))
+        cls._turns = {}
+        cls._run_started_at = perf_counter()
+        Metrics.set_gauge("scheduler_policy", 1, policy=policy)
+        Metrics.set_gauge("scheduler_large_slots", cls._large_slots)
+        for index in range(worker_count):
+            worker = Thread(target=cls._work, name=f"worker-{index}", daemon=True)
+            worker.start()
+            cls._workers.append(worker)
+        logger.debug(f"Zamanlayıcı {worker_count} işçi, '{policy}' sıralaması ve {cls._large_slots} büyük dosya yuvası ile başlatıldı.")
+
+    @classmethod
+    def submit(cls, priority: int, func: Callable, *args, group: str = None, size: float = None) -> None:
+        """
+        Kuyruğa yeni bir iş ekler. Grup verilmezse, çağıran işin grubu kullanılır
+        (bir klasör işinin açtığı alt işler aynı derse sayılır).
+        size: dosya işlerinde listedeki boyut, sıralama politikası tarafından kullanılır.
+        """
+        if group is None:
+            group = getattr(cls._current, "group", None)
+        with cls._condition:
+            if not cls._pending.get(group):
+                cls._started_at[group] = perf_counter()
+            cls._pending[group] = cls._pending.get(group, 0) + 1
+        with cls._slots:
+            job = Job(priority, cls._order(priority, group, size), next(cls._sequence), group, func, args, perf_counter())
+            heappush(cls._large_queue if priority == PRIORITY_LARGE_FILE else cls._queue, job)
+            queued = len(cls._queue) + len(cls._large_queue)
+            cls._slots.notify()
+        Metrics.max_gauge("scheduler_queue_peak", queued)
+
+    @classmethod
+    def wait(cls, group: str = None) -> None:
+        """Verilen grubun (verilmezse tüm grupların) işleri bitene kadar bekler."""
+        with cls._condition:
+            if group is None:
+                cls._condition.wait_for(lambda: not any(cls._pending.values()))
+            else:
+                cls._condition.wait_for(lambda: not cls._pending.get(group))
+
+    @classmethod
+    def worker_count(cls) -> int:
+        return len(cls._workers)
+
+    @classmethod
+    def concurrency(cls) -> int:
+        """Aynı anda çalışabilecek iş sayısı"""
+        return cls._limit or len(cls._workers)
+
+    @classmethod
+    def set_concurrency(cls, limit: int) -> None:
+        """Aynı anda çalışabilecek iş sayısını değiştirir (1 ile işçi sayısı arasında)."""
+        with cls._slots:
+            cls._limit = max(1, min(limit, len(cls._workers)))
+            cls._slots.notify_all()
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Kuyruktaki işler bittikten sonra işçileri durdurur."""
+        with cls._slots:
+            for _ in cls._workers:
+                heappush(cls._queue, Job(_STOP_PRIORITY, 0, next(cls._sequence), None, None, (), 0.0))
+            cls._slots.notify_all()
+        for worker in cls._workers:
+            worker.join()
+        cls._workers.clear()
+        cls._limit = None
+
+    @classmethod
+    def _order(cls, priority: int, group: str, size: float):
+        """Aynı öncelikteki işlerin politikaya göre sırası (küçük önce). _slots kilidi altında çağrılır."""
+        if cls._policy == "smallest":
+            return size or 0
+        if cls._policy == "largest":
+            return -(size or 0)
+        if cls._policy == "fair":
+            # Her dersin n. işi, diğer derslerin n. işleriyle yan yana sıralanır
+            turn = cls._turns.get((group, priority), 0)
+            cls._turns[(group, priority)] = turn + 1
+            return turn
+        return 0
+
+    @classmethod
+    def _can_take_large(cls) -> bool:
+        return bool(cls._large_queue) and (cls._active_large < cls._large_slots or not cls._queue)
+
+    @classmethod
+    def _can_take(cls) -> bool:
+        if cls._active >= cls.concurrency():
+            return False
+        return bool(cls._queue) or cls._can_take_large()
+
+    @classmethod
+    def _take(cls) -> Job:
+        """
+        Çalıştırılacak işi kuyruktan alır. Boş bir büyük dosya yuvası varsa, klasör listeleri
+        dışında büyük dosyalar önceliklidir. _slots kilidi altında çağrılır.
+        """
+        if cls._can_take_large() and (not cls._queue or cls._queue[0].priority > PRIORITY_LISTING):
+            cls._active_large += 1
+            return heappop(cls._large_queue)
+        return heappop(cls._queue)
+
+    @classmethod
+    def _work(cls):
+        while True:
+            with cls._slots:
+                cls._slots.wait_for(cls._can_take)
+                job = cls._take()
+                if job.func is None:
+                    break
+                cls._active += 1
+            kind = _PRIORITY_KINDS.get(job.priority, "other")
+            Metrics.observe("scheduler_wait_seconds", perf_counter() - job.submitted_at, kind=kind)
+            cls._current.group = job.group
+            Metrics.set_course(job.group)
+            try:
+                job.func(*job.args)
+            except Exception as e:
+                Metrics.inc("jobs_failed_total", course=job.group)
+                logger.error(f"{job.group} için çalışan bir iş hata ile sonlandı: {e}")
+            finally:
+                cls._current.group = None
+                Metrics.set_course(None)
+                if job.priority != PRIORITY_LISTING:
+                    # Çalışma başından bu işin bitişine kadar geçen süre; yüzdelikleri kısmi sonuçların ne kadar erken geldiğini gösterir
+                    Metrics.observe("scheduler_done_seconds", perf_counter() - cls._run_started_at, kind=kind)
+                with cls._slots:
+                    cls._active -= 1
+                    if job.priority == PRIORITY_LARGE_FILE:
+                        cls._active_large -= 1
+                    cls._slots.notify()
+                cls._finish(job.group)
+
+    @classmethod
+    def _finish(cls, group: str) -> None:
+        with cls._condition:
+            cls._pending[group] -= 1
+            if cls._pending[group] == 0:
+                elapsed = perf_counter() - cls._started_at.pop(group)
+                if group is not None:
+                    Metrics.set_gauge("course_seconds", elapsed, course=group)
+                    logger.verbose(f"{group} tamamlandı ({elapsed:.2f} saniye).")
+                cls._condition.notify_all()
@@ -0,0 +1,153 @@
+from __future__ import annotations
+from typing import Callable
+
+# İş parçacığı başına HTTP oturumları
+# Her işçi kendi requests.Session nesnesini (çerez kutusu, başlıklar, hook'lar) kullanır;
+# bağlantı havuzları (HTTPAdapter) ise tüm oturumlarda ortaktır. Böylece bir sunucuya açılan
+# keep-alive bağlantıları işçiler arasında tekrar kullanılır. Havuz boyutu işçi sayısına göre
+# ayarlandığı için havuz dolup bağlantıların kapatılması ve yeniden açılması (TLS el sıkışması) önlenir.
+# Giriş çerezleri tek bir ana oturumda tutulur. Tekrar giriş yapıldığında kuşak (generation)
+# numarası artar ve her işçi oturumu bir sonraki kullanımda çerezlerini ana oturumdan yeniler.
+
+import logging
+import socket
+from threading import Lock, local
+
+import requests
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+from src import http_cache, logger
+from src.login import URL, enable_reauthentication
+from src.metrics import Metrics
+from src.resilience import ResilientSession
+
+# Önbelleğe alınan farklı sunucu havuzu sayısı (Ninova, giriş sunucusu ve yönlendirmeler için yeterli)
+POOL_HOST_COUNT = DEFAULT_POOLSIZE
+KEEPALIVE_SOCKET_OPTIONS = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+
+
+class _KeepAliveMixin:
+    """Soketlerde TCP keep-alive açar; boşta bekleyen bağlantılar ağ cihazlarınca düşürülmez"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs.setdefault("socket_options", KEEPALIVE_SOCKET_OPTIONS)
+        super().init_poolmanager(*args, **kwargs)
+
+
+class KeepAliveAdapter(_KeepAliveMixin, HTTPAdapter):
+    pass
+
+
+class KeepAliveCachingAdapter(_KeepAliveMixin, http_cache.CachingAdapter):
+    pass
+
+
+class _PoolFullCounter(logging.Handler):
+    """urllib3'ün 'Connection pool is full' uyarılarını sayar (havuz küçük kaldığında kapatılan bağlantılar)"""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.getMessage().startswith("Connection pool is full"):
+            Metrics.inc("http_pool_discarded_total")
+            logger.debug(record.getMessage())
+
+
+class Sessions:
+    """
+    İşçi oturumlarını üreten ve giriş çerezlerini paylaştıran sınıf.
+    init() ile giriş yapılmış ana oturum verilir; get() çağıran iş parçacığının oturumunu döner.
+    """
+
+    _base: requests.Session = None
+    _relogin: Callable[[], requests.Session] = None
+    _adapters: dict[str, HTTPAdapter] = {}
+    _generation = 0
+    _lock = Lock()
+    _local = local()
+
+    @classmethod
+    def init(cls, base: requests.Session, relogin: Callable[[], requests.Session], pool_size: int, cache_dir: str = None) -> None:
+        """
+        pool_size: sunucu başına açık tutulacak en fazla bağlantı sayısı.
+        cache_dir verilirse Ninova sayfaları için koşullu HTTP önbelleği kullanılır.
+        """
+        cls._base = base
+        cls._relogin = relogin
+        cls._generation = 0
+        cls._local = local()
+
+        pool_kwargs = {"pool_connections": POOL_HOST_COUNT, "pool_maxsize": pool_size}
+        default_adapter = KeepAliveAdapter(**pool_kwargs)
+        cls._adapters = {"https://": default_adapter, "http://": default_adapter}
+        if cache_dir:
+            cls._adapters[URL] = KeepAliveCachingAdapter(cache_dir, **pool_kwargs)
+
+        pool_logger = logging.getLogger("urllib3.connectionpool")
+        if not any(isinstance(handler, _PoolFullCounter) for handler in pool_logger.handlers):
+            pool_logger.addHandler(_PoolFullCounter(logging.WARNING))
+        logger.debug(f"HTTP bağlantı havuzu sunucu başına {pool_size} bağlantı ile oluşturuldu.")
+
+    @classmethod
+    def get(cls) -> requests.Session:
+        """Çağıran iş parçacığının oturumunu döner, yoksa oluşturur. Çerezleri eskiyse yenilenir."""
+        session = getattr(cls._local, "session", None)
+        if session is None:
+            session = cls._new_session()
+            cls._local.session = session
+        if session.auth_generation != cls._generation:
+            cls._sync_cookies(session)
+        return session
+
+    @classmethod
+    def refresh_login(cls, session: requests.Session) -> None:
+        """
+        Oturum süresi dolduğunda çağrılır. Başka bir iş parçacığı bu oturumun çerezleri alındıktan
+        sonra zaten tekrar giriş yaptıysa yeni giriş yapılmaz, sadece çerezler yenilenir.
+        """
+        with cls._lock:
+            if session.auth_generation == cls._generation:
+                logger.warning("Ninova oturumu sona ermiş. Tekrar giriş yapılıyor...")
+                cls._base.cookies.update(cls._relogin().cookies)
+                cls._generation += 1
+                Metrics.inc("reauthentications_total")
+            session.cookies = cls._base.cookies.copy()
+            session.auth_generation = cls._generation
+
+    @classmethod
+    def connection_stats(cls) -> dict:
+        """
+        Bağlantı havuzlarından toplanan sayılar: açılan bağlantılar, gönderilen istekler ve
+        mevcut bir bağlantıyı tekrar kullanan istekler.
+        """
+        opened = sent = 0
+        for adapter in set(cls._adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is not None:
+                    opened += pool.num_connections
+                    sent += pool.num_requests
+        return {"connections_opened": opened, "requests_sent": sent, "connections_reused": max(sent - opened, 0)}
+
+    @classmethod
+    def close(cls) -> None:
+        for adapter in set(cls._adapters.values()):
+            adapter.close()
+
+    @classmethod
+    def _new_session(cls) -> requests.Session:
+        session = ResilientSession()
+        session.headers.update(cls._base.headers)
+        for prefix, adapter in cls._adapters.items():
+            session.mount(prefix, adapter)
+        session.auth_generation = None
+        # Yeniden giriş hook'undan önce eklenir; böylece yeniden gönderilen istekler iki kez sayılmaz
+        session.hooks["response"].append(Metrics.record_response)
+        enable_reauthentication(session, cls.refresh_login)
+        return session
+
+    @classmethod
+    def _sync_cookies(cls, session: requests.Session) -> None:
+        with cls._lock:
+            session.cookies = cls._base.cookies.copy()
+            session.auth_generation = cls._generation
@@ -1,23 +1,56 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable
 
 if TYPE_CHECKING:
     from src.kampus import Course
 
-from threading import Thread
-
+from src import globals, logger
+from src.db_handler import DB
 from src.downloader import download_all_in_course
+from src.kampus import get_course_list
+from src.scheduler import Scheduler, PRIORITY_LISTING
+
+
+def course_group(course: Course) -> str:
+    """Zamanlayıcıda dersin işlerini gruplamak için kullanılan anahtar"""
+    return f"{course.code} (CRN {course.crn})"
+
 
 def start_tasks(courses: list[Course]) -> None:
-    proc_list: list[Thread] = []
+    if "plan" in globals.ARGV or "plan-only" in globals.ARGV:
+        from src.planner import run_plan
+        if globals.ENGINE == "async":
+            logger.warning("Plan modu sadece 'thread' motoru ile çalışır, plan 'thread' motoru ile uygulanacak.")
+        run_plan(courses)
+        return
+
+    if globals.ENGINE == "async":
+        # aiohttp sadece bu motor seçildiğinde gerekli
+        from src.async_engine import run_async_engine
+        run_async_engine(courses)
+        return
+
+    Scheduler.init(globals.WORKER_COUNT, globals.SCHEDULING_POLICY, globals.LARGE_FILE_SLOTS)
     for course in courses:
-        proc = Thread(
-            target=download_all_in_course,
-            args=(course,)
+        Scheduler.submit(
+            PRIORITY_LISTING, download_all_in_course, course, group=course_group(course)
         )
-        proc.start()
-        proc_list.append(proc)
 
     print("İndiriliyor... Bu işlem birkaç dakika sürebilir.")
-    for proc in proc_list:
-        proc.join()
\ No newline at end of file
+    Scheduler.wait()
+    Scheduler.shutdown()
+
+
+def archive(select_courses: Callable[[tuple[Course]], tuple[Course]]) -> tuple[Course]:
+    """
+    Veritabanını açar, ders listesini alır, select_courses ile seçilen dersleri arşivler ve
+    seçilen dersleri döner. Program yarıda kesilse bile o ana kadarki kayıtlar yazılır.
+    """
+    DB.init()
+    try:
+        courses = select_courses(get_course_list())
+        start_tasks(courses)
+        return courses
+    finally:
+        DB.stop_writer()
+        DB.apply_changes_and_close()
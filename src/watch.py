@@ -0,0 +1,138 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from src.kampus import Course
+
+# İzleme modu (-watch dakika)
+# Program kapanmadan, verilen aralıklarla (rastgele sapma eklenerek) dersleri tekrar eşitler.
+# Giriş yapılmış oturum, veritabanı bağlantısı ve yazıcı iş parçacığı, bellekteki dosya indeksleri
+# ve ders listesi çalışmalar arasında korunur; değişmemiş sayfalar HTTP önbelleği sayesinde tekrar
+# işlenmez. Son zamanlarda yeni dosya gelen dersler her eşitlemede kuyruğa önce eklenir.
+# Her eşitlemeden sonra durum bilgileri bir JSON dosyasına yazılır.
+
+import json
+import os
+import random
+import time
+from os.path import join
+
+from src import globals, logger
+from src.db_handler import DB
+from src.kampus import get_course_list
+from src.metrics import Metrics
+from src.task_handler import course_group, start_tasks
+
+WATCH_JITTER = 0.1  # aralığın ±%10'u kadar rastgele sapma, aynı anda başlatılan kopyalar sunucuya birlikte yüklenmesin
+COURSE_LIST_TTL = 6 * 60 * 60  # saniye, ders listesi bu süreden sonra tekrar alınır
+STATUS_FILE_NAME = "ninova_arsivci_status.json"
+# Bir dersin "değişti" sayılması için bakılan sayaçlar
+_CHANGE_COUNTERS = ("files_downloaded_total", "files_deduplicated_total")
+
+
+def get_watch_interval() -> float:
+    """-watch ile verilen aralığı saniye olarak döner"""
+    try:
+        minutes = float(globals.ARGV["watch"][0])
+    except ValueError:
+        minutes = 0
+    if minutes <= 0:
+        logger.fail("-watch parametresi pozitif bir sayı (dakika) olmalı.")
+    return minutes * 60
+
+
+def run_watch(select_courses: Callable[[tuple[Course]], tuple[Course]]) -> None:
+    """Ctrl+C ile durdurulana kadar dersleri aralıklarla eşitler."""
+    interval = get_watch_interval()
+    status_path = globals.ARGV["status"][0] if "status" in globals.ARGV else join(globals.BASE_PATH, STATUS_FILE_NAME)
+    status = {"pid": os.getpid(), "started_at": time.time(), "interval_seconds": interval, "syncs": 0, "courses": {}}
+
+    DB.init()
+    try:
+        all_courses = get_course_list()
+        courses = select_courses(all_courses)
+        select_all = len(courses) == len(all_courses)
+        selected_links = {course.link for course in courses}
+        discovered_at = time.monotonic()
+
+        while True:
+            if time.monotonic() - discovered_at > COURSE_LIST_TTL:
+                all_courses = get_course_list()
+                courses = all_courses if select_all else tuple(course for course in all_courses if course.link in selected_links)
+                discovered_at = time.monotonic()
+
+            _sync(courses, status)
+            delay = interval * random.uniform(1 - WATCH_JITTER, 1 + WATCH_JITTER)
+            status["next_sync_at"] = time.time() + delay
+            _write_status(status_path, status)
+            print(f"Sonraki eşitleme {delay / 60:.1f} dakika sonra. Durdurmak için Ctrl+C.")
+            time.sleep(delay)
+    except KeyboardInterrupt:
+        print("İzleme durduruldu.")
+    finally:
+        DB.stop_writer()
+        DB.apply_changes_and_close()
+
+
+def _sync(courses: tuple[Course], status: dict) -> None:
+    course_status = status["courses"]
+    # Son değişikliği en yeni olan dersler önce kuyruğa girer, işleri de önce çalışır
+    ordered = sorted(courses, key=lambda course: course_status.get(course_group(course), {}).get("last_changed_at") or 0, reverse=True)
+
+    before = _changes_by_course()
+    started_at = time.time()
+    start = time.perf_counter()
+    error = None
+    try:
+        start_tasks(ordered)
+    except Exception as e:
+        error = str(e)
+        logger.error(f"Eşitleme hata ile sonlandı: {e}")
+    duration = time.perf_counter() - start
+    finished_at = time.time()
+
+    after = _changes_by_course()
+    course_seconds = {item["labels"]["course"]: item["value"] for item in Metrics.snapshot()["gauges"].get("course_seconds", [])}
+    new_files_total = 0
+    for course in ordered:
+        group = course_group(course)
+        new_files = after.get(group, 0) - before.get(group, 0)
+        new_files_total += new_files
+        entry = course_status.setdefault(group, {"last_changed_at": None})
+        entry["last_synced_at"] = finished_at
+        entry["last_duration_seconds"] = course_seconds.get(group)
+        entry["new_files_last_sync"] = new_files
+        if new_files:
+            entry["last_changed_at"] = finished_at
+
+    status["syncs"] += 1
+    status["last_sync"] = {
+        "started_at": started_at,
+        "finished_at": finished_at,
+        "duration_seconds": duration,
+        "ok": error is None,
+        "error": error,
+        "new_files": new_files_total,
+    }
+    Metrics.inc("watch_syncs_total")
+    print(f"Eşitleme {duration:.1f} saniyede tamamlandı, {new_files_total} yeni dosya.")
+
+
+def _changes_by_course() -> dict[str, float]:
+    counters = Metrics.snapshot()["counters"]
+    changes = {}
+    for name in _CHANGE_COUNTERS:
+        for item in counters.get(name, []):
+            course = item["labels"].get("course")
+            changes[course] = changes.get(course, 0) + item["value"]
+    return changes
+
+
+def _write_status(path: str, status: dict) -> None:
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(status, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning(f"Durum dosyası yazılamadı: {e}")